@@ -0,0 +1,72 @@
+import argparse
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import cube, pipeline, storage
+from src.etl_pipeline.transform.skill_index import SkillIndex, SKILL_NAMES
+
+# Dashboard views (tech share per month, remote share per month, salary median per skill)
+# from the row-level structured dataset vs from the aggregate cube, plus the cost of a full
+# and of a one-month cube update. Views are compared before timings are reported.
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def _row_views(structured_path):
+    df = storage.read_structured(structured_path, columns=['date', 'skills_mask', 'is_remote', 'salary_avg'])
+    skills = SkillIndex.from_frame(df)
+    months = pd.to_datetime(df['date']).dt.strftime('%Y-%m').rename('month')
+    remote = df.groupby([months, df['is_remote']]).size().rename('count')
+    # Lower-rank median: the value the cube's sketch approximates
+    salaries = df['salary_avg'].astype(float)
+    salary = pd.Series({skill: salaries[skills.has(skill)].quantile(0.5, interpolation='lower')
+                        for skill in SKILL_NAMES}).dropna()
+    return skills.trend(), remote, salary
+
+def _cube_views(cube_path):
+    cells = cube.load_cube(cube_path)
+    totals = cells[cells['skill'] == cube.ALL_SKILLS]
+    remote = cube.rollup(totals, ['month_start', 'is_remote'])['count']
+    salary = cube.salary_quantiles(cells[cells['skill'] != cube.ALL_SKILLS], ['skill'], (0.5,))['q50']
+    return cube.skill_share(cells), remote, salary
+
+def run_benchmark(input_path):
+    df = datasets.read_partitioned(input_path)
+    print(f"{input_path}: {len(df)} rows")
+    with tempfile.TemporaryDirectory() as scratch:
+        structured_path = os.path.join(scratch, "structured")
+        cube_path = os.path.join(scratch, "cube.parquet")
+        storage.write_structured(df, structured_path)
+
+        _, full_time = _timed(lambda: cube.update_cube(structured_path, cube_path))
+
+        # A month lands: rewrite the structured dataset with the latest month dropped, then restored
+        months = pd.to_datetime(df['date']).dt.to_period('M')
+        storage.write_structured(df[months != months.max()], structured_path)
+        cube.update_cube(structured_path, cube_path)
+        storage.write_structured(df, structured_path)
+        rebuilt, update_time = _timed(lambda: cube.update_cube(structured_path, cube_path))
+        assert rebuilt == [str(months.max())]
+
+        (row_trend, row_remote, row_salary), row_time = _timed(lambda: _row_views(structured_path))
+        (cube_trend, cube_remote, cube_salary), cube_time = _timed(lambda: _cube_views(cube_path))
+        assert np.allclose(cube_trend.to_numpy(), row_trend.loc[cube_trend.index].to_numpy())
+        assert cube_remote.sort_index().equals(row_remote.sort_index())
+        relative_error = (cube_salary - row_salary.loc[cube_salary.index]).abs() / row_salary.loc[cube_salary.index]
+        assert relative_error.max() <= cube.SKETCH_ALPHA
+
+        print(f"{'cube full build':<22} {full_time:6.2f}s")
+        print(f"{'cube one-month update':<22} {update_time:6.2f}s")
+        print(f"{'views from rows':<22} {row_time:6.2f}s")
+        print(f"{'views from cube':<22} {cube_time:6.2f}s (salary medians within {relative_error.max():.2%})")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare dashboard views from rows and from the aggregate cube.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to aggregate.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input)
@@ -0,0 +1,67 @@
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+from src.etl_pipeline.memory import reset_peak_rss, current_rss_mib, peak_rss_mib
+from src.etl_pipeline.data_access import build_arrow, open_dataset
+from src.etl_pipeline.transform import pipeline, storage
+
+# Loading the structured dataset into pandas: storage.read_structured (parquet decoded into
+# numpy / Python object columns) vs data_access (memory-mapped Arrow file, pyarrow-backed
+# columns over the mapped buffers), for the analysis notebook's columns and for every column.
+# Each load runs in its own spawned process so its peak RSS is its own; RSS counts the file
+# pages a mapped load touches. Both loads are compared before timings are reported.
+
+ANALYSIS_COLUMNS = [
+    'id', 'date', 'raw_text', 'role_title', 'salary_avg', 'salary_unit', 'is_remote', 'skills_mask',
+    'is_senior', 'is_junior', 'is_manager', 'years_experience',
+    'is_tier_1_city', 'is_europe', 'is_global_remote',
+    'is_yc', 'is_funded', 'is_crypto', 'has_equity', 'offers_visa',
+    'tech_combo_ai', 'tech_combo_blockchain'
+]
+COMPARED_COLUMNS = ['id', 'date', 'raw_text', 'salary_avg', 'skills_mask', 'is_remote', 'years_experience']
+
+def _load(loader, input_path, columns, filters):
+    reset_peak_rss()
+    baseline = current_rss_mib()
+    start = time.perf_counter()
+    if loader == "read_structured":
+        df = storage.read_structured(input_path, columns=columns, filters=filters)
+    else:
+        df = open_dataset(input_path).to_pandas(columns, filters=filters)
+    seconds = time.perf_counter() - start
+    # Touching one text reads one posting's pages, not the column
+    sample = df['raw_text'].iloc[len(df) // 2]
+    peak = peak_rss_mib() - baseline
+    compared = df[[c for c in COMPARED_COLUMNS if c in df.columns]].astype(object)
+    return {'seconds': seconds, 'peak_rss_mib': peak, 'rows': len(df), 'sample': sample,
+            'compared': compared.where(compared.notna(), None)}
+
+def run_benchmark(input_path, start_year):
+    filters = [('year', '>=', start_year)] if start_year else None
+    start = time.perf_counter()
+    build_arrow(input_path)
+    build_time = time.perf_counter() - start
+
+    context = multiprocessing.get_context("spawn")
+    results = {}
+    for label, columns in (("analysis columns", ANALYSIS_COLUMNS), ("all columns", None)):
+        for loader in ("read_structured", "data_access"):
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                results[label, loader] = executor.submit(_load, loader, input_path, columns, filters).result()
+        parquet, mapped = results[label, "read_structured"], results[label, "data_access"]
+        assert parquet['sample'] == mapped['sample']
+        pd.testing.assert_frame_equal(parquet['compared'], mapped['compared'])
+
+    print(f"{input_path}: {next(iter(results.values()))['rows']} rows, Arrow file built in {build_time:.2f}s (once per version)")
+    print(f"{'':<18} {'loader':<16} {'seconds':>8} {'peak MiB':>9}")
+    for (label, loader), result in results.items():
+        print(f"{label:<18} {loader:<16} {result['seconds']:>8.3f} {result['peak_rss_mib']:>9.0f}")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare loading the structured dataset from parquet and from its mapped Arrow file.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to load.")
+    arg_parser.add_argument("--start-year", type=int, help="Only load postings from this year on.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.start_year)
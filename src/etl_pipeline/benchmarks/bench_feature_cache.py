@@ -0,0 +1,43 @@
+import argparse
+import os
+import tempfile
+import time
+import pandas as pd
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import pipeline
+from src.etl_pipeline.transform.feature_cache import FeatureCache, cache_summary
+from src.etl_pipeline.transform.pipeline import sanitize, extract_features, enforce_schema
+
+# Feature extraction on the sanitized postings without the feature cache, with an empty cache
+# (every distinct text extracted and stored) and with a full one (every text looked up).
+# Outputs are compared before timings are reported.
+
+def _timed_extract(df, vectorized_mode, feature_cache=None):
+    start = time.perf_counter()
+    final_df = enforce_schema(extract_features(df.copy(), vectorized_mode, feature_cache))
+    elapsed = time.perf_counter() - start
+    if feature_cache is not None:
+        feature_cache.close()
+    return final_df, elapsed
+
+def run_benchmark(input_path, vectorized_mode):
+    df = sanitize(datasets.read_partitioned(input_path))
+    print(f"{input_path}: {len(df)} postings after sanitation")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        cache_path = os.path.join(scratch, "feature_cache.sqlite")
+        reference, uncached_time = _timed_extract(df, vectorized_mode)
+        print(f"{'no cache':<12} {uncached_time:6.2f}s")
+        for label in ("cold cache", "warm cache"):
+            feature_cache = FeatureCache(cache_path, "bench")
+            final_df, elapsed = _timed_extract(df, vectorized_mode, feature_cache)
+            pd.testing.assert_frame_equal(reference, final_df, check_exact=True)
+            print(f"{label:<12} {elapsed:6.2f}s ({cache_summary(feature_cache.counters())})")
+        print(f"cache file: {os.path.getsize(cache_path) / 1e6:.1f} MB")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Time feature extraction with and without the feature cache.")
+    arg_parser.add_argument("--input", default=pipeline.INPUT_DIR, help="Raw dataset to extract features from.")
+    arg_parser.add_argument("--vectorized", action="store_true", help="Use the column-at-a-time extractors.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.vectorized)
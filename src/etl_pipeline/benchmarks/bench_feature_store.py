@@ -0,0 +1,33 @@
+import argparse
+import tempfile
+import time
+from src.etl_pipeline.transform import pipeline
+from src.machine_learning.feature_store import build_feature_store, load_features
+
+# Model features fitted and computed from the structured dataset (what the notebook did every
+# session) vs loaded from the feature store. Loaded matrices are compared with the built ones
+# before timings are reported.
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run_benchmark(input_path, start_year):
+    with tempfile.TemporaryDirectory() as store_dir:
+        built, build_time = _timed(lambda: build_feature_store(input_path, store_dir, start_year))
+        loaded, load_time = _timed(lambda: load_features(input_path, store_dir, start_year))
+    for name in ('salary_matrix', 'role_matrix'):
+        assert (getattr(built, name) != getattr(loaded, name)).nnz == 0
+    assert built.rows.equals(loaded.rows)
+
+    print(f"{len(built.rows)} rows: salary {built.salary_matrix.shape}, role {built.role_matrix.shape}")
+    print(f"{'fit + featurize':<16} {build_time * 1000:9.1f} ms")
+    print(f"{'load':<16} {load_time * 1000:9.1f} ms ({build_time / load_time:.0f}x)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare building the model features with loading them from the feature store.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to featurize.")
+    arg_parser.add_argument("--start-year", type=int, help="Only use postings from this year on.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.start_year)
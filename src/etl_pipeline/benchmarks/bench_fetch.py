@@ -0,0 +1,71 @@
+import argparse
+import logging
+import tempfile
+import time
+from src.etl_pipeline.extract import config, fetcher, checkpoint_manager, main as extract_main
+from src.etl_pipeline.extract.rate_limiter import TokenBucket
+from src.etl_pipeline.benchmarks.fake_hn_server import FakeHNServer
+from src.etl_pipeline.benchmarks.synthetic import generate_thread_list, generate_thread_pages
+
+def build_threads(num_threads, comments_per_thread, per_page):
+    threads, pages = [], {}
+    for thread_id, d in generate_thread_list(num_threads):
+        pages[thread_id], _ = generate_thread_pages(thread_id, comments_per_thread, per_page=per_page)
+        threads.append({
+            'id': str(thread_id),
+            'title': f"Ask HN: Who is hiring? ({d.strftime('%B %Y')})",
+            'thread_date': d.strftime("%Y-%m-%d"),
+        })
+    return threads, pages
+
+def run_mode(server, threads, workers, rate, burst):
+    # Thread data and checkpoints go to a scratch directory, never to data/
+    with tempfile.TemporaryDirectory() as scratch:
+        config.THREADS_DIR = scratch
+        config.CHECKPOINT_FILE = f"{scratch}/checkpoint.json"
+
+        hn_fetcher = fetcher.HNFetcher(rate_limiter=TokenBucket(rate, burst), base_url=server.base_url, pool_size=workers)
+        checkpoint = checkpoint_manager.CheckpointJournal().load()
+        start = time.perf_counter()
+        if workers > 1:
+            extract_main.process_threads_concurrent(hn_fetcher, threads, checkpoint, workers)
+        else:
+            extract_main.process_threads_serial(hn_fetcher, threads, checkpoint)
+        return time.perf_counter() - start, len(checkpoint.processed_threads)
+
+def run_benchmark(num_threads=8, comments_per_thread=300, per_page=100, latency=0.25,
+                  workers=4, rate=10.0, burst=2, rate_limit_every=0):
+    threads, pages = build_threads(num_threads, comments_per_thread, per_page)
+    requests_needed = sum(len(p) for p in pages.values())
+    print(f"Fake HN: {num_threads} threads, {requests_needed} pages, {latency * 1000:.0f}ms latency, "
+          f"budget {rate:g} req/s (burst {burst})")
+
+    original_paths = (config.THREADS_DIR, config.CHECKPOINT_FILE)
+    try:
+        results = {}
+        for mode_workers in (1, workers):
+            with FakeHNServer(pages, latency=latency, rate_limit_every=rate_limit_every) as server:
+                elapsed, done = run_mode(server, threads, mode_workers, rate, burst)
+                results[mode_workers] = elapsed
+                print(f"{mode_workers} worker(s): {elapsed:.2f}s for {done} threads "
+                      f"({server.request_count / elapsed:.1f} req/s, {server.rate_limited_count} x 429)")
+    finally:
+        config.THREADS_DIR, config.CHECKPOINT_FILE = original_paths
+
+    print(f"Speedup: {results[1] / results[workers]:.1f}x")
+    serial_estimate = requests_needed * (config.RATE_LIMIT_DELAY + 1.0 + latency)
+    print(f"(Default serial fetcher with {config.RATE_LIMIT_DELAY:g}s + jitter delay: ~{serial_estimate:.0f}s)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Serial vs concurrent thread fetching against a local fake HN.")
+    arg_parser.add_argument("--threads", type=int, default=8)
+    arg_parser.add_argument("--comments", type=int, default=300, help="Top-level postings per thread.")
+    arg_parser.add_argument("--latency", type=float, default=0.25, help="Server latency per request (s).")
+    arg_parser.add_argument("--workers", type=int, default=4)
+    arg_parser.add_argument("--rate", type=float, default=10.0, help="Aggregate request budget (req/s).")
+    arg_parser.add_argument("--rate-limit-every", type=int, default=0, help="Answer every Nth request with 429.")
+    args = arg_parser.parse_args()
+    # extract.main configures INFO logging on import; keep the benchmark output readable
+    logging.getLogger().setLevel(logging.WARNING)
+    run_benchmark(args.threads, args.comments, latency=args.latency, workers=args.workers,
+                  rate=args.rate, rate_limit_every=args.rate_limit_every)
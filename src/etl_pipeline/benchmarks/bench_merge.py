@@ -0,0 +1,56 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+import pandas as pd
+from src.etl_pipeline.extract import config, loader
+from src.etl_pipeline.memory import peak_rss_mib
+from src.etl_pipeline.benchmarks.synthetic import generate_postings, generate_thread_list
+
+# Peak RSS of loader.merge_thread_files as the number of months on disk grows.
+# Each merge runs in a fresh process so its peak RSS is not polluted by earlier runs.
+
+def write_thread_files(threads_dir, num_months, comments_per_month):
+    next_id = 40000000
+    for month, (thread_id, d) in enumerate(generate_thread_list(num_months)):
+        texts = generate_postings(comments_per_month, seed=month)
+        df = pd.DataFrame({
+            'id': [str(next_id + i) for i in range(comments_per_month)],
+            'thread_date': d.strftime("%Y-%m-%d"),
+            'raw_text': texts,
+            'user': [f"user{i % 997}" for i in range(comments_per_month)],
+            'url': [f"{config.BASE_URL}/item?id={next_id + i}" for i in range(comments_per_month)],
+        })
+        next_id += comments_per_month
+        loader.save_thread_data(df, thread_id)
+
+def _merge(threads_dir, data_dir):
+    config.THREADS_DIR, config.DATA_DIR = threads_dir, data_dir
+    config.RAW_DATASET_DIR = os.path.join(data_dir, "hn_jobs_raw")
+    start = time.perf_counter()
+    loader.merge_thread_files()
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mib()
+
+def run_benchmark(month_counts=(6, 24, 72), comments_per_month=2000):
+    context = multiprocessing.get_context("spawn")
+    for num_months in month_counts:
+        with tempfile.TemporaryDirectory() as scratch:
+            threads_dir = os.path.join(scratch, "threads")
+            os.makedirs(threads_dir)
+            config.THREADS_DIR = threads_dir
+            write_thread_files(threads_dir, num_months, comments_per_month)
+            input_mb = sum(os.path.getsize(os.path.join(threads_dir, f)) for f in os.listdir(threads_dir)) / 1e6
+
+            with context.Pool(1) as pool:
+                elapsed, peak_mb = pool.apply(_merge, (threads_dir, scratch))
+            print(f"{num_months:>4} months ({num_months * comments_per_month} rows, {input_mb:.0f} MB on disk): "
+                  f"{elapsed:.2f}s, peak RSS {peak_mb:.0f} MiB")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Peak memory of the streaming thread-file merge.")
+    arg_parser.add_argument("--months", type=int, nargs="+", default=[6, 24, 72])
+    arg_parser.add_argument("--comments", type=int, default=2000, help="Postings per month.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.months, args.comments)
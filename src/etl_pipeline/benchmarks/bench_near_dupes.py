@@ -0,0 +1,61 @@
+import argparse
+import time
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import near_dupes, pipeline
+from src.etl_pipeline.transform.pipeline import sanitize
+
+# Near-duplicate detection on the sanitized postings: signature, LSH and clustering cost, and
+# LSH recall against an all-pairs comparison of the same signatures on a sample.
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def _all_pairs_representatives(signatures):
+    # Same clusters as cluster_representatives, from every pair instead of LSH candidates
+    n = len(signatures)
+    first, second = np.triu_indices(n, k=1)
+    similar = np.zeros(len(first), dtype=bool)
+    for start in range(0, len(first), 1_000_000):
+        chunk = slice(start, start + 1_000_000)
+        similar[chunk] = ((signatures[first[chunk]] == signatures[second[chunk]]).mean(axis=1)
+                          >= near_dupes.NEAR_DUP_THRESHOLD)
+    graph = coo_matrix((np.ones(similar.sum(), dtype=np.int8), (first[similar], second[similar])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    representative = np.full(labels.max() + 1, n, dtype=np.int64)
+    np.minimum.at(representative, labels, np.arange(n))
+    return representative[labels], similar.sum()
+
+def run_benchmark(input_path, sample):
+    df = sanitize(datasets.read_partitioned(input_path))
+    print(f"{input_path}: {len(df)} postings after sanitation")
+
+    signatures, signature_time = _timed(lambda: near_dupes.minhash_signatures(df['raw_text']))
+    (first, second), lsh_time = _timed(lambda: near_dupes.candidate_pairs(signatures))
+    representative, cluster_time = _timed(lambda: near_dupes.cluster_representatives(signatures))
+    duplicates = representative != np.arange(len(df))
+    print(f"{'signatures':<12} {signature_time:6.2f}s")
+    print(f"{'lsh':<12} {lsh_time:6.2f}s ({len(first)} candidate pairs)")
+    print(f"{'clustering':<12} {cluster_time:6.2f}s ({duplicates.sum()} near duplicates "
+          f"in {len(np.unique(representative[duplicates]))} clusters)")
+
+    sample = min(sample, len(df))
+    sampled = signatures[:sample]
+    lsh_representative = near_dupes.cluster_representatives(sampled)
+    (exact_representative, similar_pairs), all_pairs_time = _timed(lambda: _all_pairs_representatives(sampled))
+    first, second = near_dupes.candidate_pairs(sampled)
+    found = ((sampled[first] == sampled[second]).mean(axis=1) >= near_dupes.NEAR_DUP_THRESHOLD).sum()
+    print(f"{'all pairs':<12} {all_pairs_time:6.2f}s on {sample} postings: "
+          f"LSH found {found} of {similar_pairs} similar pairs, "
+          f"clusters {'identical' if (lsh_representative == exact_representative).all() else 'differ'}")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Time MinHash/LSH near-duplicate detection and check its recall.")
+    arg_parser.add_argument("--input", default=pipeline.INPUT_DIR, help="Raw dataset to deduplicate.")
+    arg_parser.add_argument("--sample", type=int, default=4000, help="Postings compared all-pairs for recall.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.sample)
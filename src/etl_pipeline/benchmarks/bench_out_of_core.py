@@ -0,0 +1,99 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from sklearn.ensemble import RandomForestClassifier
+from src.etl_pipeline.memory import reset_peak_rss, current_rss_mib, peak_rss_mib
+from src.etl_pipeline.transform import pipeline, storage
+from src.machine_learning import out_of_core
+from src.machine_learning.feature_store import salary_training_rows
+from src.machine_learning.features import SalaryFeatures, RoleFeatures, top_techs
+from src.machine_learning.out_of_core import ROLE_EPOCHS, SALARY_ROUNDS
+
+# The notebook's in-memory training (fitted TF-IDF features, XGBoost + RandomForest on the whole
+# dataset) vs out-of-core training (out_of_core.py: hashed features, external-memory XGBoost +
+# SGDClassifier over batches). Both train on the same rows and are scored on the same held-out
+# postings; each runs in its own process so peak RSS is its own (not a Pool worker: daemonic
+# processes cannot start the RandomForest's workers). --scale replicates the dataset to show
+# how memory and fit time follow the number of postings.
+
+def _replicated(input_path, scale, output_path):
+    # Ids are kept: every copy of a posting falls on the same side of the holdout split
+    df = storage.read_structured(input_path)
+    storage.write_structured(pd.concat([df] * scale).sort_values('date', kind='stable').reset_index(drop=True),
+                             output_path)
+
+def _in_memory(input_path, start_year, rounds):
+    reset_peak_rss()
+    baseline = current_rss_mib()
+    start = time.perf_counter()
+    df = storage.read_structured(input_path, filters=[('year', '>=', start_year)] if start_year else None)
+    train = df[~out_of_core.holdout_rows(df['id'])]
+    techs = top_techs(train)
+    salary_data = train[salary_training_rows(train)]
+    salary_features = SalaryFeatures(techs).fit(salary_data)
+    salary_model = xgb.XGBRegressor(n_estimators=rounds, max_depth=8, learning_rate=0.03, subsample=0.7,
+                                    colsample_bytree=0.7, objective='reg:squarederror', n_jobs=-1, random_state=42)
+    salary_model.fit(salary_features.transform(salary_data), np.log1p(salary_data['salary_avg'].astype('float64')))
+    salary_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    role_data = train[train['job_category'].notnull()]
+    role_features = RoleFeatures(techs).fit(role_data)
+    role_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    role_model.fit(role_features.transform(role_data), role_data['job_category'])
+    role_seconds = time.perf_counter() - start
+
+    metrics = out_of_core.evaluate(lambda: [df], salary_model, salary_features, role_model, role_features)
+    return dict(metrics, salary_fit_seconds=salary_seconds, role_fit_seconds=role_seconds,
+                peak_rss_mib=peak_rss_mib() - baseline)
+
+def _out_of_core(input_path, start_year, rounds, epochs):
+    reset_peak_rss()
+    baseline = current_rss_mib()
+    batches = lambda: out_of_core.iter_batches(input_path, out_of_core.OOC_BATCH_ROWS, start_year)
+    salary_features, role_features = out_of_core.HashedSalaryFeatures(), out_of_core.HashedRoleFeatures()
+    start = time.perf_counter()
+    salary_model = out_of_core.train_salary_model(batches, salary_features, rounds)
+    salary_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    role_model = out_of_core.train_role_model(batches, role_features, epochs)
+    role_seconds = time.perf_counter() - start
+    metrics = out_of_core.evaluate(batches, salary_model, salary_features, role_model, role_features)
+    return dict(metrics, salary_fit_seconds=salary_seconds, role_fit_seconds=role_seconds,
+                peak_rss_mib=peak_rss_mib() - baseline)
+
+def run_benchmark(input_path, start_year, scale, rounds, epochs):
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as scratch:
+        train_path = input_path
+        if scale > 1:
+            train_path = os.path.join(scratch, "structured")
+            _replicated(input_path, scale, train_path)
+        results = {}
+        for label, fn, args in (("in-memory", _in_memory, (train_path, start_year, rounds)),
+                                ("out-of-core", _out_of_core, (train_path, start_year, rounds, epochs))):
+            with ProcessPoolExecutor(1, mp_context=context) as executor:
+                results[label] = executor.submit(fn, *args).result()
+
+    first = next(iter(results.values()))
+    print(f"{input_path} x{scale}: {first['salary_rows']} salary / {first['role_rows']} role rows held out")
+    print(f"{'':<12} {'salary MAE':>11} {'R2':>7} {'fit s':>7} {'role F1':>8} {'fit s':>7} {'peak MiB':>9}")
+    for label, result in results.items():
+        print(f"{label:<12} {result['salary_mae']:>11,.0f} {result['salary_r2']:>7.4f} {result['salary_fit_seconds']:>7.1f} "
+              f"{result['role_f1']:>8.4f} {result['role_fit_seconds']:>7.1f} {result['peak_rss_mib']:>9.0f}")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare in-memory and out-of-core model training.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to train on.")
+    arg_parser.add_argument("--start-year", type=int, help="Only use postings from this year on.")
+    arg_parser.add_argument("--scale", type=int, default=1, help="Train on N copies of the dataset.")
+    arg_parser.add_argument("--rounds", type=int, default=SALARY_ROUNDS, help="Boosting rounds of both salary models.")
+    arg_parser.add_argument("--epochs", type=int, default=ROLE_EPOCHS, help="Passes of the out-of-core role model.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.start_year, args.scale, args.rounds, args.epochs)
@@ -0,0 +1,94 @@
+import argparse
+import glob
+import gzip
+import json
+import os
+import time
+from src.etl_pipeline.extract import config, parser
+from src.etl_pipeline.benchmarks.synthetic import generate_thread_pages, render_thread_page
+
+# Comment-page parsing throughput per backend, with a check that every backend returns
+# exactly the comments of the BeautifulSoup reference.
+
+# Markup HN emits that the synthetic postings do not cover
+_EDGE_CASE_TEXTS = [
+    "Acme | SWE | Remote\n  \nIndented  text\twith tabs",
+    "Quotes \"double\" and 'single' & ampersands < > — ünïcode 😀",
+    "Unicode whitespace nbsp thin",
+]
+_EDGE_CASE_PAGE = (
+    '<html><body><table class="comment-tree">'
+    '<tr class="athing comtr" id="1"><td><table><tr><td class="ind"><img src="s.gif" width="0"></td>'
+    '<td class="default"><a href="user?id=a" class="hnuser">a</a> <span class="age"><a href="item?id=1">1 hour ago</a></span>'
+    '<div class="comment"><div class="commtext c00">First<p>Code:<pre><code>  def f():\n      return 1\n\n</code></pre>'
+    '<p><i>Italic</i> <a href="https:&#x2F;&#x2F;example.com&#x2F;jobs" rel="nofollow">https:&#x2F;&#x2F;example.com&#x2F;jobs</a><!-- note -->'
+    '<p> \n </p><p>Last</p></div><div class="reply"><p>reply</p></div></div></td></tr></table></td></tr>'
+    '<tr class="athing comtr" id="2"><td><table><tr><td class="ind"><img src="s.gif" width="40"></td>'
+    '<td class="default"><div class="commtext c00">reply</div></td></tr></table></td></tr>'
+    '<tr class="athing comtr" id="3"><td><table><tr><td class="ind"></td>'
+    '<td class="default"><span class="comhead"><span class="age"><a>x</a></span></span>'
+    '<div class="commtext c5A">Unclosed <b>bold<p>flagged</div></td></tr></table></td></tr>'
+    '<tr class="athing comtr" id="4"><td><table><tr><td class="ind"><img src="s.gif"></td></tr></table></td></tr>'
+    '</table></body></html>'
+)
+
+def load_cached_pages(cache_dir=config.HTTP_CACHE_DIR, limit=None):
+    """
+    Thread pages from the fetcher's HTTP cache (real HN markup), if any were fetched.
+    """
+    pages = []
+    for meta_path in sorted(glob.glob(os.path.join(cache_dir, "*", "*.json"))):
+        with open(meta_path, 'r') as f:
+            url = json.load(f).get('url', '')
+        if "item?id=" not in url:
+            continue
+        with gzip.open(meta_path[:-len(".json")] + ".html.gz", 'rt', encoding='utf-8') as f:
+            pages.append(f.read())
+        if limit and len(pages) >= limit:
+            break
+    return pages
+
+def synthetic_pages(num_pages, per_page=100):
+    pages, _ = generate_thread_pages(30000000, num_pages * per_page, per_page=per_page)
+    edge = render_thread_page(30000001, [(i, f"user{i}", text, 0) for i, text in enumerate(_EDGE_CASE_TEXTS)])
+    return pages + [edge, _EDGE_CASE_PAGE]
+
+def check_parity(pages, backends):
+    for i, page in enumerate(pages):
+        expected = parser.parse_comments(page, "2024-01-01", backend="bs4")
+        for backend in backends:
+            got = parser.parse_comments(page, "2024-01-01", backend=backend)
+            if got != expected:
+                raise AssertionError(f"Backend '{backend}' differs from bs4 on page {i}")
+    print(f"Parity OK: {', '.join(backends)} == bs4 on {len(pages)} pages")
+
+def run_benchmark(pages, backends, repeat=3):
+    num_bytes = sum(len(page) for page in pages)
+    results = {}
+    for backend in backends:
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            comments = sum(len(parser.parse_comments(page, "2024-01-01", backend=backend)[0]) for page in pages)
+            best = min(best, time.perf_counter() - start)
+        results[backend] = best
+        print(f"{backend:>5}: {best:.3f}s for {len(pages)} pages ({num_bytes / best / 1e6:.1f} MB/s, "
+              f"{len(pages) / best:.0f} pages/s, {comments} top-level comments)")
+    if "bs4" in results:
+        for backend, elapsed in results.items():
+            if backend != "bs4":
+                print(f"{backend} speedup over bs4: {results['bs4'] / elapsed:.1f}x")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Benchmark HTML parser backends for thread pages.")
+    arg_parser.add_argument("--pages", type=int, default=20, help="Synthetic pages (100 postings + replies each).")
+    arg_parser.add_argument("--cached", action="store_true", help="Use thread pages from the HTTP cache instead.")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    backends = [b for b in ("bs4", "lxml") if parser.resolve_backend(b) == b]
+    pages = load_cached_pages(limit=args.pages) if args.cached else synthetic_pages(args.pages)
+    if not pages:
+        raise SystemExit(f"No cached thread pages found in {config.HTTP_CACHE_DIR}")
+    check_parity(pages, [b for b in backends if b != "bs4"])
+    run_benchmark(pages, backends, args.repeat)
@@ -0,0 +1,104 @@
+import argparse
+import os
+import pickle
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from src.etl_pipeline.transform import pipeline
+from src.machine_learning import predict
+from src.machine_learning.features import SalaryFeatures, RoleFeatures, top_techs, tfidf_transform
+
+# Batch scoring with the trained models (predict.py): load time, the first (cold) and later
+# (warm) scoring of the latest month, bulk rows/sec and scoring one posting at a time.
+# Without saved artifacts, stand-in models are fitted on the input with the notebook's
+# features and hyperparameters (untimed; inference cost depends on the tree counts and depths).
+# Outputs are compared before timings are reported.
+
+ONE_AT_A_TIME_ROWS = 200
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def _fit_stand_ins(df, artifacts_dir):
+    # Imported here: only needed without saved artifacts
+    import xgboost as xgb
+    techs = top_techs(df)
+    salary_data = df[df['salary_avg'].notnull() & (df['currency'] == 'USD')]
+    salary_features = SalaryFeatures(techs).fit(salary_data)
+    salary_model = xgb.XGBRegressor(n_estimators=1000, max_depth=8, learning_rate=0.03, subsample=0.7,
+                                    colsample_bytree=0.7, objective='reg:squarederror', n_jobs=-1, random_state=42)
+    salary_model.fit(salary_features.transform(salary_data), np.log1p(salary_data['salary_avg']))
+    role_data = df[df['job_category'].notnull()]
+    role_features = RoleFeatures(techs).fit(role_data)
+    role_model = RandomForestClassifier(n_estimators=100, random_state=42, n_jobs=-1)
+    role_model.fit(role_features.transform(role_data), role_data['job_category'])
+    for name, artifact in (('salary_model.pkl', {'model': salary_model, 'features': salary_features}),
+                           ('role_model.pkl', {'model': role_model, 'features': role_features})):
+        with open(os.path.join(artifacts_dir, name), 'wb') as f:
+            pickle.dump(artifact, f)
+
+def _latest_month(df):
+    latest = df['date'].max()
+    return df[(df['date'].dt.year == latest.year) & (df['date'].dt.month == latest.month)], f"{latest:%Y-%m}"
+
+def run_benchmark(input_path, artifacts_dir, raw_path, repeat):
+    df = predict.read_postings(input_path)
+    print(f"{input_path}: {len(df)} rows")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        if not os.path.exists(os.path.join(artifacts_dir, 'salary_model.pkl')):
+            print(f"No artifacts in {artifacts_dir}: fitting stand-in models (untimed)...")
+            _, fit_time = _timed(lambda: _fit_stand_ins(df, scratch))
+            print(f"stand-ins fitted in {fit_time:.1f}s")
+            artifacts_dir = scratch
+        predictor, load_time = _timed(lambda: predict.Predictor(artifacts_dir))
+
+    month, month_label = _latest_month(df)
+    cold, cold_time = _timed(lambda: predictor.predict(month))
+    warm_times = []
+    for _ in range(repeat):
+        warm, warm_time = _timed(lambda: predictor.predict(month))
+        pd.testing.assert_frame_equal(cold, warm)
+        warm_times.append(warm_time)
+
+    bulk, bulk_time = _timed(lambda: predictor.predict(df))
+    sample = df.iloc[:ONE_AT_A_TIME_ROWS]
+    single, single_time = _timed(lambda: pd.concat([predictor.predict(sample.iloc[[i]]) for i in range(len(sample))],
+                                                   ignore_index=True))
+    pd.testing.assert_frame_equal(bulk.iloc[:len(sample)], single, check_exact=False, rtol=1e-5)
+
+    texts = df['raw_text'].fillna('')
+    featurize_times = []
+    for vectorizer in (predictor.salary_features.vectorizer, predictor.role_features.vectorizer):
+        old, old_time = _timed(lambda: vectorizer.transform(texts))
+        new, new_time = _timed(lambda: tfidf_transform(vectorizer, texts))
+        assert old.shape == new.shape and abs(old - new).max() < 1e-12
+        featurize_times.append((old_time, new_time))
+
+    print(f"{'load artifacts':<22} {load_time:8.2f}s")
+    print(f"{'cold month ' + month_label:<22} {cold_time:8.2f}s ({len(month)} rows)")
+    print(f"{'warm month ' + month_label:<22} {min(warm_times):8.2f}s ({len(month) / min(warm_times):,.0f} rows/s)")
+    print(f"{'bulk':<22} {bulk_time:8.2f}s ({len(df) / bulk_time:,.0f} rows/s)")
+    print(f"{'one at a time':<22} {single_time:8.2f}s ({len(sample) / single_time:,.0f} rows/s, {len(sample)} rows)")
+    for label, (old_time, new_time) in zip(("salary tf-idf", "role tf-idf"), featurize_times):
+        print(f"{label:<22} {old_time:8.2f}s -> {new_time:.2f}s ({old_time / new_time:.1f}x, sklearn transform -> tfidf_transform)")
+
+    if raw_path and os.path.exists(raw_path):
+        raw_month = predict.read_postings(raw_path, month_label)
+        raw_predictions, raw_time = _timed(lambda: predictor.predict(raw_month))
+        print(f"{'warm raw month':<22} {raw_time:8.2f}s ({len(raw_month)} raw postings -> {len(raw_predictions)} scored)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Time batch scoring with the salary and role models.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to score.")
+    arg_parser.add_argument("--artifacts", default=predict.ARTIFACTS_DIR,
+                            help="Directory holding salary_model.pkl and role_model.pkl (stand-ins are fitted without them).")
+    arg_parser.add_argument("--raw", default=pipeline.INPUT_DIR,
+                            help="Raw dataset: its postings of the latest month are also scored from raw text.")
+    arg_parser.add_argument("--repeat", type=int, default=3, help="Warm runs; the best is reported.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.artifacts, args.raw, args.repeat)
@@ -0,0 +1,105 @@
+import argparse
+import re
+import time
+import pandas as pd
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import pipeline, vectorized
+from src.etl_pipeline.transform.extractors import extract_salary_features, SALARY_FEATURE_COLUMNS
+from src.etl_pipeline.transform.pipeline import sanitize
+
+# Salary extraction on the sanitized postings: the previous four-regex waterfall vs the
+# tokenizer, row-wise and column-at-a-time. The two tokenizer paths are checked against
+# REGRESSION_CASES and compared with each other before timings are reported.
+
+# Text -> (salary_min, salary_max, salary_unit) of the posting, None when no salary is kept
+REGRESSION_CASES = {
+    "Salary: 120.000 EUR": (120000, 120000, 'annual'),     # dotted thousands, not 120/hour
+    "€60.000 - 80.000": (60000, 80000, 'annual'),
+    "Compensation 1.200.000": None,                         # 1.2M, out of range, not 1.2/hour
+    "$62.5/hr": (125000, 125000, 'hourly'),
+    "$120k-150k": (120000, 150000, 'annual'),
+    "Acme | $100k\u00a0-\u00a0$140k": (100000, 140000, 'annual'),  # &nbsp; around the dash
+    "$90k\u2009–\u2009$110k\u00a0USD": (90000, 110000, 'annual'),  # thin spaces
+    "$130k base + $401k": (130000, 130000, 'annual'),               # not a $401,000 salary
+    "$401(k) matching, $140k": (140000, 140000, 'annual'),
+    "401k match": None,
+}
+
+# Previous parse_salary: first match of range / "starting at" / "N+" / "$N", one per posting
+LEGACY_RANGE_PATTERN = re.compile(r'[\$€£]?(\d{2,3}k?|\d{5,6})\s*-\s*[\$€£]?(\d{2,3}k?|\d{5,6})')
+LEGACY_START_AT_PATTERN = re.compile(r'(?:from|starting at|\+)\s*[\$€£]?(\d{2,3}k|\d{5,6})\+?')
+LEGACY_PLUS_PATTERN = re.compile(r'[\$€£]?(\d{2,3}k|\d{5,6})\+')
+LEGACY_SINGLE_PATTERN = re.compile(r'[\$€£](\d{2,3}k|\d{5,6})')
+
+def _legacy_value(value):
+    return int(float(value.replace("k", "000").replace("$", "").replace("£", "").replace("€", "")))
+
+def legacy_parse_salary(text):
+    if not text:
+        return None, None, None
+    text_lower = text.lower().replace(",", "")
+    currency = "USD"
+    if "£" in text or "gbp" in text_lower:
+        currency = "GBP"
+    elif "€" in text or "eur" in text_lower:
+        currency = "EUR"
+
+    match = LEGACY_RANGE_PATTERN.search(text_lower)
+    if match:
+        min_val, max_val = _legacy_value(match.group(1)), _legacy_value(match.group(2))
+        if min_val and max_val:
+            if min_val < 1000 and max_val > 1000:
+                min_val *= 1000
+            if min_val < 200:
+                min_val, max_val = min_val * 2000, max_val * 2000
+            if min_val > 50:
+                return min_val, max_val, currency
+
+    match = LEGACY_START_AT_PATTERN.search(text_lower) or LEGACY_PLUS_PATTERN.search(text_lower)
+    if not match:
+        match = LEGACY_SINGLE_PATTERN.search(text_lower)
+    if match:
+        val = _legacy_value(match.group(1))
+        if val and val < 200:
+            val *= 2000
+        if val and val > 50:
+            return val, val, currency
+    return None, None, None
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def check_regression_cases():
+    texts = pd.Series(list(REGRESSION_CASES))
+    rowwise = pd.DataFrame([extract_salary_features(text) for text in texts], columns=SALARY_FEATURE_COLUMNS)
+    pd.testing.assert_frame_equal(rowwise, vectorized.parse_salary_column(texts), check_exact=True)
+    for (text, expected), (_, row) in zip(REGRESSION_CASES.items(), rowwise.iterrows()):
+        found = None if pd.isna(row['salary_min']) else (row['salary_min'], row['salary_max'], row['salary_unit'])
+        assert found == expected, f"{text!r}: {found} instead of {expected}"
+
+def run_benchmark(input_path):
+    check_regression_cases()
+    texts = vectorized.clean_text_column(sanitize(datasets.read_partitioned(input_path))['raw_text'])
+    print(f"{input_path}: {len(texts)} postings after sanitation")
+
+    legacy, legacy_time = _timed(lambda: [legacy_parse_salary(text) for text in texts])
+    rowwise, rowwise_time = _timed(lambda: pd.DataFrame([extract_salary_features(text) for text in texts],
+                                                        index=texts.index, columns=SALARY_FEATURE_COLUMNS))
+    columnar, columnar_time = _timed(lambda: vectorized.parse_salary_column(texts))
+    pd.testing.assert_frame_equal(rowwise, columnar, check_exact=True)
+
+    legacy_found = sum(low is not None for low, _, _ in legacy)
+    mentions = rowwise['salary_mentions'].map(len)
+    print(f"{'legacy waterfall':<18} {legacy_time:6.2f}s ({legacy_found} postings with a salary, unfiltered)")
+    print(f"{'tokenizer':<18} {rowwise_time:6.2f}s ({rowwise['salary_min'].notna().sum()} postings with a salary, "
+          f"{mentions.sum()} mentions, {(mentions > 1).sum()} postings with several)")
+    print(f"{'tokenizer columns':<18} {columnar_time:6.2f}s (identical output)")
+    print(rowwise['salary_unit'].value_counts().to_string())
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Time salary extraction: legacy regexes vs the tokenizer.")
+    arg_parser.add_argument("--input", default=pipeline.INPUT_DIR, help="Raw dataset to extract salaries from.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input)
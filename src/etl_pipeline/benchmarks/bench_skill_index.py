@@ -0,0 +1,59 @@
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from src.etl_pipeline.transform import pipeline, storage
+from src.etl_pipeline.transform.skill_index import SkillIndex, SKILL_NAMES
+
+# Notebook skill aggregations: explode()/apply() over tech_stack lists vs the skills_mask index.
+# Results of both are compared before timings are reported.
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def _explode_trend(df):
+    exploded = df.explode('tech_stack').dropna(subset=['tech_stack'])
+    exploded_months = pd.to_datetime(exploded['date']).dt.to_period('M').astype(str)
+    months = pd.to_datetime(df['date']).dt.to_period('M').astype(str)
+    counts = exploded.groupby([exploded_months, exploded['tech_stack']]).size().unstack(fill_value=0)
+    return counts.div(months.value_counts().reindex(counts.index), axis=0) * 100
+
+def _explode_salary(df):
+    exploded = df.explode('tech_stack').dropna(subset=['tech_stack', 'salary_avg'])
+    return exploded.groupby('tech_stack')['salary_avg'].median().astype(float)
+
+def _apply_one_hot(df):
+    return np.column_stack([df['tech_stack'].apply(lambda x: 1 if x is not None and tech in x else 0)
+                            for tech in SKILL_NAMES])
+
+def run_benchmark(input_path):
+    df = storage.read_structured(input_path, columns=['id', 'date', 'tech_stack', 'skills_mask', 'salary_avg'])
+    print(f"{input_path}: {len(df)} rows")
+
+    skills, build_time = _timed(lambda: SkillIndex.from_frame(df))
+    print(f"{'index build':<16} {build_time * 1000:8.1f} ms")
+
+    old_trend, old_trend_time = _timed(lambda: _explode_trend(df))
+    new_trend, new_trend_time = _timed(lambda: skills.trend())
+    assert np.allclose(new_trend.loc[old_trend.index, old_trend.columns].to_numpy(), old_trend.to_numpy())
+
+    old_salary, old_salary_time = _timed(lambda: _explode_salary(df))
+    new_salary, new_salary_time = _timed(lambda: skills.salary_by_skill(df['salary_avg']))
+    assert np.allclose(new_salary.loc[old_salary.index, 'median'].to_numpy(), old_salary.to_numpy())
+
+    old_one_hot, old_one_hot_time = _timed(lambda: _apply_one_hot(df))
+    new_one_hot, new_one_hot_time = _timed(lambda: skills.one_hot())
+    assert (old_one_hot == new_one_hot).all()
+
+    for label, old_time, new_time in [("trend", old_trend_time, new_trend_time),
+                                      ("salary by skill", old_salary_time, new_salary_time),
+                                      ("one-hot", old_one_hot_time, new_one_hot_time)]:
+        print(f"{label:<16} {old_time * 1000:8.1f} ms -> {new_time * 1000:8.1f} ms ({old_time / new_time:6.1f}x)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare explode/apply skill aggregations with SkillIndex.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to query.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input)
@@ -0,0 +1,68 @@
+import argparse
+import glob
+import os
+import re
+import time
+import pandas as pd
+from src.etl_pipeline.transform.config import SKILL_KEYWORDS
+from src.etl_pipeline.transform.extractors import extract_skills
+
+# Paths
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "data")
+THREADS_DIR = os.path.join(DATA_DIR, "threads")
+
+def extract_skills_per_variation(text):
+    """
+    Reference implementation: one regex search per variation (previous extract_skills).
+    """
+    if not text:
+        return []
+
+    found_skills = set()
+    text_lower = text.lower()
+
+    for skill, variations in SKILL_KEYWORDS.items():
+        for variation in variations:
+            pattern = r'\b' + re.escape(variation) + r'\b'
+            if re.search(pattern, text_lower):
+                found_skills.add(skill)
+                break
+
+    return list(found_skills)
+
+def load_texts(threads_dir: str, limit: int = None):
+    thread_files = sorted(glob.glob(os.path.join(threads_dir, "thread_*.parquet")))
+    texts = []
+    for f in thread_files:
+        texts.extend(pd.read_parquet(f, columns=['raw_text'])['raw_text'].tolist())
+        if limit and len(texts) >= limit:
+            return texts[:limit]
+    return texts
+
+def time_function(func, texts):
+    start = time.perf_counter()
+    results = [func(text) for text in texts]
+    return time.perf_counter() - start, results
+
+def run_benchmark(threads_dir: str = THREADS_DIR, limit: int = None):
+    texts = load_texts(threads_dir, limit)
+    if not texts:
+        print(f"No thread files found in {threads_dir}")
+        return
+
+    print(f"Benchmarking extract_skills on {len(texts)} postings...")
+    baseline_time, baseline = time_function(extract_skills_per_variation, texts)
+    compiled_time, compiled = time_function(extract_skills, texts)
+
+    mismatches = sum(set(a) != set(b) for a, b in zip(baseline, compiled))
+
+    print(f"Per-variation regex: {baseline_time:.2f}s ({len(texts) / baseline_time:,.0f} rows/s)")
+    print(f"Compiled matcher:    {compiled_time:.2f}s ({len(texts) / compiled_time:,.0f} rows/s)")
+    print(f"Speedup: {baseline_time / compiled_time:.1f}x")
+    print(f"Mismatched rows: {mismatches}")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare skill extraction implementations.")
+    arg_parser.add_argument("--limit", type=int, default=None, help="Only benchmark the first N postings.")
+    args = arg_parser.parse_args()
+    run_benchmark(limit=args.limit)
@@ -0,0 +1,58 @@
+import argparse
+import multiprocessing
+import os
+import tempfile
+import time
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import pipeline, storage
+from src.etl_pipeline.memory import reset_peak_rss, current_rss_mib, peak_rss_mib
+
+# Size on disk, load time and memory of the structured dataset per storage profile.
+# Every load runs in a fresh process; RSS is reported as the peak growth during the load.
+
+VARIANTS = [
+    # (label, profile, split_text, columns read back)
+    ("standard", "standard", False, None),
+    ("compact", "compact", False, None),
+    ("compact, split text", "compact", True, None),
+    ("standard, no raw_text", "standard", False, [c for c in pipeline.FINAL_COLUMNS if c != 'raw_text']),
+    ("compact, split, no raw_text", "compact", True, [c for c in pipeline.FINAL_COLUMNS if c != 'raw_text']),
+    ("compact, split, as stored", "compact", True, "stored"),
+]
+
+def _dir_size(path):
+    return sum(os.path.getsize(os.path.join(root, f)) for root, _, files in os.walk(path) for f in files)
+
+def _load(path, columns):
+    reset_peak_rss()
+    baseline = current_rss_mib()
+    start = time.perf_counter()
+    if columns == "stored":
+        df = storage.read_structured(path, [c for c in pipeline.FINAL_COLUMNS if c != 'raw_text'], expand=False)
+    else:
+        df = storage.read_structured(path, columns)
+    elapsed = time.perf_counter() - start
+    return elapsed, peak_rss_mib() - baseline, df.memory_usage(deep=True).sum() / 1e6, len(df)
+
+def run_benchmark(input_path):
+    df = datasets.read_partitioned(input_path)
+    print(f"{input_path}: {len(df)} rows")
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory() as scratch:
+        for label, profile, split_text, columns in VARIANTS:
+            output_path = os.path.join(scratch, label.replace(" ", "_").replace(",", ""))
+            storage.write_structured(df, output_path, profile, split_text)
+            size_mb = _dir_size(output_path) / 1e6
+            side_mb = _dir_size(storage.text_path(output_path)) / 1e6 if split_text else 0.0
+
+            with context.Pool(1) as pool:
+                elapsed, rss_mb, frame_mb, rows = pool.apply(_load, (output_path, columns))
+            side = f" (+{side_mb:.1f} MB text)" if split_text else ""
+            print(f"{label:<28} {size_mb:6.1f} MB on disk{side:<17} load {elapsed:5.2f}s, "
+                  f"frame {frame_mb:6.1f} MB, peak RSS +{rss_mb:5.0f} MiB")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare storage profiles of the structured dataset.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to re-encode.")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input)
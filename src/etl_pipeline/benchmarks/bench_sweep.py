@@ -0,0 +1,59 @@
+import argparse
+import os
+import tempfile
+import time
+from src.etl_pipeline.transform import pipeline
+from src.machine_learning import sweep
+from src.machine_learning.feature_store import build_feature_store
+
+# Parameter sweep (sweep.py): the one-off cost of the feature store and the memory-mapped
+# fold data, then the same grid run on one worker and on every core. Fold metrics of both
+# runs are compared before timings are reported. The grid keeps to models that fit in
+# seconds; the speedup follows the core count.
+
+BENCH_GRID = {
+    'salary': {'xgboost': {'max_depth': [4, 6], 'learning_rate': [0.1]}, 'ridge': {'alpha': [1.0, 10.0]}},
+    'role': {'sgd': {'alpha': [1e-5, 1e-6]}, 'naive_bayes': {'alpha': [0.1, 1.0]}},
+}
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def _fold_metrics(sweep_dir, version, folds):
+    results = sweep.load_results(sweep.sweep_data_dir(version, folds, sweep_dir))
+    return {sweep.job_key(r['task'], r['model'], r['params'], r['fold']): (r.get('mae'), r.get('r2'), r.get('f1'))
+            for r in results}
+
+def run_benchmark(input_path, start_year, folds, workers):
+    workers = workers or os.cpu_count()
+    with tempfile.TemporaryDirectory() as scratch:
+        store_dir = os.path.join(scratch, "store")
+        feature_set, store_time = _timed(lambda: build_feature_store(input_path, store_dir, start_year))
+        timings, metrics = {}, {}
+        for label, n in (("1 worker", 1), (f"{workers} workers", workers)):
+            sweep_dir = os.path.join(scratch, f"sweep{n}")
+            _, prepare_time = _timed(lambda: sweep.prepare_sweep_data(feature_set, folds, sweep_dir))
+            _, timings[label] = _timed(lambda: sweep.run_sweep(input_path, store_dir, sweep_dir, start_year, BENCH_GRID,
+                                                               folds, n, prune=False))
+            metrics[label] = _fold_metrics(sweep_dir, feature_set.version, folds)
+    first, *others = metrics.values()
+    assert all(other == first for other in others)
+
+    jobs = len(sweep.sweep_jobs(BENCH_GRID, folds))
+    print(f"{input_path}: {jobs} fits ({folds} folds), {os.cpu_count()} cores")
+    print(f"{'feature store':<16} {store_time:8.2f}s (once per dataset version)")
+    print(f"{'fold data':<16} {prepare_time:8.2f}s (once per version and fold count)")
+    baseline = timings["1 worker"]
+    for label, seconds in timings.items():
+        print(f"{label:<16} {seconds:8.2f}s ({jobs / seconds:.1f} fits/s, {baseline / seconds:.1f}x)")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Time the parameter sweep on one worker and on every core.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to train on.")
+    arg_parser.add_argument("--start-year", type=int, help="Only use postings from this year on.")
+    arg_parser.add_argument("--folds", type=int, default=3, help="Cross-validation folds.")
+    arg_parser.add_argument("--workers", type=int, help="Workers of the parallel run (default: all cores).")
+    args = arg_parser.parse_args()
+    run_benchmark(args.input, args.start_year, args.folds, args.workers)
@@ -0,0 +1,71 @@
+import argparse
+import glob
+import os
+import time
+import pandas as pd
+from src.etl_pipeline.transform.pipeline import sanitize, extract_features, enforce_schema
+
+# Paths
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "data")
+THREADS_DIR = os.path.join(DATA_DIR, "threads")
+
+# Postings both modes must extract identically whatever the corpus holds: the vectorized
+# patterns run in RE2, where \s and \d are ASCII-only
+PARITY_CASES = [
+    "Acme | Senior Engineer | 5\u00a0years of Python | $120k\u00a0-\u00a0$150k",
+    "Beta | Backend | 3+\u2009years | REMOTE",
+    "Gamma | Dev | 10\u3000years experience | €60.000",
+    "Delta | Data | ５ years, ٣ years | Onsite",
+    "Epsilon | ML | 2\u202fyears\u2028Remote OK",
+]
+
+def check_parity_cases():
+    raw = pd.DataFrame({'id': [str(i) for i in range(len(PARITY_CASES))], 'raw_text': PARITY_CASES,
+                        'date': pd.Timestamp('2024-01-01')})
+    check_parity(enforce_schema(extract_features(raw.copy(), False)),
+                 enforce_schema(extract_features(raw.copy(), True)))
+
+def load_raw(threads_dir: str, limit: int = None) -> pd.DataFrame:
+    thread_files = sorted(glob.glob(os.path.join(threads_dir, "thread_*.parquet")))
+    df = pd.concat([pd.read_parquet(f) for f in thread_files], ignore_index=True)
+    if limit:
+        df = df.head(limit)
+    return df
+
+def transform(raw: pd.DataFrame, vectorized_mode: bool):
+    df = sanitize(raw.copy()).copy()
+    start = time.perf_counter()
+    final_df = enforce_schema(extract_features(df, vectorized_mode))
+    return time.perf_counter() - start, final_df
+
+def check_parity(rowwise: pd.DataFrame, columnar: pd.DataFrame):
+    """
+    Raises AssertionError if the two transform outputs differ in any column.
+    """
+    pd.testing.assert_frame_equal(rowwise, columnar, check_exact=True)
+
+def run_benchmark(threads_dir: str = THREADS_DIR, limit: int = None):
+    check_parity_cases()
+    thread_files = glob.glob(os.path.join(threads_dir, "thread_*.parquet"))
+    if not thread_files:
+        print(f"No thread files found in {threads_dir}")
+        return
+
+    raw = load_raw(threads_dir, limit)
+    print(f"Benchmarking transform modes on {len(raw)} raw postings...")
+
+    rowwise_time, rowwise = transform(raw, vectorized_mode=False)
+    columnar_time, columnar = transform(raw, vectorized_mode=True)
+
+    print(f"Row-wise:   {rowwise_time:.2f}s ({len(rowwise) / rowwise_time:,.0f} rows/s)")
+    print(f"Vectorized: {columnar_time:.2f}s ({len(columnar) / columnar_time:,.0f} rows/s)")
+    print(f"Speedup: {rowwise_time / columnar_time:.1f}x")
+
+    check_parity(rowwise, columnar)
+    print(f"Parity OK: {len(rowwise)} rows x {len(rowwise.columns)} columns identical.")
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Compare row-wise and vectorized transform modes.")
+    arg_parser.add_argument("--limit", type=int, default=None, help="Only use the first N raw postings.")
+    args = arg_parser.parse_args()
+    run_benchmark(limit=args.limit)
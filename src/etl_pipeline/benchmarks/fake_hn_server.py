@@ -0,0 +1,97 @@
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+# Local stand-in for news.ycombinator.com serving pre-rendered pages, with configurable
+# latency, optional 429 responses and ETag validators so the fetcher's rate limiting and
+# conditional requests can be exercised offline.
+
+class FakeHNServer:
+    """
+    Context manager running a threaded HTTP server on localhost.
+    threads: {thread_id: [page_1_html, page_2_html, ...]}
+    """
+    def __init__(self, threads, submissions_html="", latency=0.1, rate_limit_every=0, retry_after=1):
+        self.threads = {str(k): v for k, v in threads.items()}
+        self.submissions_html = submissions_html
+        self.latency = latency
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.not_modified_count = 0
+        self.lock = threading.Lock()
+        self.server = None
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                with fake.lock:
+                    fake.request_count += 1
+                    throttle = fake.rate_limit_every and fake.request_count % fake.rate_limit_every == 0
+                    if throttle:
+                        fake.rate_limited_count += 1
+                time.sleep(fake.latency)
+
+                if throttle:
+                    self.send_response(429)
+                    self.send_header('Retry-After', str(fake.retry_after))
+                    self.end_headers()
+                    return
+
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                body = None
+                if url.path == '/item':
+                    pages = fake.threads.get(query.get('id', [''])[0])
+                    page = int(query.get('p', ['1'])[0])
+                    if pages and 1 <= page <= len(pages):
+                        body = pages[page - 1]
+                elif url.path == '/submitted':
+                    body = fake.submissions_html
+
+                if body is None:
+                    self.send_response(404)
+                    self.end_headers()
+                    return
+                payload = body.encode('utf-8')
+                etag = '"' + hashlib.sha1(payload).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    with fake.lock:
+                        fake.not_modified_count += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+
+                self.send_response(200)
+                self.send_header('ETag', etag)
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+    def __enter__(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,293 @@
+import argparse
+import contextlib
+import inspect
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from src.etl_pipeline import datasets
+from src.etl_pipeline.extract import config, loader, parser
+from src.etl_pipeline.transform import extractors
+from src.etl_pipeline.transform.pipeline import DATA_DIR, run_transform_pipeline
+from src.etl_pipeline.transform.streaming import run_streaming_transform, STREAM_BATCH_ROWS
+from src.etl_pipeline.benchmarks.bench_merge import write_thread_files
+from src.etl_pipeline.memory import reset_peak_rss, peak_rss_mib
+from src.etl_pipeline.benchmarks.synthetic import (generate_postings, generate_thread_pages,
+                                                   generate_thread_list, render_submissions_page)
+
+# Offline benchmark suite for the ETL hot paths, on a synthetic corpus of --postings postings
+# (10k to 10M): thread-list and comment-page parsing, every public function of
+# transform/extractors.py, the thread-file merge and the full transform pipeline (batch and
+# streaming).
+#
+# Each case runs in a fresh process and records its throughput (items/sec, best of --repeat)
+# and peak RSS. Runs are appended to a JSON Lines results file; a case slower or larger than
+# its last passing result at the same scale by more than --threshold fails the run (exit code 1).
+# Corpus generation is not timed: postings and pages are generated CHUNK_POSTINGS at a time,
+# so memory stays bounded at any scale.
+
+RESULTS_PATH = os.path.join(DATA_DIR, "benchmark_results.jsonl")
+REGRESSION_THRESHOLD = 0.2
+MIN_MEMORY_REGRESSION_MIB = 16  # peak RSS growth below this is noise, whatever the ratio
+MIN_COMPARED_SECONDS = 0.1      # throughput of shorter cases is noise (clean_text at 10k postings)
+CHUNK_POSTINGS = 10_000
+POSTINGS_PER_PAGE = 100
+THREADS_PER_LIST_PAGE = 30
+MONTHS = 72
+
+# Extractors that do not take a clean posting text: how their input is made from one
+_EXTRACTOR_INPUTS = {
+    'clean_text': lambda raw_text: raw_text,
+    'summarize_salary_mentions': lambda raw_text: extractors.extract_salary_mentions(extractors.clean_text(raw_text)),
+}
+
+def extractor_functions() -> dict:
+    """
+    The public functions of transform/extractors.py, by name.
+    """
+    return {name: function for name, function in inspect.getmembers(extractors, inspect.isfunction)
+            if function.__module__ == extractors.__name__ and not name.startswith('_')}
+
+def _chunks(postings):
+    for start in range(0, postings, CHUNK_POSTINGS):
+        yield start // CHUNK_POSTINGS, min(CHUNK_POSTINGS, postings - start)
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def _redirect_data_dirs(threads_dir, data_dir):
+    config.THREADS_DIR, config.DATA_DIR = threads_dir, data_dir
+    config.RAW_DATASET_DIR = os.path.join(data_dir, "hn_jobs_raw")
+
+# Cases: functions of the workload returning (items, seconds), the seconds covering only the
+# code under test
+
+def bench_parse_thread_list(workload):
+    # One submissions page lists THREADS_PER_LIST_PAGE threads; a listing per posting chunk
+    page = render_submissions_page(generate_thread_list(THREADS_PER_LIST_PAGE), "submitted?id=whoishiring&next=1")
+    pages = max(1, workload['postings'] // POSTINGS_PER_PAGE)
+    threads, seconds = _timed(lambda: sum(len(parser.parse_thread_list(page)[0]) for _ in range(pages)))
+    return threads, seconds
+
+def bench_parse_comments(workload, backend):
+    comments = seconds = 0
+    for chunk, size in _chunks(workload['postings']):
+        pages, _ = generate_thread_pages(30000000, size, per_page=POSTINGS_PER_PAGE, seed=chunk)
+        parsed, elapsed = _timed(lambda: sum(len(parser.parse_comments(page, "2024-01-01", backend)[0])
+                                             for page in pages))
+        comments += parsed
+        seconds += elapsed
+    return comments, seconds
+
+def bench_extractor(workload, name):
+    extract = extractor_functions()[name]
+    make_input = _EXTRACTOR_INPUTS.get(name, extractors.clean_text)
+    items = seconds = 0
+    for chunk, size in _chunks(workload['postings']):
+        inputs = [make_input(text) for text in generate_postings(size, seed=chunk)]
+        _, elapsed = _timed(lambda: [extract(value) for value in inputs])
+        items += size
+        seconds += elapsed
+    return items, seconds
+
+def bench_merge_thread_files(workload):
+    data_dir = os.path.join(workload['scratch'], "merge")
+    shutil.rmtree(data_dir, ignore_errors=True)
+    _redirect_data_dirs(workload['threads_dir'], data_dir)
+    _, seconds = _timed(loader.merge_thread_files)
+    return workload['rows'], seconds
+
+def _feature_cache_path(output_dir, cached):
+    # A cold cache in the case's scratch directory: every text is looked up, extracted and stored
+    return os.path.join(output_dir, "feature_cache.sqlite") if cached else None
+
+def bench_run_transform_pipeline(workload, cached=False):
+    output_dir = os.path.join(workload['scratch'], "pipeline")
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    _, seconds = _timed(lambda: run_transform_pipeline(
+        workload['raw_dir'], os.path.join(output_dir, "structured"),
+        signature_index_path=os.path.join(output_dir, "signatures.npz"),
+        feature_cache_path=_feature_cache_path(output_dir, cached)))
+    return workload['rows'], seconds
+
+def bench_run_streaming_transform(workload, cached=False):
+    # From 10k postings on, the stream has several batches: the first is transformed on this
+    # thread, the others on the dataset writer's thread
+    output_dir = os.path.join(workload['scratch'], "streaming")
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.makedirs(output_dir)
+    _, seconds = _timed(lambda: run_streaming_transform(
+        datasets.iter_partitioned(workload['raw_dir'], STREAM_BATCH_ROWS), os.path.join(output_dir, "structured"),
+        feature_cache_path=_feature_cache_path(output_dir, cached)))
+    return workload['rows'], seconds
+
+def suite_cases() -> dict:
+    """
+    {case name: (function, extra arguments)}, in run order.
+    """
+    cases = {'parse_thread_list': (bench_parse_thread_list, ())}
+    for backend in ("bs4", "lxml"):
+        if parser.resolve_backend(backend) == backend:
+            cases[f'parse_comments[{backend}]'] = (bench_parse_comments, (backend,))
+    for name in extractor_functions():
+        cases[f'extractors.{name}'] = (bench_extractor, (name,))
+    cases['merge_thread_files'] = (bench_merge_thread_files, ())
+    cases['run_transform_pipeline'] = (bench_run_transform_pipeline, ())
+    cases['run_transform_pipeline[cached]'] = (bench_run_transform_pipeline, (True,))
+    cases['run_streaming_transform'] = (bench_run_streaming_transform, ())
+    cases['run_streaming_transform[cached]'] = (bench_run_streaming_transform, (True,))
+    return cases
+
+def _run_case(name, workload, repeat):
+    # Runs in a fresh process: peak RSS is this case's alone
+    function, args = suite_cases()[name]
+    reset_peak_rss()
+    best = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(repeat):
+            items, seconds = function(workload, *args)
+            best = seconds if best is None else min(best, seconds)
+    return {
+        'items': items,
+        'seconds': round(best, 4),
+        'items_per_sec': round(items / best, 1) if best else None,
+        'peak_rss_mib': round(peak_rss_mib(), 1),
+    }
+
+def prepare_files(workload):
+    """
+    Writes the synthetic thread files (MONTHS months) and merges them into the raw dataset
+    the pipeline case reads.
+    """
+    scratch = workload['scratch']
+    threads_dir = os.path.join(scratch, "threads")
+    os.makedirs(threads_dir)
+    months = min(MONTHS, workload['postings'])
+    per_month = -(-workload['postings'] // months)
+    _redirect_data_dirs(threads_dir, os.path.join(scratch, "data"))
+    write_thread_files(threads_dir, months, per_month)
+    loader.merge_thread_files()
+    workload.update(threads_dir=threads_dir, raw_dir=config.RAW_DATASET_DIR, rows=months * per_month)
+
+def load_results(results_path: str) -> list:
+    if not os.path.exists(results_path):
+        return []
+    with open(results_path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def find_baseline(results: list, postings: int) -> dict:
+    """
+    {case name: its result in the last passing run at the same scale that ran it}. A run of a
+    few cases (--cases) only moves the baseline of those.
+    """
+    baseline = {}
+    for record in results:
+        if record['postings'] == postings and record['passed']:
+            baseline.update(record['cases'])
+    return baseline
+
+def find_regressions(cases: dict, baseline: dict, threshold: float) -> list:
+    regressions = []
+    for name, result in cases.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        if result['seconds'] >= MIN_COMPARED_SECONDS and previous['items_per_sec'] and \
+                result['items_per_sec'] < previous['items_per_sec'] * (1 - threshold):
+            regressions.append(f"{name}: {result['items_per_sec']:,.0f} items/s, "
+                               f"was {previous['items_per_sec']:,.0f}")
+        growth = result['peak_rss_mib'] - previous['peak_rss_mib']
+        if growth > max(previous['peak_rss_mib'] * threshold, MIN_MEMORY_REGRESSION_MIB):
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mib']:.0f} MiB, "
+                               f"was {previous['peak_rss_mib']:.0f} MiB")
+    return regressions
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def _change(result, previous, key):
+    if not previous or not previous.get(key) or not result.get(key):
+        return ''
+    return f"{result[key] / previous[key] - 1:+.0%}"
+
+def print_table(cases: dict, baseline: dict):
+    print(f"{'case':<40} {'seconds':>8} {'items':>9} {'items/s':>11} {'vs base':>8} {'peak MiB':>9} {'vs base':>8}")
+    for name, result in cases.items():
+        previous = baseline.get(name)
+        rate = '' if result['items_per_sec'] is None else f"{result['items_per_sec']:,.0f}"
+        print(f"{name:<40} {result['seconds']:>8.2f} {result['items']:>9} {rate:>11} "
+              f"{_change(result, previous, 'items_per_sec'):>8} {result['peak_rss_mib']:>9.1f} "
+              f"{_change(result, previous, 'peak_rss_mib'):>8}")
+
+def run_suite(postings, repeat=1, threshold=REGRESSION_THRESHOLD, results_path=RESULTS_PATH, selected=None,
+              record=True) -> bool:
+    """
+    Runs the cases whose name contains one of `selected` (all by default), compares them with
+    the baseline and appends the run to results_path. Returns whether no case regressed.
+    """
+    names = [name for name in suite_cases() if not selected or any(part in name for part in selected)]
+    if not names:
+        raise ValueError(f"No benchmark case matches {selected}")
+    results = load_results(results_path)
+    baseline = find_baseline(results, postings)
+    print(f"{len(names)} cases at {postings:,} postings, "
+          f"{sum(name in baseline for name in names)} with a baseline in {results_path}")
+
+    context = multiprocessing.get_context("spawn")
+    cases = {}
+    with tempfile.TemporaryDirectory() as scratch:
+        workload = {'postings': postings, 'scratch': scratch}
+        if any(name.split('[')[0] in ('merge_thread_files', 'run_transform_pipeline', 'run_streaming_transform')
+               for name in names):
+            _, seconds = _timed(lambda: prepare_files(workload))
+            print(f"Wrote {workload['rows']:,} postings in thread files and the raw dataset ({seconds:.1f}s)")
+        for name in names:
+            with context.Pool(1) as pool:
+                cases[name] = pool.apply(_run_case, (name, workload, repeat))
+            print(f"  {name}: {cases[name]['seconds']:.2f}s", flush=True)
+
+    print_table(cases, baseline)
+    regressions = find_regressions(cases, baseline, threshold)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if record:
+        os.makedirs(os.path.dirname(results_path) or '.', exist_ok=True)
+        with open(results_path, 'a') as f:
+            f.write(json.dumps({
+                'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+                'commit': _git_commit(),
+                'python': sys.version.split()[0],
+                'postings': postings,
+                'repeat': repeat,
+                'passed': not regressions,
+                'regressions': regressions,
+                'cases': cases,
+            }) + '\n')
+        print(f"Results appended to {results_path}")
+    return not regressions
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Offline benchmark suite for the ETL hot paths.")
+    arg_parser.add_argument("--postings", type=int, default=10_000, help="Synthetic corpus size (10k to 10M).")
+    arg_parser.add_argument("--repeat", type=int, default=1, help="Runs per case; the fastest is kept.")
+    arg_parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD,
+                            help="Allowed throughput loss / peak RSS growth against the baseline (0.2 = 20%%).")
+    arg_parser.add_argument("--results", default=RESULTS_PATH, help="JSON Lines file the runs are appended to.")
+    arg_parser.add_argument("--cases", nargs="+", help="Only run cases whose name contains one of these.")
+    arg_parser.add_argument("--no-record", action="store_true", help="Compare with the baseline without recording the run.")
+    args = arg_parser.parse_args()
+    passed = run_suite(args.postings, args.repeat, args.threshold, args.results, args.cases, not args.no_record)
+    raise SystemExit(0 if passed else 1)
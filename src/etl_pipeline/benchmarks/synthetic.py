@@ -0,0 +1,150 @@
+import html
+import random
+import re
+from datetime import date
+from src.etl_pipeline.transform.config import SKILL_KEYWORDS, ROLE_KEYWORDS
+
+# Synthetic "Who is hiring" data for offline benchmarks: posting texts shaped like real
+# top-level comments and HN pages in the markup parser.py expects.
+
+_COMPANY_PREFIXES = ["Acme", "Nimbus", "Quant", "Blue", "Orbit", "Vector", "Pixel", "Iron", "Lumen", "Delta"]
+_COMPANY_SUFFIXES = ["Labs", "AI", "Systems", "Health", "Robotics", "Pay", "Cloud", "Data", "Bio", "Works"]
+_LEVELS = ["Senior", "Staff", "Junior", "Lead", "Principal", "", "", ""]
+_TITLES = ["Software Engineer", "Backend Engineer", "Frontend Engineer", "Data Scientist",
+           "ML Engineer", "SRE", "Mobile Engineer", "Full-Stack Engineer", "Engineering Manager"]
+_LOCATIONS = ["San Francisco, CA", "NYC", "London", "Berlin", "Remote (US)", "Remote worldwide",
+              "Seattle", "Amsterdam", "Austin, TX", "Toronto"]
+_ARRANGEMENTS = ["REMOTE", "ONSITE", "Hybrid", "REMOTE or ONSITE"]
+_EXTRAS = [
+    "We are a YC (W21) company backed by top investors.",
+    "We raised our Series B last year and are growing fast.",
+    "Competitive salary and equity, plus full benefits.",
+    "Visa sponsorship and relocation available.",
+    "We build blockchain infrastructure for DeFi protocols.",
+    "You have 5+ years of experience shipping production systems.",
+    "Our stack runs on Kubernetes in AWS with Terraform.",
+    "We are an early-stage startup; the founder is an ex-Google engineer.",
+]
+_SALARIES = ["$120k - $160k", "$150,000 - $190,000", "100-140k", "$180k+", "from $90k",
+             "£70k - £90k", "€65k-€85k", "$70/hr", "$60-80/hr", "€5,000/month", "USD 140,000 - 170,000",
+             "CHF 120k - 150k", "$200k base + $20k signing bonus", "", "", ""]
+_FILLER = ("We care about craftsmanship, small teams and shipping often. You will own features end to end, "
+           "work closely with product and design, and help shape our engineering culture.")
+# Some real postings paste a whole job description; they dominate the regex cost
+LONG_POSTING_RATE = 0.02
+LONG_POSTING_FILLERS = (10, 30)
+
+def _all_keywords():
+    return [v for variations in SKILL_KEYWORDS.values() for v in variations] + \
+           [k for keywords in ROLE_KEYWORDS.values() for k in keywords]
+
+_KEYWORDS = _all_keywords()
+
+def generate_posting(rng: random.Random) -> str:
+    """
+    One synthetic posting: "Company | Role | Location | Arrangement | Salary" header and body.
+    """
+    company = f"{rng.choice(_COMPANY_PREFIXES)} {rng.choice(_COMPANY_SUFFIXES)}"
+    role = f"{rng.choice(_LEVELS)} {rng.choice(_TITLES)}".strip()
+    header = [company, role, rng.choice(_LOCATIONS), rng.choice(_ARRANGEMENTS)]
+    salary = rng.choice(_SALARIES)
+    if salary:
+        header.append(salary)
+
+    stack = ", ".join(rng.sample(_KEYWORDS, rng.randint(3, 10)))
+    paragraphs = [
+        " | ".join(header),
+        f"Tech stack: {stack}.",
+        " ".join(rng.sample(_EXTRAS, rng.randint(1, 3))),
+        " ".join([_FILLER] * rng.randint(*(LONG_POSTING_FILLERS if rng.random() < LONG_POSTING_RATE else (1, 4)))),
+        f"Apply at https://example.com/jobs/{rng.randint(1000, 9999)}",
+    ]
+    return "\n".join(paragraphs)
+
+def generate_postings(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    return [generate_posting(rng) for _ in range(n)]
+
+_URL_PATTERN = re.compile(r'https?://[^\s<]+')
+
+def _comment_html(paragraph):
+    # HN escapes comment text and turns URLs into nofollow links
+    return _URL_PATTERN.sub(lambda m: f'<a href="{m.group(0)}" rel="nofollow">{m.group(0)}</a>', html.escape(paragraph))
+
+def _comment_row(comment_id, user, text, indent):
+    paragraphs = text.split("\n")
+    body = _comment_html(paragraphs[0]) + "".join(f"<p>{_comment_html(p)}</p>" for p in paragraphs[1:])
+    return (
+        f'<tr class="athing comtr" id="{comment_id}"><td><table border="0"><tr>'
+        f'<td class="ind" indent="{indent}"><img src="s.gif" height="1" width="{indent * 40}"></td>'
+        f'<td valign="top" class="votelinks"><center><a id="up_{comment_id}" href="vote?id={comment_id}&amp;how=up">'
+        f'<div class="votearrow" title="upvote"></div></a></center></td>'
+        f'<td class="default"><div style="margin-top:2px; margin-bottom:-10px;"><span class="comhead">'
+        f'<a href="user?id={user}" class="hnuser">{user}</a> '
+        f'<span class="age" title="2024-01-01T16:00:00"><a href="item?id={comment_id}">3 hours ago</a></span> '
+        f'<span id="unv_{comment_id}"></span><span class="navs"> | <a href="#" class="clicky">next</a></span>'
+        f'</span></div><br><div class="comment"><div class="commtext c00">{body}</div>'
+        f'<div class="reply"><p><font size="1"><u><a href="reply?id={comment_id}" rel="nofollow">reply</a></u></font></p></div>'
+        f'</div></td></tr></table></td></tr>'
+    )
+
+def render_thread_page(thread_id, comments, page=1, has_more=False) -> str:
+    """
+    HN item page for a thread. comments: list of (comment_id, user, text, indent).
+    """
+    rows = "".join(_comment_row(*comment) for comment in comments)
+    more = f'<tr><td><a href="item?id={thread_id}&amp;p={page + 1}" class="morelink" rel="next">More</a></td></tr>' if has_more else ""
+    return (
+        '<html lang="en" op="item"><head><title>Ask HN: Who is hiring? | Hacker News</title></head><body>'
+        '<center><table id="hnmain" border="0" cellpadding="0" cellspacing="0" width="85%">'
+        f'<tr><td><table class="fatitem" border="0"><tr class="athing" id="{thread_id}"><td class="title">'
+        f'<span class="titleline"><a href="item?id={thread_id}">Ask HN: Who is hiring?</a></span></td></tr></table></td></tr>'
+        f'<tr><td><table border="0" class="comment-tree">{rows}{more}</table></td></tr>'
+        '</table></center></body></html>'
+    )
+
+def generate_thread_pages(thread_id, num_comments, per_page=100, replies_per_comment=1, seed=0):
+    """
+    Pages for one synthetic thread, each with per_page top-level postings plus replies.
+    Returns (pages, top_level_comment_count).
+    """
+    rng = random.Random(seed + int(thread_id))
+    pages = []
+    next_id = int(thread_id) + 1
+    num_pages = max(1, -(-num_comments // per_page))
+    for page in range(1, num_pages + 1):
+        comments = []
+        for _ in range(min(per_page, num_comments - (page - 1) * per_page)):
+            comments.append((next_id, f"user{next_id % 997}", generate_posting(rng), 0))
+            next_id += 1
+            for _ in range(replies_per_comment):
+                comments.append((next_id, f"user{next_id % 991}", "> quoted\nThanks, applied!", 1))
+                next_id += 1
+        pages.append(render_thread_page(thread_id, comments, page, has_more=page < num_pages))
+    return pages, num_comments
+
+def render_submissions_page(threads, next_params=None) -> str:
+    """
+    whoishiring submissions page. threads: list of (thread_id, date) pairs.
+    """
+    rows = "".join(
+        f'<tr class="athing submission" id="{thread_id}"><td class="title"><span class="titleline">'
+        f'<a href="item?id={thread_id}">Ask HN: Who is hiring? ({d.strftime("%B %Y")})</a></span></td></tr>'
+        f'<tr><td class="subtext"><span class="age"><a href="item?id={thread_id}">1 month ago</a></span></td></tr>'
+        for thread_id, d in threads
+    )
+    more = f'<tr><td><a href="{html.escape(next_params)}" class="morelink" rel="next">More</a></td></tr>' if next_params else ""
+    return f'<html><body><table id="hnmain"><tr><td><table>{rows}{more}</table></td></tr></table></body></html>'
+
+def generate_thread_list(num_threads, start_id=30000000, end=date(2025, 12, 1)):
+    """
+    (thread_id, date) pairs for num_threads consecutive months ending at `end`.
+    """
+    threads = []
+    year, month = end.year, end.month
+    for i in range(num_threads):
+        threads.append((start_id - i * 300000, date(year, month, 1)))
+        month -= 1
+        if month == 0:
+            year, month = year - 1, 12
+    return threads
@@ -0,0 +1,185 @@
+import argparse
+import hashlib
+import os
+from typing import List
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import storage
+from src.etl_pipeline.transform.pipeline import OUTPUT_DIR
+
+# Memory-mapped access to a partitioned dataset (structured in any storage profile, or raw).
+#
+# The parquet files are copied once per dataset version into one uncompressed Arrow IPC
+# (Feather v2) file next to the dataset, <dataset>.arrow, with raw_text joined back from a
+# side table and the partition keys as columns. Opening it maps the file: no column is read
+# until it is used, and then only the pages touched. Selecting columns, and rows by a
+# year/month range, are slices of the mapped buffers; DataFrames get pyarrow-backed dtypes
+# over the same buffers (pd.ArrowDtype), so raw_text stays in the file as Arrow strings
+# instead of becoming Python objects and is only read for the rows looked at.
+#
+# The file records the source files' version and is rebuilt, a batch at a time, when the
+# dataset is rewritten.
+
+ARROW_SUFFIX = ".arrow"
+VERSION_KEY = b'source_version'
+_ROW_COLUMN = '__row'
+
+def arrow_path(dataset_path: str) -> str:
+    return os.path.normpath(dataset_path) + ARROW_SUFFIX
+
+def source_version(dataset_path: str) -> str:
+    """
+    Key of a dataset's current files and of its raw_text side table (path, size, modification
+    time; datasets are rewritten, never edited in place). Computed from file metadata only.
+    """
+    digest = hashlib.sha256()
+    for base in (dataset_path, storage.text_path(dataset_path)):
+        if not os.path.isdir(base):
+            continue
+        for path in datasets.dataset_files(base):
+            stat = os.stat(path)
+            digest.update(f"{os.path.relpath(path, dataset_path)}|{stat.st_size}|{stat.st_mtime_ns}".encode('utf-8'))
+    return digest.hexdigest()[:16]
+
+def _with_text(tables, dataset_path: str, batch_rows: int):
+    # The side table is written from the same frame and partitioning: its batches line up
+    texts = datasets.iter_tables(storage.text_path(dataset_path), batch_rows, ['id', 'raw_text'])
+    for table in tables:
+        text = next(texts)
+        if not table.column('id').equals(text.column('id')):
+            raise ValueError(f"{storage.text_path(dataset_path)} is not in the order of {dataset_path}")
+        yield table.append_column('raw_text', text.column('raw_text'))
+
+def build_arrow(dataset_path: str, batch_rows: int = datasets.ROW_GROUP_ROWS) -> str:
+    """
+    Copies the dataset into its Arrow file, a batch at a time. Returns the file's path.
+    """
+    stored = datasets.stored_columns(dataset_path)
+    split_text = 'raw_text' not in stored and os.path.isdir(storage.text_path(dataset_path))
+    tables = datasets.iter_tables(dataset_path, batch_rows, stored + datasets.PARTITION_KEYS)
+    if split_text:
+        tables = _with_text(tables, dataset_path, batch_rows)
+
+    path = arrow_path(dataset_path)
+    tmp_path = f"{path}.tmp"
+    writer = None
+    try:
+        for table in tables:
+            if writer is None:
+                # Our own metadata only: the pandas metadata describes the parquet files' index
+                schema = table.schema.with_metadata({VERSION_KEY: source_version(dataset_path).encode('utf-8')})
+                writer = pa.ipc.new_file(tmp_path, schema)
+            writer.write_table(table.replace_schema_metadata(schema.metadata))
+        if writer is None:
+            raise FileNotFoundError(f"No parquet files in {dataset_path}")
+        writer.close()
+    except BaseException:
+        if writer is not None:
+            writer.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    os.replace(tmp_path, path)
+    return path
+
+def _arrow_dtype(data_type: pa.DataType):
+    # Dictionary columns (compact currency / job_category) stay pandas categoricals
+    return None if pa.types.is_dictionary(data_type) else pd.ArrowDtype(data_type)
+
+class MappedDataset:
+    """
+    A dataset's Arrow file, memory-mapped: column and row selections without copies.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        self.table = pa.ipc.open_file(pa.memory_map(path)).read_all()
+
+    def __len__(self):
+        return self.table.num_rows
+
+    @property
+    def schema(self) -> pa.Schema:
+        return self.table.schema
+
+    @property
+    def compact(self) -> bool:
+        return 'flags' in self.table.column_names
+
+    @property
+    def index_columns(self) -> List[str]:
+        # The stored pandas index (datasets always store it)
+        return [c for c in self.table.column_names if c.startswith('__index_level_')]
+
+    def _rows(self, filters) -> np.ndarray:
+        # Only the filtered columns are scanned (e.g. year / month); an expression scans all
+        table = self.table
+        if not isinstance(filters, ds.Expression):
+            terms = [term for group in filters for term in (group if isinstance(group, list) else [group])]
+            table = table.select(list(dict.fromkeys(term[0] for term in terms)))
+            filters = pq.filters_to_expression(filters)
+        positions = table.append_column(_ROW_COLUMN, pa.array(np.arange(len(self), dtype=np.int64)))
+        return ds.dataset(positions).to_table(columns=[_ROW_COLUMN], filter=filters).column(0).to_numpy()
+
+    def select(self, columns: List[str] = None, filters=None) -> pa.Table:
+        """
+        The stored columns (all but the partition keys by default) of the rows matching
+        filters (pandas-style [('year', '>=', 2023), ...] or a pyarrow expression).
+        Rows are a zero-copy slice when they are contiguous (e.g. a date range), else copied.
+        """
+        if columns is None:
+            columns = [c for c in self.table.column_names
+                       if c not in datasets.PARTITION_KEYS and c not in self.index_columns]
+        table = self.table.select(columns)
+        if filters is None:
+            return table
+        rows = self._rows(filters)
+        if len(rows) == 0 or rows[-1] - rows[0] + 1 == len(rows):
+            return table.slice(rows[0] if len(rows) else 0, len(rows))
+        return table.take(rows)
+
+    def to_pandas(self, columns: List[str] = None, filters=None, expand: bool = True) -> pd.DataFrame:
+        """
+        select() as a DataFrame of pyarrow-backed columns sharing the mapped buffers, on the
+        stored index, as storage.read_structured restores it.
+        columns are standard column names, as in storage.read_structured; compact data is
+        expanded back to them (the flag columns and tech_stack are then decoded copies)
+        unless expand=False.
+        """
+        if columns is None:
+            read_columns = self.select().column_names
+        else:
+            read_columns = storage.storage_columns(list(columns), self.table.column_names)
+        table = self.select(read_columns + self.index_columns, filters)
+        df = table.drop_columns(self.index_columns).to_pandas(types_mapper=_arrow_dtype)
+        if self.index_columns:
+            index = [table.column(c).to_numpy() for c in self.index_columns]
+            df.index = pd.MultiIndex.from_arrays(index) if len(index) > 1 else pd.Index(index[0])
+        if self.compact and expand:
+            return storage.expand_frame(df, list(columns) if columns is not None else None)
+        return df
+
+def open_dataset(dataset_path: str = OUTPUT_DIR, rebuild: bool = False) -> MappedDataset:
+    """
+    Maps the dataset's Arrow file, building it first if it is missing or older than the
+    dataset's files.
+    """
+    path = arrow_path(dataset_path)
+    if not rebuild and os.path.exists(path):
+        with pa.memory_map(path) as source:
+            metadata = pa.ipc.open_file(source).schema.metadata or {}
+        if metadata.get(VERSION_KEY) == source_version(dataset_path).encode('utf-8'):
+            return MappedDataset(path)
+    print(f"Copying {dataset_path} to {path}...")
+    return MappedDataset(build_arrow(dataset_path))
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Copy a partitioned dataset into a memory-mappable Arrow file.")
+    arg_parser.add_argument("--input", default=OUTPUT_DIR, help="Partitioned dataset to copy.")
+    arg_parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the Arrow file is current.")
+    args = arg_parser.parse_args()
+    mapped = open_dataset(args.input, args.rebuild)
+    print(f"{mapped.path}: {len(mapped)} rows, {os.path.getsize(mapped.path) / 2**20:.0f} MiB")
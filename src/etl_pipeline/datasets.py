@@ -0,0 +1,224 @@
+import os
+import re
+import glob
+import shutil
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Partitioned parquet layout shared by the raw and structured outputs:
+#
+#   <base_dir>/year=2024/month=03/part-0.parquet
+#
+# Months are zero-padded so directory order is chronological; readers still see both keys
+# as integers, e.g. pd.read_parquet(base_dir, filters=[('year', '>=', 2023)]) only opens
+# the matching partitions and columns=[...] only decodes the requested columns.
+
+PARTITION_KEYS = ['year', 'month']
+PARTITION_SCHEMA = pa.schema([('year', pa.int16()), ('month', pa.string())])
+ROW_GROUP_ROWS = 64 * 1024
+BACKUP_SUFFIX = ".old"  # previous contents of a directory while it is being replaced
+
+def _partition_columns(table: pa.Table, date_column: str) -> pa.Table:
+    dates = table.column(date_column)
+    if pa.types.is_string(dates.type) or pa.types.is_large_string(dates.type):
+        dates = pc.strptime(dates, format='%Y-%m-%d', unit='s')  # raw thread_date strings
+    year = pc.year(dates).cast(pa.int16())
+    month = pc.utf8_lpad(pc.month(dates).cast(pa.string()), 2, '0')
+    return table.append_column('year', year).append_column('month', month)
+
+def _replace_dir(tmp_dir: str, base_dir: str):
+    # Swap the finished dataset (or month) in: readers see the old or the new files, never a
+    # half-written directory. Two renames, not one atomic step: a crash between them leaves
+    # only the backup, which _recover_dir moves back on the next read or write.
+    old_dir = f"{base_dir}{BACKUP_SUFFIX}"
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if os.path.exists(base_dir):
+        os.rename(base_dir, old_dir)
+    os.rename(tmp_dir, base_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+def _recover_dir(base_dir: str):
+    # Backups left by an interrupted _replace_dir, of the dataset or of one of its months:
+    # restored if their directory is missing, else stale and deleted
+    backups = [f"{base_dir}{BACKUP_SUFFIX}"] + glob.glob(os.path.join(base_dir, "year=*", f"month=*{BACKUP_SUFFIX}"))
+    for old_dir in backups:
+        if not os.path.isdir(old_dir):
+            continue
+        target_dir = old_dir[:-len(BACKUP_SUFFIX)]
+        if os.path.exists(target_dir):
+            shutil.rmtree(old_dir, ignore_errors=True)
+        else:
+            os.rename(old_dir, target_dir)
+
+def _replace_partitions(tmp_dir: str, base_dir: str):
+    # Swap in each month of the finished dataset; the other months of base_dir stay as they are
+    os.makedirs(base_dir, exist_ok=True)
+    for month_dir in sorted(glob.glob(os.path.join(tmp_dir, "year=*", "month=*"))):
+        relative = os.path.relpath(month_dir, tmp_dir)
+        os.makedirs(os.path.dirname(os.path.join(base_dir, relative)), exist_ok=True)
+        _replace_dir(month_dir, os.path.join(base_dir, relative))
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+def write_partitioned(batches, schema: pa.Schema, base_dir: str, date_column: str,
+                      buffer_row_groups: bool = False, replace_partitions: bool = False) -> int:
+    """
+    Streams record batches (or tables) of `schema` into a year=/month= dataset at base_dir,
+    replacing any previous contents. Row order is preserved within each month.
+    buffer_row_groups holds rows back until a row group is full (or the input ends) instead of
+    writing one row group per incoming batch; it costs memory up to the whole input.
+    replace_partitions only replaces the months present in the input, keeping the others.
+    Returns the number of rows written.
+    """
+    written = 0
+
+    def with_partitions():
+        nonlocal written
+        for batch in batches:
+            table = batch if isinstance(batch, pa.Table) else pa.Table.from_batches([batch])
+            written += table.num_rows
+            yield from _partition_columns(table.cast(schema), date_column).to_batches()
+
+    full_schema = schema.append(pa.field('year', pa.int16())).append(pa.field('month', pa.string()))
+    reader = pa.RecordBatchReader.from_batches(full_schema, with_partitions())
+
+    _recover_dir(base_dir)
+    tmp_dir = f"{base_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    try:
+        ds.write_dataset(
+            reader, tmp_dir, format='parquet',
+            partitioning=ds.partitioning(PARTITION_SCHEMA, flavor='hive'),
+            basename_template='part-{i}.parquet',
+            min_rows_per_group=ROW_GROUP_ROWS if buffer_row_groups else 0,
+            max_rows_per_group=ROW_GROUP_ROWS,
+            file_options=ds.ParquetFileFormat().make_write_options(write_statistics=True),
+            preserve_order=True,
+        )
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    if replace_partitions:
+        _replace_partitions(tmp_dir, base_dir)
+    else:
+        _replace_dir(tmp_dir, base_dir)
+    return written
+
+def write_partitioned_frame(df: pd.DataFrame, base_dir: str, date_column: str) -> int:
+    """
+    DataFrame version of write_partitioned. A non-default index is stored and restored on read.
+    """
+    table = pa.Table.from_pandas(df)
+    # The frame is in memory anyway: buffering whole row groups makes a month's files depend
+    # only on its own rows, so unchanged months are rewritten byte-identical (see transform/cube.py)
+    return write_partitioned(table.to_batches(), table.schema, base_dir, date_column, buffer_row_groups=True)
+
+def _has_null_type(data_type: pa.DataType) -> bool:
+    # Inferred from a column with no values so far, e.g. lists that were all empty
+    if pa.types.is_null(data_type):
+        return True
+    if pa.types.is_dictionary(data_type):
+        return _has_null_type(data_type.value_type)
+    return any(_has_null_type(data_type.field(i).type) for i in range(data_type.num_fields))
+
+def write_partitioned_frames(frames, base_dir: str, date_column: str, replace_partitions: bool = False) -> int:
+    """
+    Streaming version of write_partitioned_frame for DataFrames of the same columns, written
+    one row group per frame. Indexes are always stored, a RangeIndex included.
+    The schema is inferred from the leading frames: they are held back only while some
+    column has had no values yet (e.g. no salary in the first frames).
+    Returns the number of rows written; nothing is written if no frame comes.
+    """
+    frames = iter(frames)
+    leading = []
+    for df in frames:
+        leading.append(pa.Table.from_pandas(df, preserve_index=True))
+        schema = pa.unify_schemas([table.schema for table in leading], promote_options='permissive')
+        if not any(_has_null_type(field.type) for field in schema):
+            break
+    if not leading:
+        return 0
+
+    def tables():
+        yield from leading
+        leading.clear()
+        for df in frames:
+            yield pa.Table.from_pandas(df, preserve_index=True)
+
+    return write_partitioned(tables(), schema, base_dir, date_column, replace_partitions=replace_partitions)
+
+def _natural_key(path: str):
+    return [int(token) if token.isdigit() else token for token in re.split(r'(\d+)', path)]
+
+def dataset_files(path: str):
+    """
+    Parquet files under path in chronological order: partition directories by year/month,
+    flat directories (e.g. data/threads) by file name.
+    """
+    _recover_dir(path)
+    files = glob.glob(os.path.join(path, "**", "*.parquet"), recursive=True)
+    return sorted(files, key=_natural_key)
+
+def _open_dataset(path: str) -> ds.Dataset:
+    _recover_dir(path)
+    if os.path.isdir(path):
+        return ds.dataset(dataset_files(path), format='parquet',
+                          partitioning=ds.HivePartitioning.discover(), partition_base_dir=path)
+    return ds.dataset(path, format='parquet')
+
+def stored_columns(path: str):
+    """
+    Columns stored in the dataset's files (no partition keys), without reading any data.
+    """
+    return [name for name in _open_dataset(path).schema.names if name not in PARTITION_KEYS]
+
+def read_partitioned(path: str, columns=None, filters=None) -> pd.DataFrame:
+    """
+    Reads a partitioned dataset (or a single parquet file) in chronological order.
+    columns: columns to decode (default: every stored column, without the partition keys).
+    filters: pyarrow expression or pandas-style [('year', '>=', 2023), ...], pushed down to
+    partition pruning and row group statistics.
+    A stored pandas index is always restored.
+    """
+    dataset = _open_dataset(path)
+    stored = [name for name in dataset.schema.names if name not in PARTITION_KEYS]
+    if columns is None:
+        columns = stored
+    else:
+        columns = list(columns) + [name for name in stored if name.startswith('__index_level_') and name not in columns]
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+    return dataset.to_table(columns=columns, filter=filters).to_pandas()
+
+def iter_tables(path: str, batch_rows: int = ROW_GROUP_ROWS, columns=None, filters=None):
+    """
+    Arrow tables of exactly batch_rows rows (the last one fewer), in chronological order.
+    columns may include the partition keys.
+    """
+    dataset = _open_dataset(path)
+    if columns is None:
+        columns = [name for name in dataset.schema.names if name not in PARTITION_KEYS]
+    if filters is not None and not isinstance(filters, ds.Expression):
+        filters = pq.filters_to_expression(filters)
+    # Files hold fewer rows than a batch (a month of postings): fill each batch across files.
+    # The scanner's default readahead would hold several files in memory at once.
+    buffered = None
+    for batch in dataset.to_batches(columns=columns, filter=filters, batch_size=batch_rows, fragment_readahead=1,
+                                    batch_readahead=1, use_threads=False):
+        table = pa.Table.from_batches([batch])
+        buffered = table if buffered is None else pa.concat_tables([buffered, table])
+        while buffered.num_rows >= batch_rows:
+            yield buffered.slice(0, batch_rows)
+            buffered = buffered.slice(batch_rows)
+    if buffered is not None and buffered.num_rows:
+        yield buffered
+
+def iter_partitioned(path: str, batch_rows: int = ROW_GROUP_ROWS, columns=None, filters=None):
+    """
+    read_partitioned one DataFrame of at most batch_rows rows at a time, in the same order.
+    A stored pandas index is not restored; use read_partitioned for indexed datasets.
+    """
+    for table in iter_tables(path, batch_rows, columns, filters):
+        yield table.to_pandas()
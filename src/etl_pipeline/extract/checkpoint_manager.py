@@ -1,38 +1,146 @@
 import json
 import os
 import logging
+import threading
 from . import config
 
 logger = logging.getLogger(__name__)
 
-def load_checkpoint():
+def _fsync_dir(path):
+    # Makes a rename durable; not supported on every platform
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def _write_durable(path, data):
     """
-    Loads the checkpoint state from disk.
-    Returns a set of processed thread IDs.
+    Atomically replaces path with data: write a temp file, fsync it, rename over path.
     """
-    if os.path.exists(config.CHECKPOINT_FILE):
-        try:
-            with open(config.CHECKPOINT_FILE, 'r') as f:
-                data = json.load(f)
-                return set(data.get('processed_threads', []))
-        except Exception as e:
-            logger.error(f"Failed to load checkpoint: {e}")
-            return set()
-    return set()
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    _fsync_dir(os.path.dirname(os.path.abspath(path)))
 
-def save_checkpoint(processed_threads):
+class CheckpointJournal:
     """
-    Saves the list of processed thread IDs to disk.
+    Crash-safe extraction progress.
+    State lives in a snapshot (checkpoint.json, replaced atomically) plus an append-only
+    journal next to it (checkpoint.json.journal) with one fsynced JSON record per line:
+      {"op": "page", "thread": id, "page": n, "more": bool, "comments": [...]}
+      {"op": "done", "thread": id}
+    Page records let a thread resume at the page after the last one recorded.
+    Every `compact_every` records the journal is folded into a new snapshot and truncated.
     """
-    try:
+    def __init__(self, path=None, compact_every=None):
+        self.path = path or config.CHECKPOINT_FILE
+        self.journal_path = f"{self.path}.journal"
+        self.compact_every = compact_every or config.CHECKPOINT_COMPACT_EVERY
+        self.processed_threads = set()
+        self.pages = {}  # thread_id -> {page: (has_more, comments)}
+        self.lock = threading.Lock()
+        self._journal = None
+        self._records = 0
+
+    def load(self):
+        """
+        Reads the snapshot, replays the journal and compacts both into a fresh snapshot.
+        A torn last journal line (crash mid-append) is dropped.
+        """
+        if os.path.exists(self.path):
+            # The snapshot is only ever replaced atomically, so a parse error is real corruption
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            self.processed_threads = set(data.get('processed_threads', []))
+            for thread_id, pages in data.get('pages', {}).items():
+                self.pages[thread_id] = {page: (more, comments) for page, more, comments in pages}
+
+        if os.path.exists(self.journal_path):
+            replayed = 0
+            with open(self.journal_path, 'r') as f:
+                for line_number, line in enumerate(f, 1):
+                    try:
+                        self._apply(json.loads(line))
+                    except ValueError:
+                        logger.warning(f"Ignoring torn checkpoint journal record at line {line_number}.")
+                        break
+                    replayed += 1
+            logger.info(f"Replayed {replayed} checkpoint journal records.")
+
+        self.compact()
+        return self
+
+    def _apply(self, record):
+        thread_id = record['thread']
+        if record['op'] == 'done':
+            self.processed_threads.add(thread_id)
+            self.pages.pop(thread_id, None)
+        elif record['op'] == 'page':
+            self.pages.setdefault(thread_id, {})[record['page']] = (record['more'], record['comments'])
+
+    def _append(self, record):
+        with self.lock:
+            self._apply(record)
+            if self._journal is None:
+                self._journal = open(self.journal_path, 'a')
+            self._journal.write(json.dumps(record) + "\n")
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            self._records += 1
+            if self._records >= self.compact_every:
+                self._compact_locked()
+
+    def record_page(self, thread_id, page, comments, has_more):
+        self._append({'op': 'page', 'thread': thread_id, 'page': page, 'more': has_more, 'comments': comments})
+
+    def mark_processed(self, thread_id):
+        self._append({'op': 'done', 'thread': thread_id})
+
+    def resume(self, thread_id):
+        """
+        Returns (comments_so_far, next_page) for a partially fetched thread.
+        next_page is None when the last recorded page was the final one.
+        """
+        with self.lock:
+            pages = self.pages.get(thread_id, {})
+            comments = []
+            page = 1
+            # Only a gap-free run of pages from page 1 can be resumed
+            while page in pages:
+                has_more, page_comments = pages[page]
+                comments.extend(page_comments)
+                if not has_more:
+                    return comments, None
+                page += 1
+            return comments, page
+
+    def compact(self):
+        with self.lock:
+            self._compact_locked()
+
+    def _compact_locked(self):
         data = {
-            'processed_threads': list(processed_threads)
+            'processed_threads': sorted(self.processed_threads),
+            'pages': {
+                thread_id: [[page, more, comments] for page, (more, comments) in sorted(pages.items())]
+                for thread_id, pages in self.pages.items()
+            }
         }
-        with open(config.CHECKPOINT_FILE, 'w') as f:
-            json.dump(data, f)
+        # Snapshot first: until the rename the old snapshot + journal remain the valid state.
+        # A crash before the journal is truncated only replays records again, which is idempotent.
+        _write_durable(self.path, json.dumps(data))
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+        _write_durable(self.journal_path, "")
+        self._records = 0
         logger.info("Checkpoint saved.")
-    except Exception as e:
-        logger.error(f"Failed to save checkpoint: {e}")
 
 def load_threads_list():
     """
@@ -3,13 +3,32 @@ import os
 BASE_URL = "https://news.ycombinator.com"
 USER_SUBMISSIONS_URL = "https://news.ycombinator.com/submitted?id=whoishiring"
 RATE_LIMIT_DELAY = 3.0  # seconds
+# Concurrent fetch mode: worker threads share one token bucket
+FETCH_WORKERS = 4
+# Aggregate budget across all workers: the serial fetcher's pace (one request per 3.5-4.5s)
+# unless a faster rate is asked for (main.py --rate)
+RATE_LIMIT_REQUESTS_PER_SECOND = 0.25
+RATE_LIMIT_BURST = 1
 MAX_RETRIES = 5
 BACKOFF_FACTOR = 2
+# Comment page parser: "lxml" (fast, optional dependency) or "bs4" (BeautifulSoup html.parser)
+HTML_PARSER = "lxml"
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "data")
 CHECKPOINT_FILE = os.path.join(DATA_DIR, "checkpoint.json")
+CHECKPOINT_COMPACT_EVERY = 100  # journal records folded into the snapshot at a time
 THREADS_LIST_FILE = os.path.join(DATA_DIR, "threads_list.json")
 THREADS_DIR = os.path.join(DATA_DIR, "threads")
+# Merged raw dataset, partitioned by year=/month= of thread_date
+RAW_DATASET_DIR = os.path.join(DATA_DIR, "hn_jobs_raw")
+MERGE_BATCH_ROWS = 10000  # rows read per batch by the streaming merge
+# Raw HTML response cache (gzip bodies + ETag/Last-Modified sidecars)
+HTTP_CACHE_DIR = os.path.join(DATA_DIR, "http_cache")
+HTTP_CACHE_MAX_AGE = 24 * 3600  # seconds an archived thread's page is served without revalidation
+# The submissions listing and threads still taking comments (younger than LIVE_THREAD_DAYS)
+# are revalidated on every fetch; a 304 is still answered from the cache
+HTTP_CACHE_LIVE_MAX_AGE = None
+LIVE_THREAD_DAYS = 45
 
 # Ensure data directories exist
 os.makedirs(DATA_DIR, exist_ok=True)
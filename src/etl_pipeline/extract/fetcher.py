@@ -1,23 +1,64 @@
 import time
 import logging
 import random
+from datetime import datetime, timedelta
+from email.utils import parsedate_to_datetime
 import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 from . import config
+from .http_cache import CacheMiss
 
 logger = logging.getLogger(__name__)
 
+def _retry_after_seconds(response):
+    """
+    Parses a Retry-After header (delta-seconds or HTTP-date). Returns None if absent.
+    """
+    value = response.headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
 class HNFetcher:
-    def __init__(self):
+    def __init__(self, rate_limiter=None, base_url=config.BASE_URL, pool_size=10,
+                 cache=None, cache_max_age=config.HTTP_CACHE_MAX_AGE,
+                 live_max_age=config.HTTP_CACHE_LIVE_MAX_AGE, offline=False):
+        """
+        rate_limiter: shared TokenBucket for concurrent fetching. Without one, requests are
+        spaced by RATE_LIMIT_DELAY plus jitter as before.
+        cache: ResponseCache for raw HTML. Entries younger than cache_max_age seconds (pages
+        that still change: live_max_age, None to always revalidate) are served without a
+        request; older ones are revalidated with a conditional request.
+        offline: serve only from the cache (raises CacheMiss), never touch the network.
+        """
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.cache_max_age = cache_max_age
+        self.live_max_age = live_max_age
+        self.offline = offline
         self.session = requests.Session()
         self.session.headers.update({'User-Agent': config.USER_AGENT})
+        status_forcelist = [403, 429, 500, 502, 503, 504]
+        if rate_limiter:
+            # 429s are handled in fetch_url so the pause applies to every worker
+            status_forcelist.remove(429)
         retries = Retry(
             total=config.MAX_RETRIES,
             backoff_factor=config.BACKOFF_FACTOR,
-            status_forcelist=[403, 429, 500, 502, 503, 504],
+            status_forcelist=status_forcelist,
         )
-        self.session.mount('https://', HTTPAdapter(max_retries=retries))
+        adapter = HTTPAdapter(max_retries=retries, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.last_request_time = 0
 
     def _rate_limit(self):
@@ -28,29 +69,84 @@ class HNFetcher:
             time.sleep(delay - elapsed)
         self.last_request_time = time.time()
 
-    def fetch_url(self, url):
+    def fetch_url(self, url, live=False):
+        """
+        live: the page may still change (listing, current thread), cached for live_max_age only.
+        """
+        if self.cache is None:
+            return self._request(url).text
+
+        cached = self.cache.get(url)
+        if self.offline:
+            if cached is None:
+                raise CacheMiss(url)
+            return cached.body
+        if cached and cached.is_fresh(self.live_max_age if live else self.cache_max_age):
+            logger.info(f"Cache hit {url}")
+            return cached.body
+
+        response = self._request(url, cached.conditional_headers() if cached else None)
+        if response.status_code == 304 and cached:
+            logger.info(f"Not modified {url}")
+            self.cache.touch(cached)
+            return cached.body
+
+        self.cache.put(url, response.text,
+                       etag=response.headers.get('ETag'),
+                       last_modified=response.headers.get('Last-Modified'))
+        return response.text
+
+    def _request(self, url, headers=None):
+        if self.rate_limiter:
+            return self._request_limited(url, headers)
+
         self._rate_limit()
         try:
             logger.info(f"Fetching {url}")
-            response = self.session.get(url, timeout=10)
+            response = self.session.get(url, timeout=10, headers=headers)
             response.raise_for_status()
-            return response.text
+            return response
         except requests.RequestException as e:
             logger.error(f"Error fetching {url}: {e}")
             # Re-raise exception to let the caller handle the stop condition
             raise e
 
+    def _request_limited(self, url, headers=None):
+        try:
+            for attempt in range(config.MAX_RETRIES):
+                self.rate_limiter.acquire()
+                logger.info(f"Fetching {url}")
+                response = self.session.get(url, timeout=10, headers=headers)
+                if response.status_code == 429:
+                    delay = _retry_after_seconds(response)
+                    if delay is None:
+                        delay = config.BACKOFF_FACTOR ** (attempt + 1)
+                    self.rate_limiter.pause(delay)
+                    continue
+                response.raise_for_status()
+                return response
+            raise requests.HTTPError(f"Still rate limited after {config.MAX_RETRIES} attempts", response=response)
+        except requests.RequestException as e:
+            logger.error(f"Error fetching {url}: {e}")
+            # Re-raise exception to let the caller handle the stop condition
+            raise e
 
     def fetch_whoishiring_submissions(self, next_page_params=None):
         if next_page_params:
             # Ensure we don't double slash if base url ends with /
-            base = config.BASE_URL.rstrip('/')
+            base = self.base_url.rstrip('/')
             params = next_page_params.lstrip('/')
             url = f"{base}/{params}"
         else:
-            url = config.USER_SUBMISSIONS_URL
-        return self.fetch_url(url)
+            url = config.USER_SUBMISSIONS_URL.replace(config.BASE_URL, self.base_url, 1)
+        return self.fetch_url(url, live=True)
 
-    def fetch_thread(self, thread_id, page=1):
-        url = f"{config.BASE_URL}/item?id={thread_id}&p={page}"
-        return self.fetch_url(url)
+    def fetch_thread(self, thread_id, page=1, thread_date=None):
+        """
+        thread_date ('YYYY-MM-DD'): threads older than LIVE_THREAD_DAYS are archived and get
+        no new comments. Without it the thread is treated as live.
+        """
+        url = f"{self.base_url}/item?id={thread_id}&p={page}"
+        live = (thread_date is None
+                or datetime.strptime(thread_date, '%Y-%m-%d') > datetime.now() - timedelta(days=config.LIVE_THREAD_DAYS))
+        return self.fetch_url(url, live=live)
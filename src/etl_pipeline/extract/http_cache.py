@@ -0,0 +1,87 @@
+import gzip
+import hashlib
+import json
+import os
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class CacheMiss(LookupError):
+    """
+    Raised in offline mode when a URL has never been fetched.
+    """
+
+class CachedResponse:
+    def __init__(self, url, body, etag=None, last_modified=None, fetched_at=0.0):
+        self.url = url
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+
+    def is_fresh(self, max_age):
+        return max_age is not None and time.time() - self.fetched_at < max_age
+
+    def conditional_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+class ResponseCache:
+    """
+    Persistent raw HTML store keyed by URL.
+    Each entry is a gzip-compressed body plus a JSON sidecar with the validators
+    (ETag / Last-Modified) needed for conditional requests.
+    """
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+
+    def _paths(self, url):
+        key = hashlib.sha256(url.encode('utf-8')).hexdigest()
+        directory = os.path.join(self.cache_dir, key[:2])
+        return directory, os.path.join(directory, f"{key}.html.gz"), os.path.join(directory, f"{key}.json")
+
+    @staticmethod
+    def _write_atomic(path, data):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def get(self, url):
+        """
+        Returns the CachedResponse for url, or None.
+        """
+        _, body_path, meta_path = self._paths(url)
+        if not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                meta = json.load(f)
+            with gzip.open(body_path, 'rt', encoding='utf-8') as f:
+                body = f.read()
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable cache entry for {url}: {e}")
+            return None
+        return CachedResponse(url, body, meta.get('etag'), meta.get('last_modified'), meta.get('fetched_at', 0.0))
+
+    def put(self, url, body, etag=None, last_modified=None):
+        directory, body_path, meta_path = self._paths(url)
+        os.makedirs(directory, exist_ok=True)
+        # Body first: the sidecar marks the entry as complete
+        self._write_atomic(body_path, gzip.compress(body.encode('utf-8')))
+        meta = {'url': url, 'etag': etag, 'last_modified': last_modified, 'fetched_at': time.time()}
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
+
+    def touch(self, cached):
+        """
+        Marks an entry as revalidated (e.g. after a 304).
+        """
+        _, _, meta_path = self._paths(cached.url)
+        meta = {'url': cached.url, 'etag': cached.etag, 'last_modified': cached.last_modified, 'fetched_at': time.time()}
+        self._write_atomic(meta_path, json.dumps(meta).encode('utf-8'))
@@ -1,59 +1,26 @@
-import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
 import os
 import glob
 import logging
 from . import config
+from .. import datasets
 
 logger = logging.getLogger(__name__)
 
 def get_existing_ids():
     """
-    Scans the data directory for existing files and returns a set of processed IDs.
+    Reads the id column of the raw dataset and returns a set of processed IDs.
     """
-    # Check for both parquet and csv to be safe
-    all_files = glob.glob(os.path.join(config.DATA_DIR, "hn_jobs_raw_*.parquet"))
-    all_files.extend(glob.glob(os.path.join(config.DATA_DIR, "hn_jobs_raw_*.csv")))
-    
-    existing_ids = set()
-    for f in all_files:
-        try:
-            if f.endswith('.parquet'):
-                df = pd.read_parquet(f, columns=['id'])
-            else:
-                df = pd.read_csv(f, usecols=['id'])
-            existing_ids.update(df['id'].astype(str).tolist())
-        except Exception as e:
-            logger.error(f"Error reading {f}: {e}")
-            
-    return existing_ids
-
-def save_data(df):
-    """
-    Saves the dataframe to disk.
-    Determines filename based on min/max thread_date in the data.
-    """
-    if df.empty:
-        logger.info("No data to save.")
-        return
-        
-    # Ensure IDs are strings for consistency
-    df['id'] = df['id'].astype(str)
-    
-    # Sort by date
-    df = df.sort_values('thread_date')
-    
-    start_date = df['thread_date'].min()
-    end_date = df['thread_date'].max()
-    
-    # Using parquet as requested for performance
-    filename = f"hn_jobs_raw_{start_date}_{end_date}.parquet"
-    filepath = os.path.join(config.DATA_DIR, filename)
-    
+    if not os.path.isdir(config.RAW_DATASET_DIR):
+        return set()
     try:
-        df.to_parquet(filepath, index=False)
-        logger.info(f"Saved {len(df)} records to {filepath}")
+        df = datasets.read_partitioned(config.RAW_DATASET_DIR, columns=['id'])
     except Exception as e:
-        logger.error(f"Failed to save data to {filepath}: {e}")
+        logger.error(f"Error reading {config.RAW_DATASET_DIR}: {e}")
+        return set()
+    return set(df['id'].astype(str).tolist())
 
 def save_thread_data(df, thread_id):
     """
@@ -73,24 +40,92 @@ def save_thread_data(df, thread_id):
     except Exception as e:
         logger.error(f"Failed to save thread data to {filepath}: {e}")
 
+def _thread_date_range(parquet_file):
+    """
+    (min, max) thread_date of a parquet file from its row group statistics, without reading data.
+    """
+    index = parquet_file.schema_arrow.get_field_index('thread_date')
+    lows, highs = [], []
+    for i in range(parquet_file.metadata.num_row_groups):
+        stats = parquet_file.metadata.row_group(i).column(index).statistics
+        if stats is None or not stats.has_min_max:
+            # No statistics: fall back to reading just this column
+            dates = parquet_file.read(columns=['thread_date']).column(0)
+            return pc.min(dates).as_py(), pc.max(dates).as_py()
+        lows.append(stats.min)
+        highs.append(stats.max)
+    return (min(lows), max(highs)) if lows else (None, None)
+
+def _normalize_id(value):
+    # Ids are numeric strings; ints take far less memory in the seen set. Only canonical
+    # ASCII numbers become ints, so "0123" or non-ASCII digits never collide with "123".
+    if value.isascii() and value.isdigit() and not value.startswith('0'):
+        return int(value)
+    return value
+
+def _conformed(batch, schema):
+    # A thread file's batch in the merged schema: columns it lacks are null, types are promoted
+    columns = [batch.column(field.name).cast(field.type) if field.name in batch.schema.names
+               else pa.nulls(batch.num_rows, field.type) for field in schema]
+    return pa.RecordBatch.from_arrays(columns, schema=schema)
+
 def merge_thread_files():
     """
     Merges all thread parquet files into the main dataset.
+    Streams the files batch by batch, oldest thread first, into the partitioned raw dataset,
+    so peak memory stays bounded by MERGE_BATCH_ROWS plus the set of seen ids, whatever the history size.
+    The dataset has the union of the files' columns. A file that cannot be read fails the
+    merge and the previous dataset is kept: no thread is silently left out.
     """
     thread_files = glob.glob(os.path.join(config.THREADS_DIR, "*.parquet"))
     if not thread_files:
         logger.info("No thread files to merge.")
         return
 
-    dfs = []
+    # Order files by thread_date so the output is written sorted without a global sort
+    sources = []
     for f in thread_files:
         try:
-            dfs.append(pd.read_parquet(f))
+            parquet_file = pq.ParquetFile(f)
+            low, high = _thread_date_range(parquet_file)
         except Exception as e:
             logger.error(f"Error reading {f}: {e}")
-    
-    if dfs:
-        full_df = pd.concat(dfs, ignore_index=True)
-        # Deduplicate just in case
-        full_df.drop_duplicates(subset=['id'], inplace=True)
-        save_data(full_df)
+            raise
+        if parquet_file.metadata.num_rows:
+            sources.append((low, high, f, parquet_file))
+    if not sources:
+        logger.info("No data to save.")
+        return
+    sources.sort(key=lambda source: source[:3])
+    for previous, current in zip(sources, sources[1:]):
+        if current[0] < previous[1]:
+            logger.warning(f"{current[2]} overlaps the dates of {previous[2]}; output is only sorted per file.")
+
+    # Raises if two files hold a column in types that do not promote to one another
+    schema = pa.unify_schemas([source[3].schema_arrow for source in sources], promote_options='permissive')
+    seen_ids = set()
+
+    def deduplicated_batches():
+        for _, _, f, parquet_file in sources:
+            try:
+                for batch in parquet_file.iter_batches(batch_size=config.MERGE_BATCH_ROWS):
+                    batch = _conformed(batch, schema)
+                    # Deduplicate just in case (keep the first occurrence)
+                    keep = []
+                    for value in batch.column('id').cast(pa.string()).to_pylist():
+                        key = _normalize_id(value) if value is not None else None
+                        keep.append(key not in seen_ids)
+                        seen_ids.add(key)
+                    batch = batch.filter(pa.array(keep))
+                    if batch.num_rows:
+                        yield batch
+            except Exception as e:
+                logger.error(f"Error reading {f}: {e}")
+                raise
+
+    try:
+        written = datasets.write_partitioned(deduplicated_batches(), schema, config.RAW_DATASET_DIR, 'thread_date')
+    except Exception as e:
+        logger.error(f"Failed to save data to {config.RAW_DATASET_DIR}, kept the previous dataset: {e}")
+        raise
+    logger.info(f"Saved {written} records to {config.RAW_DATASET_DIR}")
@@ -1,10 +1,15 @@
+import argparse
 import logging
+import threading
 import pandas as pd
 import time
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 from requests.exceptions import RequestException
 from . import config, fetcher, parser, loader, checkpoint_manager
+from .rate_limiter import TokenBucket
+from .http_cache import ResponseCache, CacheMiss
 
 # Setup logging
 logging.basicConfig(
@@ -13,121 +18,320 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def main():
-    hn_fetcher = fetcher.HNFetcher()
-    
-    # 1. Load Checkpoint
-    processed_threads = checkpoint_manager.load_checkpoint()
-    logger.info(f"Resuming with {len(processed_threads)} threads already processed.")
+START_DATE = "2020-01-01"
+
+def iter_thread_pages(hn_fetcher, thread, page=1, stop_event=None):
+    """
+    Fetches the pages of a thread from `page` on, yielding (page, comments, has_more) as each
+    one is parsed. Stops early if stop_event is set.
+    Raises RequestException after MAX_RETRIES consecutive network errors.
+    """
+    thread_id = thread['id']
+    consecutive_errors = 0
+    MAX_CONSECUTIVE_ERRORS = config.MAX_RETRIES
     
-    try:
-        # 2. Fetch 'Who is hiring' threads
-        all_threads = checkpoint_manager.load_threads_list()
-        
-        if all_threads:
-            logger.info(f"Loaded {len(all_threads)} threads from cache.")
-        else:
-            logger.info("No threads cache found. Fetching from Hacker News...")
-            all_threads = []
-            page = 1
-            MAX_SUBMISSION_PAGES = 15 # Increased to cover 2020-2025
-            
+    while True:
+        if stop_event and stop_event.is_set():
+            return
+
+        try:
+            html = hn_fetcher.fetch_thread(thread_id, page=page, thread_date=thread['thread_date'])
             consecutive_errors = 0
-            MAX_CONSECUTIVE_ERRORS = config.MAX_RETRIES
-            
-            next_page_params = None
-
-            while page <= MAX_SUBMISSION_PAGES:
-                logger.info(f"Fetching submissions page {page}...")
-                try:
-                    html = hn_fetcher.fetch_whoishiring_submissions(next_page_params)
-                    consecutive_errors = 0 # Reset on success
-                except RequestException:
-                    consecutive_errors += 1
-                    logger.error(f"Network error fetching submissions page {page}. ({consecutive_errors}/{MAX_CONSECUTIVE_ERRORS})")
-                    if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
-                        logger.critical("Too many network errors. Stopping.")
-                        sys.exit(1)
-                    time.sleep(5) # Wait a bit before retry
-                    continue
-
-                if not html:
-                    break
-                    
-                threads, next_page_params = parser.parse_thread_list(html)
-                all_threads.extend(threads)
-                
-                if not next_page_params:
-                    break
-                page += 1
-            
-            # Save the fetched threads to cache
-            if all_threads:
-                checkpoint_manager.save_threads_list(all_threads)
+        except RequestException:
+            consecutive_errors += 1
+            logger.error(f"Network error fetching thread {thread_id} page {page}. ({consecutive_errors}/{MAX_CONSECUTIVE_ERRORS})")
+            if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                raise
+            time.sleep(5)
+            continue
+
+        if not html:
+            return
             
-        logger.info(f"Found {len(all_threads)} 'Who is hiring' threads.")
+        comments, has_more = parser.parse_comments(html, thread['thread_date'])
+        yield page, comments, has_more
         
-        # 3. Filter threads by date (2020 to 2025)
-        start_date = "2020-01-01"
-        
-        target_threads = [t for t in all_threads if t['thread_date'] >= start_date]
-        logger.info(f"Processing {len(target_threads)} threads from {start_date} to now.")
+        if not has_more:
+            return
+        page += 1
+
+def fetch_thread_comments(hn_fetcher, thread, stop_event=None, checkpoint=None):
+    """
+    Fetches every page of a thread and returns its top-level comments.
+    With a checkpoint, each page is journaled and a partially fetched thread resumes
+    after its last recorded page.
+    Raises RequestException after MAX_RETRIES consecutive network errors.
+    Returns None if stop_event was set before the thread was complete.
+    """
+    thread_id = thread['id']
+    logger.info(f"Processing thread: {thread['title']} ({thread['thread_date']})")
+    
+    thread_comments = []
+    page = 1
+    if checkpoint:
+        thread_comments, page = checkpoint.resume(thread_id)
+        if page is None:
+            return thread_comments
+        if page > 1:
+            logger.info(f"Resuming thread {thread_id} at page {page} ({len(thread_comments)} comments recovered).")
+
+    complete = False
+    for page, comments, has_more in iter_thread_pages(hn_fetcher, thread, page, stop_event):
+        thread_comments.extend(comments)
+        if checkpoint:
+            checkpoint.record_page(thread_id, page, comments, has_more)
+        complete = not has_more
+    if not complete and stop_event and stop_event.is_set():
+        return None
+
+    return thread_comments
+
+def save_thread(thread_id, thread_comments, checkpoint):
+    """
+    Saves thread data and marks the thread as processed in the checkpoint.
+    """
+    # Save thread data immediately
+    if thread_comments:
+        df = pd.DataFrame(thread_comments)
+        loader.save_thread_data(df, thread_id)
+    
+    # Mark as processed (journaled before returning)
+    checkpoint.mark_processed(thread_id)
+
+def process_threads_serial(hn_fetcher, threads, checkpoint):
+    for thread in threads:
+        thread_id = thread['id']
         
-        for thread in target_threads:
-            thread_id = thread['id']
-            
-            if thread_id in processed_threads:
-                logger.info(f"Skipping thread {thread_id} (already processed).")
-                continue
+        if thread_id in checkpoint.processed_threads:
+            logger.info(f"Skipping thread {thread_id} (already processed).")
+            continue
 
-            thread_date = thread['thread_date']
-            logger.info(f"Processing thread: {thread['title']} ({thread_date})")
-            
-            thread_comments = []
-            page = 1
-            consecutive_errors = 0
-            MAX_CONSECUTIVE_ERRORS = config.MAX_RETRIES
-            
+        try:
+            thread_comments = fetch_thread_comments(hn_fetcher, thread, checkpoint=checkpoint)
+        except RequestException:
+            logger.critical("Too many network errors. Saving checkpoint and stopping.")
+            checkpoint.compact()
+            sys.exit(1)
+
+        save_thread(thread_id, thread_comments, checkpoint)
+
+def process_threads_concurrent(hn_fetcher, threads, checkpoint, workers):
+    """
+    Fetches several threads at once. hn_fetcher should carry a shared rate limiter so the
+    aggregate request rate stays within budget. Each thread is checkpointed as it completes.
+    """
+    pending = [t for t in threads if t['id'] not in checkpoint.processed_threads]
+    logger.info(f"Fetching {len(pending)} threads with {workers} workers "
+                f"({len(threads) - len(pending)} already processed).")
+
+    stop_event = threading.Event()
+    failed_threads = []
+
+    def work(thread):
+        thread_comments = fetch_thread_comments(hn_fetcher, thread, stop_event, checkpoint)
+        if thread_comments is None:
+            return
+        save_thread(thread['id'], thread_comments, checkpoint)
+
+    executor = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {executor.submit(work, thread): thread for thread in pending}
+        for future in as_completed(futures):
+            try:
+                future.result()
+            except RequestException:
+                thread_id = futures[future]['id']
+                failed_threads.append(thread_id)
+                logger.error(f"Giving up on thread {thread_id} after repeated network errors.")
+    except KeyboardInterrupt:
+        # Let in-flight workers stop at their next page boundary before the checkpoint is saved
+        stop_event.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+        raise
+    executor.shutdown(wait=True)
+
+    if failed_threads:
+        logger.critical(f"{len(failed_threads)} threads failed. Saving checkpoint and stopping.")
+        checkpoint.compact()
+        sys.exit(1)
+
+def reparse_from_cache(hn_fetcher, threads):
+    """
+    Re-runs parse_comments over cached thread pages and rewrites the thread files.
+    hn_fetcher must be offline. The checkpoint is left untouched and threads missing
+    from the cache are skipped.
+    """
+    reparsed = 0
+    for thread in threads:
+        thread_id = thread['id']
+        thread_comments = []
+        page = 1
+        try:
             while True:
-                try:
-                    html = hn_fetcher.fetch_thread(thread_id, page=page)
-                    consecutive_errors = 0
-                except RequestException:
-                    consecutive_errors += 1
-                    logger.error(f"Network error fetching thread {thread_id} page {page}. ({consecutive_errors}/{MAX_CONSECUTIVE_ERRORS})")
-                    if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
-                        logger.critical("Too many network errors. Saving checkpoint and stopping.")
-                        checkpoint_manager.save_checkpoint(processed_threads)
-                        sys.exit(1)
-                    time.sleep(5)
-                    continue
-
-                if not html:
-                    break
-                    
-                comments, has_more = parser.parse_comments(html, thread_date)
+                html = hn_fetcher.fetch_thread(thread_id, page=page)
+                comments, has_more = parser.parse_comments(html, thread['thread_date'])
                 thread_comments.extend(comments)
-                
                 if not has_more:
                     break
                 page += 1
-            
-            # Save thread data immediately
-            if thread_comments:
-                df = pd.DataFrame(thread_comments)
-                loader.save_thread_data(df, thread_id)
-            
-            # Mark as processed and save checkpoint
-            processed_threads.add(thread_id)
-            checkpoint_manager.save_checkpoint(processed_threads)
+        except CacheMiss:
+            if page == 1:
+                logger.warning(f"Thread {thread_id} is not cached, skipping.")
+                continue
+            logger.warning(f"Thread {thread_id} page {page} is not cached, keeping {page - 1} cached pages.")
+
+        if thread_comments:
+            loader.save_thread_data(pd.DataFrame(thread_comments), thread_id)
+            reparsed += 1
+
+    logger.info(f"Reparsed {reparsed}/{len(threads)} threads from cache.")
+
+def run_offline():
+    """
+    Rebuilds the thread files and merged dataset purely from the HTML cache.
+    """
+    hn_fetcher = fetcher.HNFetcher(cache=ResponseCache(config.HTTP_CACHE_DIR), offline=True)
+    all_threads = checkpoint_manager.load_threads_list()
+    if not all_threads:
+        logger.critical("No cached thread list found. Run once online first.")
+        sys.exit(1)
+
+    target_threads = [t for t in all_threads if t['thread_date'] >= START_DATE]
+    reparse_from_cache(hn_fetcher, target_threads)
+
+    logger.info("Merging all thread data...")
+    loader.merge_thread_files()
+    logger.info("Done.")
+
+def load_threads_list(hn_fetcher):
+    """
+    The 'Who is hiring' threads, from the threads list cache or fetched from Hacker News
+    (and then cached).
+    """
+    all_threads = checkpoint_manager.load_threads_list()
+
+    if all_threads:
+        logger.info(f"Loaded {len(all_threads)} threads from cache.")
+    else:
+        logger.info("No threads cache found. Fetching from Hacker News...")
+        all_threads = []
+        page = 1
+        MAX_SUBMISSION_PAGES = 15 # Increased to cover 2020-2025
+
+        consecutive_errors = 0
+        MAX_CONSECUTIVE_ERRORS = config.MAX_RETRIES
+
+        next_page_params = None
+
+        while page <= MAX_SUBMISSION_PAGES:
+            logger.info(f"Fetching submissions page {page}...")
+            try:
+                html = hn_fetcher.fetch_whoishiring_submissions(next_page_params)
+                consecutive_errors = 0 # Reset on success
+            except RequestException:
+                consecutive_errors += 1
+                logger.error(f"Network error fetching submissions page {page}. ({consecutive_errors}/{MAX_CONSECUTIVE_ERRORS})")
+                if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                    logger.critical("Too many network errors. Stopping.")
+                    sys.exit(1)
+                time.sleep(5) # Wait a bit before retry
+                continue
+
+            if not html:
+                break
+
+            threads, next_page_params = parser.parse_thread_list(html)
+            all_threads.extend(threads)
+
+            if not next_page_params:
+                break
+            page += 1
+
+        # Save the fetched threads to cache
+        if all_threads:
+            checkpoint_manager.save_threads_list(all_threads)
+    return all_threads
+
+def stream_thread_comments(hn_fetcher, threads, fetched=None):
+    """
+    Yields the top-level comments of each thread as its pages are parsed.
+    With a fetched dict, also collects each thread's comments in fetched[thread_id].
+    """
+    for thread in threads:
+        logger.info(f"Streaming thread: {thread['title']} ({thread['thread_date']})")
+        thread_comments = fetched.setdefault(thread['id'], []) if fetched is not None else None
+        for _, comments, _ in iter_thread_pages(hn_fetcher, thread):
+            if thread_comments is not None:
+                thread_comments.extend(comments)
+            yield from comments
+
+def run_streaming(use_cache=True, vectorized_mode=False):
+    """
+    Streams the threads not yet in the checkpoint (normally the new month) from the parser
+    through the transform stages into the structured dataset, replacing only their months,
+    then updates the aggregate cube.
+    Once the stream is written, the threads are saved to their thread files for the merged
+    raw dataset and marked processed in the checkpoint; a run that fails before that streams
+    the same threads again.
+    """
+    # Imported here: only streaming runs need the transform stages
+    from src.etl_pipeline.transform import storage
+    from src.etl_pipeline.transform.cube import update_cube
+    from src.etl_pipeline.transform.pipeline import OUTPUT_DIR
+    from src.etl_pipeline.transform.streaming import frame_batches, run_streaming_transform
+
+    hn_fetcher = fetcher.HNFetcher(cache=ResponseCache(config.HTTP_CACHE_DIR) if use_cache else None)
+    checkpoint = checkpoint_manager.CheckpointJournal().load()
+    target_threads = [t for t in load_threads_list(hn_fetcher)
+                      if t['thread_date'] >= START_DATE and t['id'] not in checkpoint.processed_threads]
+    if not target_threads:
+        logger.info("No new threads to stream.")
+        return
+    logger.info(f"Streaming {len(target_threads)} threads into {OUTPUT_DIR}.")
+    fetched = {}
+    run_streaming_transform(frame_batches(stream_thread_comments(hn_fetcher, target_threads, fetched)), OUTPUT_DIR,
+                            vectorized_mode=vectorized_mode,
+                            storage_profile=storage.stored_profile(OUTPUT_DIR) or "standard", replace_months=True)
+    for thread in target_threads:
+        save_thread(thread['id'], fetched.get(thread['id'], []), checkpoint)
+    checkpoint.compact()
+    update_cube(OUTPUT_DIR)
+
+def main(workers=1, use_cache=True, rate=config.RATE_LIMIT_REQUESTS_PER_SECOND):
+    cache = ResponseCache(config.HTTP_CACHE_DIR) if use_cache else None
+    if workers > 1:
+        rate_limiter = TokenBucket(rate, config.RATE_LIMIT_BURST)
+        hn_fetcher = fetcher.HNFetcher(rate_limiter=rate_limiter, pool_size=workers, cache=cache)
+    else:
+        hn_fetcher = fetcher.HNFetcher(cache=cache)
+    
+    # 1. Load Checkpoint
+    checkpoint = checkpoint_manager.CheckpointJournal().load()
+    logger.info(f"Resuming with {len(checkpoint.processed_threads)} threads already processed"
+                f" and {len(checkpoint.pages)} partially fetched.")
+    
+    try:
+        # 2. Fetch 'Who is hiring' threads
+        all_threads = load_threads_list(hn_fetcher)
+        logger.info(f"Found {len(all_threads)} 'Who is hiring' threads.")
+        
+        # 3. Filter threads by date (2020 to 2025)
+        target_threads = [t for t in all_threads if t['thread_date'] >= START_DATE]
+        logger.info(f"Processing {len(target_threads)} threads from {START_DATE} to now.")
+        
+        if workers > 1:
+            process_threads_concurrent(hn_fetcher, target_threads, checkpoint, workers)
+        else:
+            process_threads_serial(hn_fetcher, target_threads, checkpoint)
+        checkpoint.compact()
             
     except KeyboardInterrupt:
         logger.warning("Interrupted by user. Saving checkpoint...")
-        checkpoint_manager.save_checkpoint(processed_threads)
+        checkpoint.compact()
         sys.exit(0)
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
-        checkpoint_manager.save_checkpoint(processed_threads)
+        checkpoint.compact()
         raise e
 
     # 4. Merge all data at the end
@@ -136,4 +340,24 @@ def main():
     logger.info("Done.")
 
 if __name__ == "__main__":
-    main()
+    arg_parser = argparse.ArgumentParser(description="Fetch 'Who is hiring' threads from Hacker News.")
+    arg_parser.add_argument("--workers", type=int, nargs='?', default=1, const=config.FETCH_WORKERS,
+                            help=f"Fetch N threads concurrently under a shared rate limit (default {config.FETCH_WORKERS}).")
+    arg_parser.add_argument("--rate", type=float, default=config.RATE_LIMIT_REQUESTS_PER_SECOND,
+                            help=f"With --workers: aggregate requests/second (default {config.RATE_LIMIT_REQUESTS_PER_SECOND:g}, "
+                                 "the serial fetcher's pace).")
+    arg_parser.add_argument("--no-cache", action="store_true", help="Do not read or write the raw HTML cache.")
+    arg_parser.add_argument("--offline", action="store_true",
+                            help="Re-parse threads from the raw HTML cache without any network access.")
+    arg_parser.add_argument("--stream", action="store_true",
+                            help="Stream new threads straight into the structured dataset (see transform/streaming.py).")
+    arg_parser.add_argument("--vectorized", action="store_true", help="With --stream: use the column-at-a-time extractors.")
+    args = arg_parser.parse_args()
+    if args.stream and (args.offline or args.workers > 1):
+        arg_parser.error("--stream fetches serially and does not combine with --offline or --workers")
+    if args.stream:
+        run_streaming(use_cache=not args.no_cache, vectorized_mode=args.vectorized)
+    elif args.offline:
+        run_offline()
+    else:
+        main(workers=args.workers, use_cache=not args.no_cache, rate=args.rate)
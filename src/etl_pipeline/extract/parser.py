@@ -1,8 +1,17 @@
 import re
+import logging
 from bs4 import BeautifulSoup
 from datetime import datetime
 from . import config
 
+try:
+    from lxml import etree
+    from lxml import html as lxml_html
+except ImportError:  # Optional fast backend; BeautifulSoup is always available
+    etree = lxml_html = None
+
+logger = logging.getLogger(__name__)
+
 def parse_thread_list(html):
     """
     Parses the user submissions page to find 'Who is hiring?' threads.
@@ -48,11 +57,32 @@ def parse_thread_list(html):
     
     return threads, next_page_params
 
-def parse_comments(html, thread_date):
+def parse_comments(html, thread_date, backend=None):
     """
     Parses a thread page to extract top-level comments.
+    backend: "lxml" or "bs4" (default: config.HTML_PARSER). Both return the same comments.
     Returns (comments_list, has_more_bool)
     """
+    return _COMMENT_PARSERS[resolve_backend(backend)](html, thread_date)
+
+_warned_missing_lxml = False
+
+def resolve_backend(backend=None):
+    """
+    Returns the parser backend to use, falling back to bs4 when lxml is not installed.
+    """
+    global _warned_missing_lxml
+    backend = backend or config.HTML_PARSER
+    if backend not in _COMMENT_PARSERS:
+        raise ValueError(f"Unknown HTML parser backend '{backend}' (expected one of {sorted(_COMMENT_PARSERS)})")
+    if backend == "lxml" and lxml_html is None:
+        if not _warned_missing_lxml:
+            logger.warning("lxml is not installed; falling back to the BeautifulSoup parser (pip install lxml).")
+            _warned_missing_lxml = True
+        return "bs4"
+    return backend
+
+def _parse_comments_bs4(html, thread_date):
     soup = BeautifulSoup(html, 'html.parser')
     comments = []
     
@@ -104,3 +134,84 @@ def parse_comments(html, thread_date):
     has_more = more_link is not None
     
     return comments, has_more
+
+# lxml backend: same selectors as above, as precompiled XPath
+
+def _has_class(name):
+    # XPath equivalent of the CSS ".name" class selector
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+if etree is not None:
+    _XP_COMMENT_ROWS = etree.XPath(f"//tr[{_has_class('athing')} and {_has_class('comtr')}]")
+    _XP_IND_CELL = etree.XPath(f".//td[{_has_class('ind')}]")
+    _XP_IMG = etree.XPath(".//img")
+    _XP_USER = etree.XPath(f".//a[{_has_class('hnuser')}]")
+    _XP_COMMTEXT = etree.XPath(f".//div[{_has_class('commtext')}]")
+    _XP_AGE_LINK = etree.XPath(f".//span[{_has_class('age')}]//a")
+    _XP_MORELINK = etree.XPath(f"//a[{_has_class('morelink')}]")
+
+# BeautifulSoup collapses whitespace-only strings to "\n" (or " ") outside these tags
+_PRESERVE_WHITESPACE_TAGS = {'pre', 'textarea'}
+_ASCII_SPACES = str.maketrans('', '', '\x20\x0a\x09\x0c\x0d')
+
+def _bs4_string(text, preserve):
+    if preserve or text.translate(_ASCII_SPACES):
+        return text
+    return '\n' if '\n' in text else ' '
+
+def _all_strings(elem, preserve=False):
+    """
+    Text nodes under elem in document order, as BeautifulSoup's get_text() sees them.
+    """
+    preserve = preserve or elem.tag in _PRESERVE_WHITESPACE_TAGS
+    if elem.text:
+        yield _bs4_string(elem.text, preserve)
+    for child in elem:
+        if isinstance(child.tag, str):  # skip comments and processing instructions
+            yield from _all_strings(child, preserve)
+        if child.tail:
+            yield _bs4_string(child.tail, preserve)
+
+def _first(xpath, elem):
+    found = xpath(elem)
+    return found[0] if found else None
+
+def _parse_comments_lxml(html, thread_date):
+    tree = lxml_html.document_fromstring(html)
+    comments = []
+
+    for row in _XP_COMMENT_ROWS(tree):
+        ind_cell = _first(_XP_IND_CELL, row)
+        if ind_cell is not None:
+            img = _first(_XP_IMG, ind_cell)
+            if img is not None and img.get('width') != '0':
+                continue
+
+        comment_id = row.attrib['id']
+
+        user_elem = _first(_XP_USER, row)
+        user = "".join(_all_strings(user_elem)) if user_elem is not None else "unknown"
+
+        text_elem = _first(_XP_COMMTEXT, row)
+        raw_text = "\n".join(_all_strings(text_elem)).strip() if text_elem is not None else ""
+
+        age_elem = _first(_XP_AGE_LINK, row)
+        url = ""
+        if age_elem is not None:
+            url = f"{config.BASE_URL}/{age_elem.get('href')}"
+
+        comments.append({
+            'id': comment_id,
+            'thread_date': thread_date,
+            'raw_text': raw_text,
+            'user': user,
+            'url': url
+        })
+
+    has_more = bool(_XP_MORELINK(tree))
+    return comments, has_more
+
+_COMMENT_PARSERS = {
+    "bs4": _parse_comments_bs4,
+    "lxml": _parse_comments_lxml,
+}
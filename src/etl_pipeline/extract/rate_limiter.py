@@ -0,0 +1,48 @@
+import time
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class TokenBucket:
+    """
+    Thread-safe token bucket shared by all fetch workers.
+    Holds the aggregate request rate to `rate` requests/second with bursts of up to `capacity`.
+    """
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Blocks until a request slot is available.
+        """
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    wait = self.blocked_until - now
+                else:
+                    self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                    self.updated = now
+                    if self.tokens >= 1:
+                        self.tokens -= 1
+                        return
+                    wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        """
+        Stops every worker for `seconds` (e.g. on 429 Retry-After) and drains the bucket.
+        """
+        with self.lock:
+            until = time.monotonic() + seconds
+            if until > self.blocked_until:
+                logger.warning(f"Rate limited: pausing all requests for {seconds:.1f}s")
+                self.blocked_until = until
+            self.tokens = 0
+            self.updated = self.blocked_until
@@ -0,0 +1,35 @@
+import resource
+
+# Peak memory of the current process, for the transform profiler and the benchmarks.
+# ru_maxrss survives execve on Linux, so a freshly spawned worker would report its parent's
+# peak; /proc/self/status VmHWM belongs to the new address space and can be reset.
+
+def _status_kib(field):
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def reset_peak_rss():
+    """
+    Resets the peak (VmHWM) to the current RSS, where the kernel allows it.
+    """
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def current_rss_mib():
+    kib = _status_kib("VmRSS")
+    return kib / 1024 if kib is not None else peak_rss_mib()
+
+def peak_rss_mib():
+    kib = _status_kib("VmHWM")
+    if kib is None:
+        kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    return kib / 1024
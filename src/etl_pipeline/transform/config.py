@@ -33,8 +33,8 @@ SKILL_KEYWORDS = {
     "React Native": ["react native"],
 }
 
-# Role Classification Keywords (Priority Order is handled in logic, this is just for reference/grouping if needed)
-# The logic will use these keywords to classify.
+# Role Classification Keywords
+# Insertion order is the classification priority: the first role with a matching keyword wins.
 ROLE_KEYWORDS = {
     "Data/AI": ["machine learning", "ai", "data scientist", "data engineer", "computer vision", "nlp"],
     "DevOps": ["devops", "sre", "site reliability", "kubernetes", "platform engineer", "infrastructure"],
@@ -0,0 +1,258 @@
+import argparse
+import hashlib
+import json
+import os
+from collections import defaultdict
+from typing import List
+import numpy as np
+import pandas as pd
+import pyarrow.parquet as pq
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import pipeline, skill_index, storage
+from src.etl_pipeline.transform.skill_index import SkillIndex, SKILL_NAMES
+
+# Monthly aggregate cube over the structured dataset, for dashboards and notebooks.
+#
+# One row per non-empty cell of
+#   month_start x job_category x skill x is_remote x location flags x company stage flags
+# where skill is a SKILL_KEYWORDS name, or ALL_SKILLS for the row counting every posting once.
+# Measures:
+#   - count: postings in the cell
+#   - <flag>_count: postings with each remaining feature flag (seniority, compensation, ...)
+#   - salary_count / salary_sum / salary_min / salary_max over postings with a salary_avg
+#   - salary_buckets / salary_bucket_counts: a log-bucket quantile sketch (DDSketch) of salary_avg;
+#     sketches merge by adding bucket counts, so any roll-up keeps SKETCH_ALPHA relative accuracy.
+# Cells are additive: select skill == ALL_SKILLS for posting totals (summing skill rows counts a
+# posting once per skill), then group by any subset of the dimensions:
+#
+#   cube = load_cube(start_month='2023-01')
+#   skill_share(cube, ['Python', 'Rust'])                   # months x skills, % of postings
+#   rollup(cube[cube['skill'] == ALL_SKILLS], ['month_start', 'is_remote'])
+#   salary_quantiles(cube[cube['skill'] != ALL_SKILLS], ['skill'])
+#
+# The cube is small (no text, one row per cell), so it is one parquet file next to the structured
+# output rather than a partitioned dataset. update_cube() only re-aggregates months whose
+# structured partitions changed since the last run.
+
+CUBE_PATH = os.path.join(pipeline.DATA_DIR, "hn_jobs_cube.parquet")
+
+ALL_SKILLS = '*'
+UNKNOWN_CATEGORY = 'Unknown'
+DIMENSION_FLAGS = ['is_remote', 'is_tier_1_city', 'is_europe', 'is_global_remote', 'is_yc', 'is_funded', 'is_crypto']
+DIMENSIONS = ['month_start', 'job_category', 'skill'] + DIMENSION_FLAGS
+COUNTED_FLAGS = [c for c in storage.FLAG_COLUMNS if c not in DIMENSION_FLAGS]
+INPUT_COLUMNS = ['date', 'job_category', 'skills_mask', 'salary_avg'] + DIMENSION_FLAGS + COUNTED_FLAGS
+
+SKETCH_ALPHA = 0.01  # relative accuracy of salary quantiles
+_GAMMA = (1 + SKETCH_ALPHA) / (1 - SKETCH_ALPHA)
+_LOG_GAMMA = np.log(_GAMMA)
+
+def manifest_path(cube_path: str) -> str:
+    return f"{os.path.splitext(cube_path)[0]}_manifest.json"
+
+def salary_bucket(values: np.ndarray) -> np.ndarray:
+    return np.ceil(np.log(values) / _LOG_GAMMA).astype(np.int32)
+
+def bucket_value(buckets: np.ndarray) -> np.ndarray:
+    # Midpoint (in relative terms) of bucket b = (gamma^(b-1), gamma^b]
+    return 2 * _GAMMA ** np.asarray(buckets, dtype=float) / (_GAMMA + 1)
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregates a structured frame (at least INPUT_COLUMNS) into cube cells.
+    Postings without a date are left out.
+    """
+    df = df[df['date'].notna()]
+    skills = SkillIndex(df['skills_mask'].to_numpy())
+    posting, skill = np.nonzero(skills.one_hot())
+    posting = np.concatenate([np.arange(len(df)), posting])
+    skill = np.concatenate([np.full(len(df), ALL_SKILLS, dtype=object), np.array(SKILL_NAMES, dtype=object)[skill]])
+
+    columns = {
+        'month_start': pd.to_datetime(df['date']).dt.to_period('M').dt.to_timestamp().to_numpy()[posting],
+        'job_category': df['job_category'].astype(object).fillna(UNKNOWN_CATEGORY).to_numpy()[posting],
+        'skill': skill,
+    }
+    for column in DIMENSION_FLAGS + COUNTED_FLAGS:
+        columns[column] = df[column].fillna(False).to_numpy(dtype=bool)[posting]
+    salary = pd.Series(df['salary_avg'], dtype='Float64').to_numpy(dtype=float, na_value=np.nan)[posting]
+    salary[salary <= 0] = np.nan  # not representable in the log sketch
+    columns['salary'] = salary
+    rows = pd.DataFrame(columns)
+
+    grouped = rows.groupby(DIMENSIONS, sort=True)
+    cube = grouped.size().rename('count').to_frame()
+    cube[[f"{c}_count" for c in COUNTED_FLAGS]] = grouped[COUNTED_FLAGS].sum().to_numpy()
+    cube['salary_count'] = grouped['salary'].count()
+    cube['salary_sum'] = grouped['salary'].sum()
+    cube['salary_min'] = grouped['salary'].min()
+    cube['salary_max'] = grouped['salary'].max()
+
+    # Sketches: (cell, bucket) counts sorted by cell, split into one list per cell
+    cell = grouped.ngroup().to_numpy()
+    salaried = ~np.isnan(salary)
+    pairs = pd.DataFrame({'cell': cell[salaried], 'bucket': salary_bucket(salary[salaried])})
+    pairs = pairs.value_counts(sort=False).sort_index()
+    cells, starts = np.unique(pairs.index.get_level_values('cell').to_numpy(), return_index=True)
+    salary_buckets = [[] for _ in range(len(cube))]
+    salary_bucket_counts = [[] for _ in range(len(cube))]
+    for i, (buckets, counts) in zip(cells, zip(np.split(pairs.index.get_level_values('bucket').to_numpy(), starts[1:]),
+                                               np.split(pairs.to_numpy(), starts[1:]))):
+        salary_buckets[i] = buckets.tolist()
+        salary_bucket_counts[i] = counts.tolist()
+    cube['salary_buckets'] = salary_buckets
+    cube['salary_bucket_counts'] = salary_bucket_counts
+
+    cube = cube.reset_index()
+    return cube.astype({c: 'int64' for c in ['count', 'salary_count'] + [f"{c}_count" for c in COUNTED_FLAGS]})
+
+def _month_fingerprints(structured_path: str) -> dict:
+    # 'YYYY-MM' -> hash of that month's partition files (writes are deterministic, so an
+    # unchanged month hashes the same after a full rewrite of the structured dataset)
+    digests = defaultdict(hashlib.sha256)
+    for path in datasets.dataset_files(structured_path):
+        partition = os.path.relpath(os.path.dirname(path), structured_path).split(os.sep)
+        if "__HIVE_DEFAULT_PARTITION__" in path or len(partition) != 2:
+            continue
+        year, month = (int(part.split("=")[1]) for part in partition)
+        digest = digests[f"{year}-{month:02d}"]
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+    return {month: digest.hexdigest() for month, digest in sorted(digests.items())}
+
+def cube_version() -> str:
+    """
+    Hash of the cube and skill encoding sources; a change rebuilds every month.
+    """
+    digest = hashlib.sha256()
+    for module_file in (__file__, skill_index.__file__):
+        with open(module_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _load_manifest(cube_path: str) -> dict:
+    path = manifest_path(cube_path)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: unreadable cube manifest {path} ({e}), rebuilding.")
+    return {'version': None, 'months': {}}
+
+def _save_manifest(cube_path: str, manifest: dict):
+    path = manifest_path(cube_path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _month_filter(months: List[str]):
+    return pq.filters_to_expression([[('year', '==', int(m[:4])), ('month', '==', int(m[5:]))] for m in months])
+
+def update_cube(structured_path: str = pipeline.OUTPUT_DIR, cube_path: str = CUBE_PATH) -> List[str]:
+    """
+    Brings the cube in line with the structured dataset, re-aggregating only months that
+    are new or changed. Returns the rebuilt months.
+    """
+    if not os.path.isdir(structured_path):
+        print(f"Error: structured dataset not found at {structured_path}")
+        return []
+
+    fingerprints = _month_fingerprints(structured_path)
+    manifest = _load_manifest(cube_path)
+    version = cube_version()
+    if manifest['version'] != version or not os.path.exists(cube_path):
+        manifest = {'version': version, 'months': {}}
+
+    changed = [m for m, digest in fingerprints.items() if manifest['months'].get(m) != digest]
+    removed = [m for m in manifest['months'] if m not in fingerprints]
+    if not changed and not removed:
+        print(f"Aggregate cube is up to date ({len(fingerprints)} months).")
+        return []
+    print(f"Aggregating {len(changed)}/{len(fingerprints)} months into {cube_path}...")
+
+    parts = []
+    kept = [m for m in manifest['months'] if m in fingerprints and m not in changed]
+    if kept:
+        previous = pd.read_parquet(cube_path)
+        parts.append(previous[previous['month_start'].isin(pd.to_datetime(kept, format='%Y-%m'))])
+    if changed:
+        df = storage.read_structured(structured_path, columns=INPUT_COLUMNS, filters=_month_filter(changed))
+        parts.append(build_cube(df))
+
+    cube = pd.concat(parts, ignore_index=True) if parts else build_cube(pd.DataFrame(columns=INPUT_COLUMNS))
+    cube = cube.sort_values(DIMENSIONS, kind='stable', ignore_index=True)
+    tmp_path = f"{cube_path}.tmp"
+    cube.to_parquet(tmp_path, index=False)
+    os.replace(tmp_path, cube_path)
+
+    _save_manifest(cube_path, {'version': version, 'months': fingerprints})
+    print(f"Cube rows: {len(cube)}")
+    return changed
+
+def load_cube(path: str = CUBE_PATH, start_month: str = None) -> pd.DataFrame:
+    """
+    Reads the cube, optionally from start_month ('YYYY-MM') on.
+    """
+    filters = [('month_start', '>=', pd.Timestamp(start_month))] if start_month else None
+    return pd.read_parquet(path, filters=filters)
+
+def _month_labels(table: pd.DataFrame) -> pd.DataFrame:
+    # month_start index level -> 'YYYY-MM' strings named 'month', as in SkillIndex.trend()
+    if 'month_start' not in table.index.names:
+        return table
+    names = ['month' if name == 'month_start' else name for name in table.index.names]
+    table = table.reset_index()
+    table['month_start'] = table['month_start'].dt.strftime('%Y-%m')
+    return table.set_axis([('month' if c == 'month_start' else c) for c in table.columns], axis=1).set_index(names)
+
+def rollup(cube: pd.DataFrame, by: List[str]) -> pd.DataFrame:
+    """
+    Sums the count measures of the selected cells per group of `by` dimensions
+    (month_start is reported as 'YYYY-MM' under 'month').
+    """
+    measures = ['count'] + [f"{c}_count" for c in COUNTED_FLAGS] + ['salary_count', 'salary_sum']
+    table = cube.groupby(by, sort=True)[measures].sum()
+    table['salary_mean'] = table['salary_sum'] / table['salary_count'].where(table['salary_count'] > 0)
+    return _month_labels(table)
+
+def skill_share(cube: pd.DataFrame, skills=None) -> pd.DataFrame:
+    """
+    Months x skills: % of the month's postings (within the selected cells) mentioning each skill.
+    Same layout as SkillIndex.trend().
+    """
+    skills = SKILL_NAMES if skills is None else ([skills] if isinstance(skills, str) else list(skills))
+    totals = rollup(cube[cube['skill'] == ALL_SKILLS], ['month_start'])['count']
+    counts = rollup(cube[cube['skill'].isin(skills)], ['month_start', 'skill'])['count'].unstack('skill')
+    counts = counts.reindex(index=totals.index, columns=skills).fillna(0)
+    return counts.div(totals, axis=0) * 100
+
+def salary_quantiles(cube: pd.DataFrame, by: List[str], quantiles=(0.25, 0.5, 0.75)) -> pd.DataFrame:
+    """
+    Salary quantiles per group of `by` dimensions, merged from the cell sketches
+    (within SKETCH_ALPHA of the exact lower-rank quantile).
+    """
+    cells = cube.loc[cube['salary_count'] > 0, by + ['salary_buckets', 'salary_bucket_counts']]
+    buckets = cells.explode(['salary_buckets', 'salary_bucket_counts'])
+    buckets = (buckets.astype({'salary_buckets': 'int64', 'salary_bucket_counts': 'int64'})
+               .groupby(by + ['salary_buckets'], sort=True)['salary_bucket_counts'].sum().reset_index())
+
+    grouped = buckets.groupby(by, sort=False)['salary_bucket_counts']
+    cumulative = grouped.cumsum().to_numpy()
+    totals = grouped.transform('sum').to_numpy()
+    result = grouped.sum().rename('count').to_frame()
+    for q in quantiles:
+        # First bucket whose cumulative count passes the q-th rank of its group
+        rank = np.floor(q * (totals - 1))
+        hit = buckets.loc[cumulative > rank].groupby(by, sort=False)['salary_buckets'].first()
+        result[f"q{round(q * 100)}"] = bucket_value(hit.reindex(result.index).to_numpy())
+    return _month_labels(result)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Update the monthly aggregate cube from the structured dataset.")
+    arg_parser.add_argument("--input", default=pipeline.OUTPUT_DIR, help="Structured dataset to aggregate.")
+    arg_parser.add_argument("--output", default=CUBE_PATH, help="Cube parquet file.")
+    args = arg_parser.parse_args()
+    update_cube(args.input, args.output)
@@ -1,5 +1,6 @@
 import re
-from typing import Tuple, List, Optional, Dict
+import string
+from typing import Tuple, List, Optional, Dict, NamedTuple
 from src.etl_pipeline.transform.config import (
     SKILL_KEYWORDS, ROLE_KEYWORDS,
     SENIORITY_KEYWORDS, JUNIORITY_KEYWORDS, MANAGEMENT_KEYWORDS,
@@ -8,6 +9,102 @@ from src.etl_pipeline.transform.config import (
     EQUITY_KEYWORDS, VISA_KEYWORDS
 )
 
+# Patterns the vectorized extractors also run in pyarrow's RE2 spell out their character
+# classes: there \s, \d and \b are ASCII-only, in Python's re they are Unicode. Digits are
+# [0-9]; whitespace is BLANK_CHARS (on a line: non-breaking, thin and other Unicode spaces)
+# or SPACE_CHARS (with line breaks), Python's \s without the \x1c-\x1f separators.
+BLANK_CHARS = ' \t\u00a0\u1680' + ''.join(map(chr, range(0x2000, 0x200b))) + '\u202f\u205f\u3000'
+SPACE_CHARS = BLANK_CHARS + '\n\r\f\v\x85\u2028\u2029'
+
+# Salary Tokenizer
+# One precompiled pattern finds every amount or range in a posting ("$120k", "100-140k",
+# "€60000 p.a.", "$50/hr"). What follows an amount (pay period, "million", "bonus") is part of
+# the token; the currency and context words before it are read from the text preceding the token.
+# Retirement plans ("401k", "401(k)", "403b") are tokens of their own and never salaries.
+# No look-arounds: the vectorized tokenizer runs the same patterns in pyarrow's RE2 (hence re.ASCII).
+SALARY_CURRENCY_SYMBOLS = {'$': 'USD', '€': 'EUR', '£': 'GBP'}
+SALARY_CURRENCY_CODES = {'usd': 'USD', 'eur': 'EUR', 'gbp': 'GBP', 'cad': 'CAD', 'aud': 'AUD', 'chf': 'CHF'}
+# Pay periods after "/", "per", "a" or "an" ("/hr", "per month", "a year") or on their own ("p.a.")
+SALARY_PERIODS = {
+    'hour': 'hourly', 'hours': 'hourly', 'hr': 'hourly', 'hrs': 'hourly', 'h': 'hourly',
+    'month': 'monthly', 'months': 'monthly', 'mo': 'monthly', 'mos': 'monthly',
+    'year': 'annual', 'years': 'annual', 'yr': 'annual', 'yrs': 'annual', 'y': 'annual', 'annum': 'annual',
+}
+SALARY_PERIOD_WORDS = {
+    'hourly': 'hourly', 'monthly': 'monthly',
+    'yearly': 'annual', 'annually': 'annual', 'annual': 'annual', 'pa': 'annual', 'p.a': 'annual',
+}
+SALARY_CONTEXT_WORDS = ('salary', 'salaries', 'compensation', 'comp', 'pay', 'paying', 'paid',
+                        'base', 'ote', 'rate', 'range', 'earn', 'earning')
+# Amounts followed by one of these (at most one word apart) are not salaries: "$5k referral bonus"
+NON_SALARY_WORDS = ('bonus', 'bonuses', 'referral', 'signing', 'stipend', 'budget', 'allowance', 'grant',
+                    'funding', 'seed', 'series', 'revenue', 'arr', 'valuation',
+                    'users', 'customers', 'downloads', 'employees', 'match', 'matching')
+RETIREMENT_PLANS = ('401k', '403b', '457b')  # also written "401(k)"
+SALARY_CONTEXT_CHARS = 48  # how far before an amount its currency and context words are looked for
+
+# Confidence: evidence that an amount is a salary, summed and capped at 1
+CONFIDENCE_BASE = 0.2
+CONFIDENCE_CURRENCY = 0.4         # $, €, £ or a currency code next to the amount
+CONFIDENCE_THOUSANDS = 0.2        # "120k" or a 5-6 digit amount
+CONFIDENCE_RANGE = 0.1
+CONFIDENCE_PERIOD = 0.1           # pay period written out
+CONFIDENCE_CONTEXT = 0.2          # "salary", "compensation", "pay"... shortly before
+CONFIDENCE_GUESSED_PERIOD = -0.1  # hourly / monthly inferred from the amount alone
+MIN_SALARY_CONFIDENCE = 0.5
+
+# Annualization and outlier cleaning
+HOURS_PER_YEAR = 2000
+MAX_HOURLY_RATE = 200                  # smaller amounts without a period are hourly rates
+MONTHLY_SALARY_RANGE = (2000, 15000)   # amounts in this range without a period are monthly
+ANNUAL_SALARY_RANGE = (15000, 500000)  # mentions outside, once annualized, are dropped
+PERIOD_FACTORS = {'hourly': HOURS_PER_YEAR, 'monthly': 12, 'annual': 1}
+
+def _alternation(words) -> str:
+    # Longest first, so a word is never cut short by one of its prefixes
+    return '|'.join(re.escape(word) for word in sorted(words, key=len, reverse=True))
+
+_BLANK = f"[{BLANK_CHARS}]"
+_SPACE = f"[{SPACE_CHARS}]"
+
+_CURRENCY_CODE = f"(?:{_alternation(SALARY_CURRENCY_CODES)})"
+_RETIREMENT_PLAN = '|'.join(rf'{plan[:-1]}\(?{plan[-1]}\)?' for plan in RETIREMENT_PLANS)
+# "120k", "100,000", "62.5", and dotted thousands: "120.000", "1.200.000"
+_AMOUNT = r'[0-9]+(?:(?:,[0-9]{3})+|(?:\.[0-9]{3})+)?(?:\.[0-9]+)?k?'
+# Without commas, a dot followed by exactly three digits groups thousands
+DOTTED_THOUSANDS_PATTERN = re.compile(r'\.(?=[0-9]{3}(?![0-9]))')
+
+SALARY_TOKEN_PATTERN = re.compile(
+    rf'(?P<plan>{_RETIREMENT_PLAN})|'
+    rf'(?P<low>{_AMOUNT})\b'
+    rf'(?:{_SPACE}*(?:-|–|—|to){_SPACE}*(?:{_CURRENCY_CODE}{_BLANK}*)?[$€£]?{_BLANK}*(?P<high>{_AMOUNT})\b)?'
+    r'\+?'
+    rf'(?:{_BLANK}*(?P<magnitude>million|billion|mil|mm|bn|m|b)\b)?'
+    rf'(?:{_BLANK}*(?P<currency_after>{_CURRENCY_CODE})\b)?'
+    rf'(?:{_BLANK}*(?:(?:/|per\b|an?\b|p/){_BLANK}*(?P<period>{_alternation(SALARY_PERIODS)})\b'
+    rf'|(?P<period_word>{_alternation(SALARY_PERIOD_WORDS)})\b))?'
+    rf'(?:{_BLANK}+(?P<follower>(?:[a-z-]+{_BLANK}+)?(?:{_alternation(NON_SALARY_WORDS)}))\b)?',
+    re.ASCII
+)
+# End of the text before an amount: a context word, then the currency written right before it.
+# Anchor at the end of the text: \Z for re, $ for RE2 (re's $ also matches before a final newline)
+SALARY_PRECEDING_REGEX = (
+    rf'(?:\b(?P<context>{_alternation(SALARY_CONTEXT_WORDS)})\b[^0-9$€£\n]*)?'
+    rf'(?P<currency>\b{_CURRENCY_CODE}{_BLANK}*[$€£]?|[$€£])?{_BLANK}*'
+)
+SALARY_PRECEDING_PATTERN = re.compile(SALARY_PRECEDING_REGEX + r'\Z', re.ASCII)
+# A character right before the digits makes them part of a word or number ("v2", "1.5", "x86")
+GLUED_CHARS = frozenset(string.ascii_lowercase + string.digits + '_.')
+
+SALARY_FEATURE_COLUMNS = ['salary_min', 'salary_max', 'currency', 'salary_unit', 'salary_confidence', 'salary_mentions']
+
+class SalaryMention(NamedTuple):
+    salary_min: int   # annualized
+    salary_max: int
+    currency: str
+    unit: str         # pay period as written, or inferred: hourly / monthly / annual
+    confidence: float
+
 def clean_text(text: str) -> str:
     """
     Basic text normalization.
@@ -16,136 +113,248 @@ def clean_text(text: str) -> str:
         return ""
     return text.strip()
 
-def parse_salary(text: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+def _has_dotted_thousands(amount: str) -> bool:
+    return ',' not in amount and DOTTED_THOUSANDS_PATTERN.search(amount) is not None
+
+def _plain_amount(amount: str) -> str:
+    """
+    The amount without thousands separators: "100,000" -> "100000", "1.200.000" -> "1200000"
     """
-    Extracts salary information using a waterfall strategy.
-    Returns (min_salary, max_salary, currency).
+    return DOTTED_THOUSANDS_PATTERN.sub('', amount) if _has_dotted_thousands(amount) else amount.replace(',', '')
+
+def _salary_amount(amount: str) -> float:
+    """
+    "120k" -> 120000.0, "100,000" -> 100000.0, "120.000" -> 120000.0
+    """
+    amount = _plain_amount(amount)
+    return float(amount[:-1]) * 1000 if amount.endswith('k') else float(amount)
+
+def _is_thousands(amount: str) -> bool:
+    return amount.endswith('k') or len(_plain_amount(amount).split('.')[0]) >= 5
+
+def _marked_currency(before: Optional[str], after: Optional[str]) -> Optional[str]:
+    """
+    Currency written next to an amount; a code ("usd", on either side) wins over a symbol.
+    """
+    code = after or (before or '').rstrip(BLANK_CHARS + '$€£')
+    if code:
+        return SALARY_CURRENCY_CODES[code]
+    return SALARY_CURRENCY_SYMBOLS[before] if before else None
+
+def extract_salary_mentions(text: str) -> List[SalaryMention]:
+    """
+    Every salary mentioned in the text, in order, annualized.
+    Mentions below MIN_SALARY_CONFIDENCE or outside ANNUAL_SALARY_RANGE are left out.
     """
     if not text:
-        return None, None, None
+        return []
 
-    text_lower = text.lower().replace(",", "")
-    
-    # Currency detection
-    currency = "USD"
-    if "£" in text or "gbp" in text_lower:
-        currency = "GBP"
-    elif "€" in text or "eur" in text_lower:
-        currency = "EUR"
-    
-    # Helper to convert k to 000
-    def parse_value(val_str):
-        try:
-            val_str = val_str.lower().replace("k", "000").replace("$", "").replace("£", "").replace("€", "")
-            return int(float(val_str))
-        except ValueError:
-            return None
-
-    # Pattern 1: Explicit Range ($100k - $140k or 100-140k)
-    # Matches: $100k-$140k, 100k-140k, 100-140k, $100,000 - $140,000
-    range_pattern = re.search(r'[\$€£]?(\d{2,3}k?|\d{5,6})\s*-\s*[\$€£]?(\d{2,3}k?|\d{5,6})', text_lower)
-    if range_pattern:
-        min_val = parse_value(range_pattern.group(1))
-        max_val = parse_value(range_pattern.group(2))
-        
-        # Handle case where 'k' is only on the second number (e.g. 100-140k)
-        if min_val and max_val:
-            if min_val < 1000 and max_val > 1000:
-                 min_val *= 1000
-            
-            # Guardrails
-            if min_val < 200: # Hourly trap
-                min_val *= 2000
-                max_val *= 2000
-            
-            if min_val > 50: # Equity trap check (simple)
-                return min_val, max_val, currency
-
-    # Pattern 2: "Starting At" ($120k+ or from $120k)
-    start_at_pattern = re.search(r'(?:from|starting at|\+)\s*[\$€£]?(\d{2,3}k|\d{5,6})\+?', text_lower)
-    if not start_at_pattern:
-         # Try pattern like $120k+
-         start_at_pattern = re.search(r'[\$€£]?(\d{2,3}k|\d{5,6})\+', text_lower)
-
-    if start_at_pattern:
-        val = parse_value(start_at_pattern.group(1))
-        if val:
-            if val < 200: val *= 2000
-            if val > 50:
-                return val, val, currency
-
-    # Pattern 3: Single Number (Low Confidence)
-    # Look for isolated mentions of $150k
-    single_pattern = re.search(r'[\$€£](\d{2,3}k|\d{5,6})', text_lower)
-    if single_pattern:
-        val = parse_value(single_pattern.group(1))
-        if val:
-            if val < 200: val *= 2000
-            if val > 50:
-                return val, val, currency
-
-    return None, None, None
+    text_lower = text.lower()
+    mentions = []
+    previous_end = 0
+    last_currency = None  # amounts without a currency of their own take the last one written
+    for token in SALARY_TOKEN_PATTERN.finditer(text_lower):
+        preceding = text_lower[max(previous_end, token.start() - SALARY_CONTEXT_CHARS):token.start()]
+        previous_end = token.end()
+        if token.group('plan'):
+            continue
+        before = SALARY_PRECEDING_PATTERN.search(preceding)
+        currency = _marked_currency(before.group('currency'), token.group('currency_after'))
+        last_currency = currency or last_currency
+
+        low_text, high_text = token.group('low'), token.group('high')
+        if preceding[-1:] in GLUED_CHARS or token.group('magnitude') or token.group('follower'):
+            continue
+
+        low = _salary_amount(low_text)
+        high = _salary_amount(high_text) if high_text else low
+        if high_text and low < 1000 < high:
+            low *= 1000  # "100-140k"
+        if low <= 0 or high < low:
+            continue
+
+        # Pay period: as written, else guessed from the amount
+        period_text = token.group('period') or token.group('period_word')
+        if token.group('period'):
+            unit = SALARY_PERIODS[period_text]
+        elif period_text:
+            unit = SALARY_PERIOD_WORDS[period_text]
+        elif low < MAX_HOURLY_RATE and not (_has_dotted_thousands(low_text) or _has_dotted_thousands(high_text or '')):
+            unit = 'hourly'
+        elif MONTHLY_SALARY_RANGE[0] <= (low + high) / 2 <= MONTHLY_SALARY_RANGE[1]:
+            unit = 'monthly'
+        else:
+            unit = 'annual'
+
+        confidence = CONFIDENCE_BASE
+        confidence += CONFIDENCE_CURRENCY if currency else 0
+        confidence += CONFIDENCE_THOUSANDS if _is_thousands(low_text) or (high_text and _is_thousands(high_text)) else 0
+        confidence += CONFIDENCE_RANGE if high_text else 0
+        if period_text:
+            confidence += CONFIDENCE_PERIOD
+        elif unit != 'annual':
+            confidence += CONFIDENCE_GUESSED_PERIOD
+        confidence += CONFIDENCE_CONTEXT if before.group('context') else 0
+        confidence = round(min(confidence, 1.0), 2)
+
+        salary_min = round(low * PERIOD_FACTORS[unit])
+        salary_max = round(high * PERIOD_FACTORS[unit])
+        if confidence < MIN_SALARY_CONFIDENCE:
+            continue
+        if not ANNUAL_SALARY_RANGE[0] <= (salary_min + salary_max) / 2 <= ANNUAL_SALARY_RANGE[1]:
+            continue
+        mentions.append(SalaryMention(salary_min, salary_max, last_currency or "USD", unit, confidence))
+    return mentions
+
+def summarize_salary_mentions(mentions: List[SalaryMention]) -> Dict[str, any]:
+    """
+    The SALARY_FEATURE_COLUMNS of a posting: its most confident mention (the first one
+    on ties) plus the list of all mentions.
+    """
+    if not mentions:
+        features = dict.fromkeys(SALARY_FEATURE_COLUMNS)
+        features['salary_mentions'] = []
+        return features
+    best = max(mentions, key=lambda mention: mention.confidence)
+    return {
+        'salary_min': best.salary_min,
+        'salary_max': best.salary_max,
+        'currency': best.currency,
+        'salary_unit': best.unit,
+        'salary_confidence': best.confidence,
+        'salary_mentions': [mention._asdict() for mention in mentions],
+    }
+
+def extract_salary_features(text: str) -> Dict[str, any]:
+    return summarize_salary_mentions(extract_salary_mentions(text))
+
+def parse_salary(text: str) -> Tuple[Optional[int], Optional[int], Optional[str]]:
+    """
+    Extracts the most confident salary mention.
+    Returns (min_salary, max_salary, currency), annualized.
+    """
+    features = extract_salary_features(text)
+    return features['salary_min'], features['salary_max'], features['currency']
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+def _build_skill_matcher():
+    """
+    Compiles SKILL_KEYWORDS into a single regex scanned once per text.
+    Returns (pattern, lookup) where lookup maps a matched variation to the
+    canonical skills it implies.
+    """
+    variation_skills = {}
+    for skill, variations in SKILL_KEYWORDS.items():
+        for variation in variations:
+            variation_skills.setdefault(variation, set()).add(skill)
+
+    # Longest first so the alternation reports the longest variation at each position
+    variations = sorted(variation_skills, key=len, reverse=True)
+
+    # A shorter variation that is a prefix of a longer one also matches at the same
+    # position whenever the original `\b...\b` check would have hit it there.
+    lookup = {}
+    for variation in variations:
+        skills = set(variation_skills[variation])
+        for prefix in variations:
+            if len(prefix) < len(variation) and variation.startswith(prefix):
+                if _is_word_char(variation[len(prefix) - 1]) != _is_word_char(variation[len(prefix)]):
+                    skills.update(variation_skills[prefix])
+        lookup[variation] = frozenset(skills)
+
+    # Zero-width lookahead so overlapping mentions (e.g. "vue.js" -> "js") are still seen
+    alternation = '|'.join(re.escape(variation) for variation in variations)
+    pattern = re.compile(r'(?=\b(' + alternation + r')\b)')
+    return pattern, lookup
+
+_SKILL_PATTERN, _SKILL_LOOKUP = _build_skill_matcher()
 
 def extract_skills(text: str) -> List[str]:
     """
     Extracts tech stack entities based on dictionary.
+    Single pass over the text with the precompiled skill matcher.
     """
     if not text:
         return []
     
     found_skills = set()
-    text_lower = text.lower()
-    
-    for skill, variations in SKILL_KEYWORDS.items():
-        for variation in variations:
-            # Regex word boundary check
-            # Escape variation to handle special chars like c++ or .net
-            pattern = r'\b' + re.escape(variation) + r'\b'
-            if re.search(pattern, text_lower):
-                found_skills.add(skill)
-                break # Found the canonical skill, move to next skill
+    for match in _SKILL_PATTERN.finditer(text.lower()):
+        found_skills.update(_SKILL_LOOKUP[match.group(1)])
                 
-    return list(found_skills)
+    # Keep dictionary order for a deterministic tech_stack
+    return [skill for skill in SKILL_KEYWORDS if skill in found_skills]
 
-def classify_role(text: str) -> str:
+# Keyword Engine
+# Every boolean dictionary checked in one call on a single lowercased copy of the text.
+# Plain substring checks (`in`) are kept on purpose: they are the original semantics and
+# CPython's substring search beats a combined regex alternation on these short lists.
+KEYWORD_FLAGS = (
+    ("is_senior", tuple(SENIORITY_KEYWORDS)),
+    ("is_junior", tuple(JUNIORITY_KEYWORDS)),
+    ("is_manager", tuple(MANAGEMENT_KEYWORDS)),
+    ("is_tier_1_city", tuple(TIER_1_CITIES)),
+    ("is_europe", tuple(EUROPE_LOCATIONS)),
+    ("is_global_remote", tuple(GLOBAL_REMOTE_KEYWORDS)),
+    ("is_yc", tuple(YC_KEYWORDS)),
+    ("is_funded", tuple(FUNDING_KEYWORDS)),
+    ("is_crypto", tuple(CRYPTO_KEYWORDS)),
+    ("has_equity", tuple(EQUITY_KEYWORDS)),
+    ("offers_visa", tuple(VISA_KEYWORDS)),
+)
+
+# ROLE_KEYWORDS insertion order is the classification priority
+ROLE_PRIORITY = tuple((role, tuple(keywords)) for role, keywords in ROLE_KEYWORDS.items())
+
+KEYWORD_FEATURE_COLUMNS = [flag for flag, _ in KEYWORD_FLAGS] + ["job_category", "years_experience"]
+
+YEARS_PATTERN = re.compile(rf'([0-9]+)[\+]?[{SPACE_CHARS}]*years?')
+
+def _empty_keyword_features() -> Dict[str, any]:
+    features = dict.fromkeys(KEYWORD_FEATURE_COLUMNS, False)
+    features["job_category"] = "General"
+    features["years_experience"] = None
+    return features
+
+def extract_keyword_features(text: str) -> Dict[str, any]:
     """
-    Classifies role based on priority keywords.
+    Scans the text once against every keyword dictionary.
+    Returns all boolean flags plus job_category and years_experience.
     """
     if not text:
-        return "General"
-    
+        return _empty_keyword_features()
+
     text_lower = text.lower()
-    
-    # Priority 1: Data/AI
-    for keyword in ROLE_KEYWORDS["Data/AI"]:
-        if keyword in text_lower:
-            return "Data/AI"
-            
-    # Priority 2: DevOps
-    for keyword in ROLE_KEYWORDS["DevOps"]:
-        if keyword in text_lower:
-            return "DevOps"
-            
-    # Priority 3: Mobile
-    for keyword in ROLE_KEYWORDS["Mobile"]:
-        if keyword in text_lower:
-            return "Mobile"
-            
-    # Priority 4: Web (Frontend)
-    for keyword in ROLE_KEYWORDS["Frontend"]:
-        if keyword in text_lower:
-            return "Frontend"
-            
-    # Priority 5: Backend
-    for keyword in ROLE_KEYWORDS["Backend"]:
-        if keyword in text_lower:
-            return "Backend"
-            
-    # Fallback
-    if "fullstack" in text_lower or "full-stack" in text_lower:
-        return "Fullstack"
-        
-    return "General"
+    contains = text_lower.__contains__
+
+    features = {flag: any(map(contains, keywords)) for flag, keywords in KEYWORD_FLAGS}
+
+    job_category = "General"
+    for role, keywords in ROLE_PRIORITY:
+        if any(map(contains, keywords)):
+            job_category = role
+            break
+    features["job_category"] = job_category
+
+    # Extract years of experience
+    # Regex: "([0-9]+)[\+]? years"
+    years_exp = None
+    years_match = YEARS_PATTERN.search(text_lower)
+    if years_match:
+        try:
+            years_exp = int(years_match.group(1))
+        except ValueError:
+            pass
+    features["years_experience"] = years_exp
+
+    return features
+
+def classify_role(text: str) -> str:
+    """
+    Classifies role based on priority keywords.
+    """
+    return extract_keyword_features(text)["job_category"]
 
 def extract_company(text: str) -> Optional[str]:
     """
@@ -168,99 +377,42 @@ def extract_experience_level(text: str) -> Dict[str, any]:
     """
     Extracts seniority, juniority, management role, and years of experience.
     """
-    if not text:
-        return {
-            "is_senior": False,
-            "is_junior": False,
-            "is_manager": False,
-            "years_experience": None
-        }
-    
-    text_lower = text.lower()
-    
-    is_senior = any(keyword in text_lower for keyword in SENIORITY_KEYWORDS)
-    is_junior = any(keyword in text_lower for keyword in JUNIORITY_KEYWORDS)
-    is_manager = any(keyword in text_lower for keyword in MANAGEMENT_KEYWORDS)
-    
-    # Extract years of experience
-    # Regex: "(\d+)[\+]? years"
-    years_exp = None
-    years_match = re.search(r'(\d+)[\+]?\s*years?', text_lower)
-    if years_match:
-        try:
-            years_exp = int(years_match.group(1))
-        except ValueError:
-            pass
-            
+    features = extract_keyword_features(text)
     return {
-        "is_senior": is_senior,
-        "is_junior": is_junior,
-        "is_manager": is_manager,
-        "years_experience": years_exp
+        "is_senior": features["is_senior"],
+        "is_junior": features["is_junior"],
+        "is_manager": features["is_manager"],
+        "years_experience": features["years_experience"]
     }
 
 def extract_location_features(text: str) -> Dict[str, bool]:
     """
     Extracts location tier information.
     """
-    if not text:
-        return {
-            "is_tier_1_city": False,
-            "is_europe": False,
-            "is_global_remote": False
-        }
-        
-    text_lower = text.lower()
-    
-    is_tier_1 = any(keyword in text_lower for keyword in TIER_1_CITIES)
-    is_europe = any(keyword in text_lower for keyword in EUROPE_LOCATIONS)
-    is_global_remote = any(keyword in text_lower for keyword in GLOBAL_REMOTE_KEYWORDS)
-    
+    features = extract_keyword_features(text)
     return {
-        "is_tier_1_city": is_tier_1,
-        "is_europe": is_europe,
-        "is_global_remote": is_global_remote
+        "is_tier_1_city": features["is_tier_1_city"],
+        "is_europe": features["is_europe"],
+        "is_global_remote": features["is_global_remote"]
     }
 
 def extract_company_stage(text: str) -> Dict[str, bool]:
     """
     Extracts company stage information (YC, Funded, Crypto).
     """
-    if not text:
-        return {
-            "is_yc": False,
-            "is_funded": False,
-            "is_crypto": False
-        }
-        
-    text_lower = text.lower()
-    
-    is_yc = any(keyword in text_lower for keyword in YC_KEYWORDS)
-    is_funded = any(keyword in text_lower for keyword in FUNDING_KEYWORDS)
-    is_crypto = any(keyword in text_lower for keyword in CRYPTO_KEYWORDS)
-    
+    features = extract_keyword_features(text)
     return {
-        "is_yc": is_yc,
-        "is_funded": is_funded,
-        "is_crypto": is_crypto
+        "is_yc": features["is_yc"],
+        "is_funded": features["is_funded"],
+        "is_crypto": features["is_crypto"]
     }
 
 def extract_compensation_features(text: str) -> Dict[str, bool]:
     """
     Extracts compensation structure (Equity, Visa).
     """
-    if not text:
-        return {
-            "has_equity": False,
-            "offers_visa": False
-        }
-        
-    text_lower = text.lower()
-    
-    has_equity = any(keyword in text_lower for keyword in EQUITY_KEYWORDS)
-    offers_visa = any(keyword in text_lower for keyword in VISA_KEYWORDS)
-    
+    features = extract_keyword_features(text)
     return {
-        "has_equity": has_equity,
-        "offers_visa": offers_visa
+        "has_equity": features["has_equity"],
+        "offers_visa": features["offers_visa"]
     }
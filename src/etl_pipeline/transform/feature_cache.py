@@ -0,0 +1,135 @@
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from typing import List, Optional
+
+# Content-addressed cache of extractor output, stored in a SQLite file.
+#
+# One entry per distinct clean_text, keyed by its digest: a posting repeated across months,
+# or seen by an earlier run, goes through the extractors once. Entries hold the extracted
+# values as a JSON list (in the pipeline's EXTRACTED_COLUMNS order).
+#
+# Entries are valid for one transform version (the extractor/config sources, see
+# incremental.transform_version); opening the cache under another version empties it.
+# Beyond max_entries, the least recently used entries are evicted when the cache is closed.
+# Hit/miss counters are kept per run and, in the meta table, since the version was set.
+# A cache may be used from any thread, one call at a time: the streaming transform looks up
+# its first batch on the caller's thread and the next ones on pyarrow's dataset writer thread.
+
+MAX_CACHE_ENTRIES = 200_000  # ~300 bytes each
+_QUERY_CHUNK = 500           # digests per "IN (...)" query
+CACHE_COUNTERS = ('hits', 'misses', 'extracted', 'evicted')
+
+def cache_summary(counters: dict) -> str:
+    looked_up = counters['hits'] + counters['misses']
+    rate = counters['hits'] / looked_up if looked_up else 0.0
+    return (f"{counters['hits']} hits, {counters['misses']} misses ({rate:.1%} hit rate), "
+            f"{counters['extracted']} distinct texts extracted, {counters['evicted']} evicted")
+
+def text_digest(text) -> bytes:
+    """
+    128-bit digest of a clean text; the cache key.
+    """
+    return hashlib.blake2b((text if isinstance(text, str) else '').encode('utf-8'), digest_size=16).digest()
+
+class FeatureCache:
+    """
+    Extracted feature values per text digest. lookup() before extracting, store() what was
+    extracted, close() to evict and record the counters.
+    """
+    def __init__(self, path: str, version: str, max_entries: int = MAX_CACHE_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = self.misses = self.extracted = self.evicted = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Parallel workers share the file; writers wait for each other instead of failing
+        self.connection = sqlite3.connect(path, timeout=60, check_same_thread=False)
+        self.lock = threading.RLock()
+        with self.connection:
+            self.connection.execute("CREATE TABLE IF NOT EXISTS features "
+                                    "(digest BLOB PRIMARY KEY, vals TEXT NOT NULL, last_used INTEGER NOT NULL)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS features_last_used ON features (last_used)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value)")
+            meta = dict(self.connection.execute("SELECT key, value FROM meta"))
+            if meta.get('version') != version:
+                self.connection.execute("DELETE FROM features")
+                meta = {'version': version, 'run': 0, **dict.fromkeys(CACHE_COUNTERS, 0)}
+            # Run counter: the recency stamp of entries used by this run
+            self.run = meta['run'] + 1
+            meta['run'] = self.run
+            self.connection.executemany("INSERT OR REPLACE INTO meta VALUES (?, ?)", meta.items())
+
+    def lookup(self, digests: List[bytes]) -> List[Optional[list]]:
+        """
+        Cached values of each digest, or None.
+        """
+        found = {}
+        with self.lock, self.connection:
+            for start in range(0, len(digests), _QUERY_CHUNK):
+                chunk = digests[start:start + _QUERY_CHUNK]
+                placeholders = ','.join('?' * len(chunk))
+                found.update(self.connection.execute(
+                    f"SELECT digest, vals FROM features WHERE digest IN ({placeholders})", chunk))
+                self.connection.execute(
+                    f"UPDATE features SET last_used = ? WHERE digest IN ({placeholders})", [self.run, *chunk])
+            values = [found.get(digest) for digest in digests]
+            hits = sum(value is not None for value in values)
+            self.hits += hits
+            self.misses += len(values) - hits
+        return [json.loads(value) if value is not None else None for value in values]
+
+    def store(self, digests: List[bytes], values: List[list]):
+        with self.lock, self.connection:
+            self.extracted += len(digests)
+            self.connection.executemany("INSERT OR REPLACE INTO features VALUES (?, ?, ?)",
+                                        [(digest, json.dumps(row), self.run) for digest, row in zip(digests, values)])
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+
+    def close(self):
+        with self.lock, self.connection:
+            excess = len(self) - self.max_entries
+            if excess > 0:
+                self.connection.execute("DELETE FROM features WHERE digest IN "
+                                        "(SELECT digest FROM features ORDER BY last_used LIMIT ?)", (excess,))
+                self.evicted += excess
+            self.connection.executemany("UPDATE meta SET value = value + ? WHERE key = ?",
+                                        [(value, counter) for counter, value in self.counters().items()])
+        self.connection.close()
+
+    def counters(self) -> dict:
+        """
+        This run's counters (see CACHE_COUNTERS).
+        """
+        return {counter: getattr(self, counter) for counter in CACHE_COUNTERS}
+
+def cache_stats(path: str) -> dict:
+    """
+    Entries and counters (since the current version was set) of a cache file.
+    """
+    connection = sqlite3.connect(path)
+    try:
+        meta = dict(connection.execute("SELECT key, value FROM meta"))
+        meta['entries'] = connection.execute("SELECT COUNT(*) FROM features").fetchone()[0]
+    finally:
+        connection.close()
+    return meta
+
+if __name__ == "__main__":
+    # Imported here: the pipeline itself uses this module
+    from src.etl_pipeline.transform.pipeline import FEATURE_CACHE_PATH
+    arg_parser = argparse.ArgumentParser(description="Show the size and hit/miss counters of the feature cache.")
+    arg_parser.add_argument("--path", default=FEATURE_CACHE_PATH, help="Cache file.")
+    args = arg_parser.parse_args()
+    if not os.path.exists(args.path):
+        print(f"No feature cache at {args.path}")
+        raise SystemExit(0)
+    stats = cache_stats(args.path)
+    print(f"{args.path}: {stats['entries']} entries, version {stats['version'][:12]}")
+    print(f"{stats['run']} runs: {cache_summary(stats)}")
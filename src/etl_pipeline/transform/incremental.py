@@ -0,0 +1,175 @@
+import glob
+import hashlib
+import json
+import os
+import pandas as pd
+import pyarrow.parquet as pq
+from src.etl_pipeline.transform import (
+    config, extractors, near_dupes, parallel, pipeline, storage, skill_index, vectorized
+)
+from src.etl_pipeline.transform.near_dupes import SignatureIndex
+from src.etl_pipeline.transform.feature_cache import cache_summary
+from src.etl_pipeline.transform.parallel import (
+    Shard, shard_keys, transform_shard, resolve_duplicates, concat_parts
+)
+
+# Incremental transform over the per-thread raw files (data/threads/thread_*.parquet).
+#
+# Every thread file gets its own structured part in STATE_DIR, recorded in a manifest with
+#   - the file's content hash
+#   - the transform version (hash of the config/extractor/pipeline sources)
+#   - a digest of which of its rows survive global deduplication
+# A part is rebuilt only when one of those changes, so a new month transforms one file
+# and any edit to transform/config.py invalidates every part.
+
+STATE_DIR = os.path.join(pipeline.DATA_DIR, "structured_parts")
+MANIFEST_NAME = "manifest.json"
+
+# Sources whose content defines the structured output, including which rows survive
+# deduplication (parallel, near_dupes)
+_VERSIONED_MODULES = (config, extractors, vectorized, pipeline, skill_index, parallel, near_dupes)
+
+def transform_version() -> str:
+    """
+    Hash of the transform sources; changes whenever a dictionary or extractor is edited.
+    """
+    digest = hashlib.sha256()
+    for module in _VERSIONED_MODULES:
+        with open(module.__file__, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def _file_hash(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _positions_hash(positions) -> str:
+    return hashlib.sha256(pd.Index(positions).to_numpy(dtype='int64').tobytes()).hexdigest()
+
+def load_manifest(state_dir: str) -> dict:
+    path = os.path.join(state_dir, MANIFEST_NAME)
+    if os.path.exists(path):
+        try:
+            with open(path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Warning: unreadable manifest {path} ({e}), rebuilding.")
+    return {'version': None, 'files': {}}
+
+def save_manifest(state_dir: str, manifest: dict):
+    path = os.path.join(state_dir, MANIFEST_NAME)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+def _load_keys(shard: Shard, keys_path: str, reuse: bool) -> pd.DataFrame:
+    # Dedupe keys are cached per file so unchanged months are not re-read
+    if reuse and os.path.exists(keys_path):
+        return pd.read_parquet(keys_path)
+    keys = shard_keys(shard)
+    if 'month' in keys.columns:
+        keys['month'] = keys['month'].astype(str).where(keys['month'].notna(), None)
+    keys.to_parquet(keys_path)
+    return keys
+
+def run_incremental_transform(threads_dir: str, output_path: str, state_dir: str = STATE_DIR, vectorized_mode: bool = False,
+                              storage_profile: str = "standard", split_text: bool = False, dedupe_mode: str = "exact",
+                              signature_index_path: str = pipeline.SIGNATURE_INDEX_PATH,
+                              feature_cache_path: str = pipeline.FEATURE_CACHE_PATH):
+    """
+    Transforms only new or changed thread files and re-stitches the structured output.
+    The result equals a full run over threads_dir.
+    """
+    thread_files = sorted(glob.glob(os.path.join(threads_dir, "*.parquet")))
+    if not thread_files:
+        print(f"No thread files found in {threads_dir}")
+        return
+
+    os.makedirs(state_dir, exist_ok=True)
+    manifest = load_manifest(state_dir)
+    version = transform_version()
+    if manifest['version'] != version:
+        print("Transform version changed (or first run): all thread files will be rebuilt.")
+        manifest = {'version': version, 'files': {}}
+
+    # 1. Dedupe keys for every file (cached for unchanged files)
+    shards, entries, all_keys = [], {}, []
+    offset = 0
+    for path in thread_files:
+        name = os.path.basename(path)
+        stem = os.path.splitext(name)[0]
+        previous = manifest['files'].get(name, {})
+        content_hash = _file_hash(path)
+
+        num_rows = pq.ParquetFile(path).metadata.num_rows
+        shard = Shard(path, 0, num_rows, 0)
+        keys = _load_keys(shard, os.path.join(state_dir, f"{stem}.keys.parquet"),
+                          reuse=previous.get('content_hash') == content_hash)
+        keys.index = keys.index + offset
+        all_keys.append(keys)
+
+        shards.append((name, stem, shard, offset))
+        entries[name] = {'content_hash': content_hash}
+        offset += num_rows
+
+    keys = pd.concat(all_keys)
+    print(f"Initial rows: {len(keys)}")
+    # Near duplicates span months: signatures of unchanged files come from the index, so only
+    # new or edited postings are hashed
+    signature_index = SignatureIndex(signature_index_path) if dedupe_mode != "exact" else None
+    keep, clusters = resolve_duplicates(keys, [shard._replace(offset=offset) for _, _, shard, offset in shards],
+                                        dedupe_mode, signature_index)
+    if signature_index is not None:
+        signature_index.save()
+
+    # 2. Transform files whose content, version or surviving rows changed
+    transformed, transformed_rows = 0, 0
+    feature_cache = pipeline.open_feature_cache(feature_cache_path)
+    for name, stem, shard, offset in shards:
+        local_keep = keep[(keep >= offset) & (keep < offset + shard.stop)] - offset
+        entry = entries[name]
+        entry['kept_hash'] = _positions_hash(local_keep)
+
+        part_path = os.path.join(state_dir, f"{stem}.parquet")
+        previous = manifest['files'].get(name, {})
+        if previous == entry and os.path.exists(part_path):
+            continue
+
+        transformed_rows += transform_shard(shard, local_keep, part_path, vectorized_mode, feature_cache)
+        transformed += 1
+    if feature_cache is not None:
+        feature_cache.close()
+
+    # Drop parts of thread files that disappeared
+    for name in set(manifest['files']) - set(entries):
+        stem = os.path.splitext(name)[0]
+        for suffix in (".parquet", ".keys.parquet"):
+            stale_path = os.path.join(state_dir, f"{stem}{suffix}")
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+
+    print(f"Transformed {transformed}/{len(shards)} thread files ({transformed_rows} rows), reused {len(shards) - transformed}.")
+    if feature_cache is not None:
+        print(f"Feature cache: {cache_summary(feature_cache.counters())}")
+
+    # 3. Stitch parts; positions are stored per file and shifted to the current global offset
+    parts = []
+    for name, stem, shard, offset in shards:
+        part = pd.read_parquet(os.path.join(state_dir, f"{stem}.parquet"))
+        part.index = part.index + offset
+        parts.append(part)
+
+    final_df = concat_parts(parts)
+    if clusters is not None:
+        final_df['dup_cluster'] = clusters.reindex(final_df.index)
+    print(f"Rows after sanitation: {len(final_df)}")
+    print(f"Saving to {output_path}...")
+    storage.write_structured(final_df, output_path, storage_profile, split_text)
+
+    manifest['files'] = entries
+    save_manifest(state_dir, manifest)
+    print("Done.")
@@ -0,0 +1,200 @@
+import hashlib
+import os
+import zlib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+# Near-duplicate postings (reposts of the same ad with small edits) via MinHash + LSH.
+#
+#   1. Each posting is reduced to its set of word 3-shingles (lowercased words of Unicode
+#      letters and digits). Postings without any word get EMPTY_SIGNATURE and match nothing.
+#   2. NUM_PERM min-hashes of that set form its signature; two signatures agree on a position
+#      with probability equal to the Jaccard similarity of the shingle sets.
+#   3. LSH: signatures are cut into LSH_BANDS bands, and postings sharing any band become candidate
+#      pairs. Candidates are kept if their estimated similarity is >= NEAR_DUP_THRESHOLD.
+#   4. Clusters are the connected components of the kept pairs. The representative of a cluster
+#      is its first posting in input order.
+# Everything is a linear pass or a sort over the corpus; there is no all-pairs comparison.
+#
+# Signatures are the expensive part. A SignatureIndex keeps them on disk, keyed by posting id
+# and text digest, so a new month only hashes its own postings.
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+LSH_BANDS = 16  # 4 rows per band: pairs at Jaccard 0.8 collide in some band with p > 0.999
+NEAR_DUP_THRESHOLD = 0.8
+SIGNATURE_BATCH_DOCS = 4096
+MAX_BUCKET_PAIRS = 32
+SIGNATURE_VERSION = 2  # stored signatures of another version are recomputed
+EMPTY_SIGNATURE = np.iinfo(np.uint32).max  # every position of a posting with no shingles
+
+_rng = np.random.default_rng(20240101)  # fixed: signatures are persisted
+_PERM_A = _rng.integers(1, 1 << 63, NUM_PERM, dtype=np.uint64) | np.uint64(1)
+_PERM_B = _rng.integers(0, 1 << 63, NUM_PERM, dtype=np.uint64)
+_SHINGLE_MULTIPLIERS = np.array([0x9E3779B97F4A7C15, 0xC2B2AE3D27D4EB4F, 0x165667B19E3779F9], dtype=np.uint64)
+
+def text_digests(texts: pd.Series) -> np.ndarray:
+    """
+    64-bit digest of each text; a changed posting gets a new signature.
+    """
+    return np.array([int.from_bytes(hashlib.blake2b((text if isinstance(text, str) else '').encode('utf-8'),
+                                                    digest_size=8).digest(), 'little')
+                     for text in texts], dtype=np.uint64)
+
+def _shingle_hashes(texts: pa.Array):
+    # Flat array of shingle hashes for a batch of texts, the first shingle of each text with
+    # any, and which texts have none (no letters or digits: empty, emoji, punctuation)
+    normalized = pc.utf8_trim_whitespace(pc.replace_substring_regex(
+        pc.utf8_lower(pc.fill_null(texts, '')), r'[^\p{L}\p{N}]+', ' '))
+    empty = pc.equal(normalized, '').to_numpy(zero_copy_only=False)
+    words = pc.split_pattern(normalized, ' ')
+    lengths = pc.list_value_length(words).to_numpy(zero_copy_only=False).astype(np.int64)
+    flat_words = pc.list_flatten(words).filter(pa.array(np.repeat(~empty, lengths)))  # '' of empty texts
+    lengths[empty] = 0
+    encoded = pc.dictionary_encode(flat_words)
+    word_hashes = np.array([zlib.crc32(word.encode('utf-8')) for word in encoded.dictionary.to_pylist()],
+                           dtype=np.uint64)[encoded.indices.to_numpy()]
+
+    # shingle at i = words i .. i+SHINGLE_WORDS-1; texts shorter than that use their single words
+    doc = np.repeat(np.arange(len(lengths)), lengths)
+    doc_end = np.cumsum(lengths)[doc]
+    padded = np.concatenate([word_hashes, np.zeros(SHINGLE_WORDS - 1, dtype=np.uint64)])
+    combined = np.zeros(len(word_hashes), dtype=np.uint64)
+    for k in range(SHINGLE_WORDS):
+        combined += padded[k:k + len(word_hashes)] * _SHINGLE_MULTIPLIERS[k]
+    short = (lengths < SHINGLE_WORDS)[doc]
+    positions = np.arange(len(word_hashes))
+    valid = short | (positions + SHINGLE_WORDS <= doc_end)
+    shingles = np.where(short, word_hashes, combined)[valid]
+    valid_doc = doc[valid]
+    starts = np.searchsorted(valid_doc, np.flatnonzero(~empty))
+    return shingles, starts, empty
+
+def minhash_signatures(texts) -> np.ndarray:
+    """
+    (len(texts), NUM_PERM) uint32 MinHash signatures of the texts' word shingles;
+    EMPTY_SIGNATURE rows for texts without words.
+    """
+    texts = pa.array(pd.Series(texts, dtype=object).where(pd.notna(texts), None), type=pa.string())
+    signatures = np.full((len(texts), NUM_PERM), EMPTY_SIGNATURE, dtype=np.uint32)
+    for start in range(0, len(texts), SIGNATURE_BATCH_DOCS):
+        shingles, starts, empty = _shingle_hashes(texts[start:start + SIGNATURE_BATCH_DOCS])
+        if not len(starts):
+            continue
+        rows = start + np.flatnonzero(~empty)
+        for k in range(NUM_PERM):
+            values = (shingles * _PERM_A[k] + _PERM_B[k]) >> np.uint64(32)
+            signatures[rows, k] = np.minimum.reduceat(values, starts)
+    return signatures
+
+def candidate_pairs(signatures: np.ndarray):
+    """
+    (i, j) pairs, i < j, of signatures sharing at least one LSH band.
+    Buckets larger than MAX_BUCKET_PAIRS + 1 pair every member with the bucket's first
+    posting and with its MAX_BUCKET_PAIRS successors, instead of all pairs.
+    EMPTY_SIGNATURE rows are in no band, so in no pair.
+    """
+    active = np.flatnonzero(~(signatures == EMPTY_SIGNATURE).all(axis=1))
+    first, second = _band_pairs(signatures[active])
+    return active[first], active[second]
+
+def _band_pairs(signatures: np.ndarray):
+    n = len(signatures)
+    rows_per_band = NUM_PERM // LSH_BANDS
+    codes = []
+    for band in range(LSH_BANDS):
+        keys = np.ascontiguousarray(signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+        _, bucket, counts = np.unique(keys.view(f'V{keys.shape[1] * 4}').ravel(), return_inverse=True, return_counts=True)
+        shared = np.flatnonzero(counts[bucket] > 1)
+        if not len(shared):
+            continue
+        # Members of a bucket are contiguous and in input order, so first < second below
+        members = shared[np.argsort(bucket[shared], kind='stable')]
+        buckets = bucket[members]
+        for offset in range(1, min(counts.max(), MAX_BUCKET_PAIRS + 1)):
+            same = buckets[offset:] == buckets[:-offset]
+            codes.append(members[:-offset][same] * n + members[offset:][same])
+        if counts.max() > MAX_BUCKET_PAIRS + 1:
+            heads = members[np.searchsorted(buckets, buckets)]
+            codes.append(heads[heads != members] * n + members[heads != members])
+    codes = np.unique(np.concatenate(codes)) if codes else np.empty(0, dtype=np.int64)
+    return codes // n, codes % n
+
+def cluster_representatives(signatures: np.ndarray, threshold: float = NEAR_DUP_THRESHOLD) -> np.ndarray:
+    """
+    For each signature, the position of the first member of its near-duplicate cluster
+    (itself for postings without near duplicates).
+    """
+    n = len(signatures)
+    first, second = candidate_pairs(signatures)
+    similar = (signatures[first] == signatures[second]).mean(axis=1) >= threshold
+    graph = coo_matrix((np.ones(similar.sum(), dtype=np.int8), (first[similar], second[similar])), shape=(n, n))
+    _, labels = connected_components(graph, directed=False)
+    representative = np.full(labels.max() + 1 if n else 0, n, dtype=np.int64)
+    np.minimum.at(representative, labels, np.arange(n))
+    return representative[labels]
+
+class SignatureIndex:
+    """
+    Persistent MinHash signatures keyed by (posting id, text digest), stored as an .npz file.
+    """
+    def __init__(self, path: str = None):
+        self.path = path
+        self.ids = np.empty(0, dtype=str)
+        self.digests = np.empty(0, dtype=np.uint64)
+        self.signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        if path and os.path.exists(path):
+            with np.load(path) as stored:
+                version = int(stored['version']) if 'version' in stored.files else 1
+                if version == SIGNATURE_VERSION and stored['signatures'].shape[1] == NUM_PERM:
+                    self.ids, self.digests, self.signatures = stored['ids'], stored['digests'], stored['signatures']
+
+    def __len__(self):
+        return len(self.ids)
+
+    def lookup(self, ids, digests) -> np.ndarray:
+        """
+        Row of each (id, digest) in the index, or -1.
+        """
+        stored = pd.Series(np.arange(len(self.ids)),
+                           index=pd.MultiIndex.from_arrays([self.ids, self.digests]))
+        stored = stored[~stored.index.duplicated(keep='last')]
+        wanted = pd.MultiIndex.from_arrays([np.asarray(ids, dtype=str), np.asarray(digests, dtype=np.uint64)])
+        return stored.reindex(wanted).fillna(-1).to_numpy(dtype=np.int64)
+
+    def add(self, ids, digests, signatures: np.ndarray):
+        self.ids = np.concatenate([self.ids, np.asarray(ids, dtype=str)])
+        self.digests = np.concatenate([self.digests, np.asarray(digests, dtype=np.uint64)])
+        self.signatures = np.concatenate([self.signatures, signatures])
+
+    def signatures_for(self, ids, digests, load_texts) -> np.ndarray:
+        """
+        Signatures of the given postings. Only postings missing from the index are hashed;
+        load_texts(positions) returns the texts of those positions (into ids).
+        """
+        digests = np.asarray(digests, dtype=np.uint64)
+        rows = self.lookup(ids, digests)
+        missing = np.flatnonzero(rows < 0)
+        if len(missing):
+            print(f"Computing MinHash signatures for {len(missing)} postings ({len(rows) - len(missing)} cached)...")
+            self.add(np.asarray(ids, dtype=str)[missing], digests[missing], minhash_signatures(load_texts(missing)))
+            rows[missing] = np.arange(len(self.ids) - len(missing), len(self.ids))
+        return self.signatures[rows]
+
+    def save(self):
+        """
+        Writes the index with the latest row of each id: the signatures of edited postings'
+        earlier texts are dropped, so the file does not grow with every run.
+        """
+        if not self.path:
+            return
+        latest = ~pd.Series(self.ids).duplicated(keep='last').to_numpy()
+        self.ids, self.digests, self.signatures = self.ids[latest], self.digests[latest], self.signatures[latest]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, ids=self.ids, digests=self.digests, signatures=self.signatures, version=SIGNATURE_VERSION)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,251 @@
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, NamedTuple
+import pandas as pd
+import pyarrow.parquet as pq
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import storage
+from src.etl_pipeline.transform.near_dupes import SignatureIndex, cluster_representatives, text_digests
+from src.etl_pipeline.transform.feature_cache import FeatureCache, CACHE_COUNTERS, cache_summary
+from src.etl_pipeline.transform.pipeline import (
+    normalize_columns, is_spam, spam_filter, extract_features, enforce_schema, open_feature_cache,
+    DEDUPE_MODES, SIGNATURE_INDEX_PATH, FEATURE_CACHE_PATH
+)
+
+# Parallel transform: shards the raw input, extracts features in a process pool and
+# stitches the per-shard outputs back together in input order.
+#
+# Deduplication has to stay global, so it runs in two passes:
+#   1. workers return compact keys (id, month, text digest) for every row of their shard
+#   2. the parent resolves keep-first duplicates over all keys in input order and sends
+#      each worker the positions it keeps before extraction.
+# Near duplicates are clustered in the parent too, from MinHash signatures looked up in the
+# SignatureIndex by (id, text digest); only postings missing from it have their text re-read.
+# Rows carry their global input position as index, so the stitched output matches a
+# serial run over the same input row for row.
+
+class Shard(NamedTuple):
+    path: str
+    start: int   # first row within the file
+    stop: int    # one past the last row within the file
+    offset: int  # global position of the first row across all shards
+
+def plan_shards(input_path: str, workers: int) -> List[Shard]:
+    """
+    Splits the input into shards.
+    A directory (partitioned dataset or thread_*.parquet files) is sharded by its parquet
+    files in chronological order; a single file is split
+    into `workers` contiguous row ranges, aligned to row groups when it has enough of them.
+    """
+    if os.path.isdir(input_path):
+        paths = datasets.dataset_files(input_path)
+        shards = []
+        offset = 0
+        for path in paths:
+            num_rows = pq.ParquetFile(path).metadata.num_rows
+            shards.append(Shard(path, 0, num_rows, offset))
+            offset += num_rows
+        return shards
+
+    metadata = pq.ParquetFile(input_path).metadata
+    num_rows = metadata.num_rows
+    group_starts = [0]
+    for i in range(metadata.num_row_groups):
+        group_starts.append(group_starts[-1] + metadata.row_group(i).num_rows)
+
+    if metadata.num_row_groups >= workers:
+        step = metadata.num_row_groups / workers
+        bounds = sorted({group_starts[round(i * step)] for i in range(workers)} | {num_rows})
+    else:
+        step = num_rows / workers
+        bounds = sorted({round(i * step) for i in range(workers)} | {num_rows})
+
+    return [Shard(input_path, start, stop, start) for start, stop in zip(bounds, bounds[1:]) if stop > start]
+
+def _read_shard(shard: Shard, columns: List[str] = None) -> pd.DataFrame:
+    parquet_file = pq.ParquetFile(shard.path)
+    metadata = parquet_file.metadata
+
+    # Only decode the row groups overlapping [start, stop)
+    groups = []
+    first_row = None
+    group_start = 0
+    for i in range(metadata.num_row_groups):
+        group_stop = group_start + metadata.row_group(i).num_rows
+        if group_start < shard.stop and group_stop > shard.start:
+            groups.append(i)
+            if first_row is None:
+                first_row = group_start
+        group_start = group_stop
+
+    table = parquet_file.read_row_groups(groups, columns=columns)
+    table = table.slice(shard.start - (first_row or 0), shard.stop - shard.start)
+
+    df = table.to_pandas()
+    df.index = pd.RangeIndex(shard.offset, shard.offset + len(df))
+    return df
+
+def _text_digest(text) -> bytes:
+    if text is None or text != text:  # None or NaN compare equal to each other in drop_duplicates
+        return b''
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest()
+
+def shard_keys(shard: Shard) -> pd.DataFrame:
+    """
+    Pass 1: dedupe keys for every row of the shard.
+    """
+    df = _read_shard(shard)
+    if not normalize_columns(df):
+        raise ValueError(f"'raw_text' column not found in {shard.path}")
+
+    keys = pd.DataFrame({'id': df['id']}, index=df.index)
+    if 'date' in df.columns:
+        keys['month'] = df['date'].dt.to_period('M')
+    keys['text_digest'] = df['raw_text'].map(_text_digest)
+    keys['spam'] = is_spam(df['raw_text']).to_numpy()
+    keys['signature_digest'] = text_digests(df['raw_text'])
+    return keys
+
+def transform_shard(shard: Shard, keep_positions, shard_path: str, vectorized_mode: bool,
+                    feature_cache: FeatureCache = None) -> int:
+    """
+    Pass 2: extract features for the kept rows of the shard and write them to shard_path.
+    """
+    df = _read_shard(shard)
+    normalize_columns(df)
+    df = spam_filter(df.loc[keep_positions])
+    df = enforce_schema(extract_features(df.copy(), vectorized_mode, feature_cache))
+    df.to_parquet(shard_path)
+    return len(df)
+
+def _transform_shard_worker(shard: Shard, keep_positions, shard_path: str, vectorized_mode: bool,
+                            feature_cache_path: str):
+    # SQLite connections do not cross processes: each worker opens the cache for its shard
+    # and returns the rows written with the cache counters (None without a cache)
+    feature_cache = open_feature_cache(feature_cache_path)
+    rows = transform_shard(shard, keep_positions, shard_path, vectorized_mode, feature_cache)
+    if feature_cache is None:
+        return rows, None
+    feature_cache.close()
+    return rows, feature_cache.counters()
+
+def concat_parts(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenates structured parts in order. Empty parts are skipped so they cannot
+    widen column dtypes (e.g. bool -> object).
+    """
+    non_empty = [part for part in parts if len(part)]
+    return pd.concat(non_empty or parts[:1])
+
+def global_keep_positions(keys: pd.DataFrame) -> pd.Index:
+    """
+    Row positions surviving sanitize()'s deduplication (keep first by id, then by month + text).
+    Like drop_duplicates, rows without a date (NaT month) share one month; inputs without a
+    date column have no month key and are deduplicated by id only.
+    """
+    keys = keys[~keys.duplicated(subset=['id'])]
+    if 'month' in keys.columns:
+        keys = keys[~keys.duplicated(subset=['month', 'text_digest'], keep='first')]
+    return keys.index
+
+def _read_texts(shards: List[Shard], positions: pd.Index) -> pd.Series:
+    # raw_text of the given global positions, reading only the shards that contain them
+    texts = []
+    for shard in shards:
+        wanted = positions[(positions >= shard.offset) & (positions < shard.offset + shard.stop - shard.start)]
+        if len(wanted):
+            df = _read_shard(shard)
+            normalize_columns(df)
+            texts.append(df.loc[wanted, 'raw_text'])
+    return pd.concat(texts).reindex(positions)
+
+def near_duplicate_clusters(keys: pd.DataFrame, keep: pd.Index, shards: List[Shard],
+                            signature_index: SignatureIndex) -> pd.Series:
+    """
+    dup_cluster of every kept, non-spam position: same clusters as sanitize()'s
+    mark_near_duplicates over the same rows.
+    """
+    candidates = keys.loc[keep]
+    candidates = candidates[~candidates['spam'].to_numpy(dtype=bool)]
+    signatures = signature_index.signatures_for(candidates['id'], candidates['signature_digest'],
+                                                lambda positions: _read_texts(shards, candidates.index[positions]))
+    representative = cluster_representatives(signatures)
+    return pd.Series(candidates['id'].to_numpy()[representative], index=candidates.index, name='dup_cluster')
+
+def resolve_duplicates(keys: pd.DataFrame, shards: List[Shard], dedupe_mode: str = "exact",
+                       signature_index: SignatureIndex = None):
+    """
+    Kept positions and, for dedupe_mode flag / near, the dup_cluster of each kept posting
+    (None for exact). Near-duplicate members other than the first are not kept in near mode.
+    """
+    if dedupe_mode not in DEDUPE_MODES:
+        raise ValueError(f"Unknown dedupe mode '{dedupe_mode}' (expected one of {DEDUPE_MODES})")
+    keep = global_keep_positions(keys)
+    if dedupe_mode == "exact":
+        return keep, None
+    if signature_index is None:
+        signature_index = SignatureIndex()
+    clusters = near_duplicate_clusters(keys, keep, shards, signature_index)
+    if dedupe_mode == "near":
+        # Spam rows stay in keep; workers drop them with spam_filter as before
+        dropped = clusters.index[clusters.to_numpy() != keys.loc[clusters.index, 'id'].to_numpy()]
+        keep = keep.difference(dropped)
+    return keep, clusters
+
+def run_parallel_transform(input_path: str, output_path: str, workers: int = None, vectorized_mode: bool = False,
+                           storage_profile: str = "standard", split_text: bool = False, dedupe_mode: str = "exact",
+                           signature_index_path: str = SIGNATURE_INDEX_PATH, feature_cache_path: str = FEATURE_CACHE_PATH):
+    """
+    Sharded, multiprocess equivalent of run_transform_pipeline.
+    input_path is the partitioned raw dataset, a single raw parquet file or a directory of
+    thread_*.parquet files.
+    """
+    workers = workers or os.cpu_count()
+    if not os.path.exists(input_path):
+        print(f"Error: Input file not found at {input_path}")
+        return
+
+    shards = plan_shards(input_path, workers)
+    print(f"Transforming {input_path} in {len(shards)} shards with {workers} workers...")
+
+    shard_dir = f"{output_path}.shards"
+    os.makedirs(shard_dir, exist_ok=True)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            # 1. Global deduplication over compact keys
+            keys = pd.concat(list(executor.map(shard_keys, shards)))
+            print(f"Initial rows: {len(keys)}")
+            signature_index = SignatureIndex(signature_index_path) if dedupe_mode != "exact" else None
+            keep, clusters = resolve_duplicates(keys, shards, dedupe_mode, signature_index)
+            if signature_index is not None:
+                signature_index.save()
+
+            # 2. Extraction per shard
+            shard_paths = [os.path.join(shard_dir, f"part-{i:05d}.parquet") for i in range(len(shards))]
+            futures = [
+                executor.submit(
+                    _transform_shard_worker, shard,
+                    keep[(keep >= shard.offset) & (keep < shard.offset + shard.stop - shard.start)],
+                    shard_path, vectorized_mode, feature_cache_path
+                )
+                for shard, shard_path in zip(shards, shard_paths)
+            ]
+            results = [future.result() for future in futures]
+
+        print(f"Rows after sanitation: {sum(rows for rows, _ in results)}")
+        counters = [shard_counters for _, shard_counters in results if shard_counters]
+        if counters:
+            print(f"Feature cache: {cache_summary({name: sum(c[name] for c in counters) for name in CACHE_COUNTERS})}")
+
+        # 3. Stitch shards in input order
+        final_df = concat_parts([pd.read_parquet(path) for path in shard_paths])
+        if clusters is not None:
+            final_df['dup_cluster'] = clusters.reindex(final_df.index)
+        print(f"Saving to {output_path}...")
+        storage.write_structured(final_df, output_path, storage_profile, split_text)
+        print("Done.")
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
@@ -0,0 +1,143 @@
+import gc
+import json
+import os
+import time
+from contextlib import contextmanager, nullcontext
+from datetime import datetime, timezone
+import numpy as np
+from src.etl_pipeline.memory import reset_peak_rss, current_rss_mib, peak_rss_mib
+
+# Stage timings of a transform run, saved as a JSON report next to the structured output
+# (<output>_reports/run-<UTC time>.json, one file per run) to track regressions over time.
+#
+# Stages nest: "extract" holds one stage per extractor ("extract/salary", ...). Each stage
+# records its wall time, the rows it handled, rows/sec, the RSS when it ended and the peak RSS
+# while it ran. The peak is reset when a stage starts (see etl_pipeline/memory.py); where the
+# kernel does not allow that, it is the process peak so far.
+
+SLOW_ROW_PREVIEW_CHARS = 120
+SLOW_ROW_CANDIDATES = 10  # rows re-timed per reported row
+SLOW_ROW_REPEATS = 5
+
+def report_dir(output_path: str) -> str:
+    return f"{output_path}_reports"
+
+def null_stage(name: str, rows: int = None):
+    """
+    Stand-in for StageProfiler.stage when no profiler is given.
+    """
+    return nullcontext({})
+
+def _time_extractors(text: str, extractors: dict, repeat: int = 1) -> list:
+    # Seconds per extractor, the best of `repeat` runs
+    timings = []
+    for extractor in extractors.values():
+        best = float('inf')
+        for _ in range(repeat):
+            start = time.perf_counter()
+            extractor(text)
+            best = min(best, time.perf_counter() - start)
+        timings.append(best)
+    return timings
+
+def slowest_rows(df, extractors: dict, n: int) -> dict:
+    """
+    The n postings slowest to run through the row-wise extractors ({name: function of
+    clean_text}), with per-extractor times. Every row is timed once (about one row-wise pass);
+    the SLOW_ROW_CANDIDATES * n slowest are timed again, keeping the best of SLOW_ROW_REPEATS,
+    and the n slowest of those are reported: one-off scheduling noise does not make a short
+    posting look slow.
+    """
+    texts = df['clean_text'].tolist()
+    # As in timeit: a collection pause would be charged to whichever row triggered it
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        timings = np.array([_time_extractors(text, extractors) for text in texts]).reshape(len(texts), len(extractors))
+        candidates = np.argsort(-timings.sum(axis=1), kind='stable')[:SLOW_ROW_CANDIDATES * n]
+        for i in candidates:
+            timings[i] = _time_extractors(texts[i], extractors, SLOW_ROW_REPEATS)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    totals = timings.sum(axis=1)
+    slowest = candidates[np.argsort(-totals[candidates], kind='stable')[:n]]
+    return {
+        'rows_timed': len(texts),
+        'seconds': round(float(totals.sum()), 4),
+        'slowest_share': round(float(totals[slowest].sum() / totals.sum()), 4) if len(texts) else None,
+        'rows': [{
+            'id': str(df['id'].iat[i]),
+            'date': str(df['date'].iat[i]) if 'date' in df.columns else None,
+            'chars': len(texts[i]),
+            'total_ms': round(totals[i] * 1000, 3),
+            **{f'{name}_ms': round(timings[i, j] * 1000, 3) for j, name in enumerate(extractors)},
+            'preview': texts[i][:SLOW_ROW_PREVIEW_CHARS],
+        } for i in slowest],
+    }
+
+class StageProfiler:
+    """
+    Collects stage records: `with profiler.stage("load") as stage: ...; stage['rows'] = n`.
+    """
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.stages = []
+        self._open = []
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name: str, rows: int = None):
+        record = {'stage': '/'.join([parent['name'] for parent in self._open] + [name]), 'name': name,
+                  'rows': rows, 'seconds': None, 'rows_per_sec': None, 'rss_mib': None, 'peak_rss_mib': 0.0}
+        # The peak so far belongs to the enclosing stages: fold it in before resetting
+        self._fold_peak(peak_rss_mib())
+        self.stages.append(record)
+        self._open.append(record)
+        reset_peak_rss()
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            seconds = time.perf_counter() - start
+            self._fold_peak(peak_rss_mib())
+            self._open.pop()
+            record['seconds'] = round(seconds, 4)
+            if record['rows'] and seconds:
+                record['rows_per_sec'] = round(record['rows'] / seconds)
+            record['rss_mib'] = round(current_rss_mib(), 1)
+            record['peak_rss_mib'] = round(record['peak_rss_mib'], 1)
+
+    def _fold_peak(self, peak: float):
+        for record in self._open:
+            record['peak_rss_mib'] = max(record['peak_rss_mib'], peak)
+
+    def table(self) -> str:
+        lines = [f"{'stage':<28} {'seconds':>8} {'rows':>8} {'rows/s':>10} {'peak MiB':>9}"]
+        for record in self.stages:
+            label = '  ' * record['stage'].count('/') + record['name']
+            rows = '' if record['rows'] is None else record['rows']
+            rate = '' if record['rows_per_sec'] is None else f"{record['rows_per_sec']:,}"
+            lines.append(f"{label:<28} {record['seconds']:>8.2f} {rows:>8} {rate:>10} {record['peak_rss_mib']:>9.1f}")
+        return '\n'.join(lines)
+
+    def report(self, slow_rows: dict = None, **run_info) -> dict:
+        return {
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            **run_info,
+            'total_seconds': round(time.perf_counter() - self._start, 4),
+            'peak_rss_mib': round(max([record['peak_rss_mib'] for record in self.stages] + [peak_rss_mib()]), 1),
+            'stages': [{key: value for key, value in record.items() if key != 'name'} for record in self.stages],
+            'slowest_rows': slow_rows,
+        }
+
+    def write_report(self, output_path: str, slow_rows: dict = None, **run_info) -> str:
+        """
+        Writes the run report next to output_path and returns its path.
+        """
+        directory = report_dir(output_path)
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"run-{self.started_at.strftime('%Y%m%dT%H%M%SZ')}.json")
+        with open(path, 'w') as f:
+            json.dump(self.report(slow_rows, **run_info), f, indent=2, default=str)
+        return path
@@ -0,0 +1,138 @@
+from typing import List
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix
+from src.etl_pipeline.transform.config import SKILL_KEYWORDS
+
+# Skill bitmask index over the structured dataset.
+#
+# Every posting's tech_stack is encoded as a uint32 `skills_mask` (bit i = SKILL_NAMES[i]),
+# which the pipeline emits next to tech_stack. Trend, co-occurrence and salary-by-skill
+# queries then become bit operations and bincounts over one integer array instead of
+# explode()/apply() over Python lists:
+#
+#   skills = SkillIndex.from_frame(df)
+#   skills.trend(['Python', 'Rust'])            # % of postings per month
+#   skills.cooccurrence()                       # skill x skill posting counts
+#   skills.salary_by_skill(df['salary_avg'])    # count / median / mean per skill
+
+SKILL_NAMES = list(SKILL_KEYWORDS)
+SKILL_BITS = {name: 1 << i for i, name in enumerate(SKILL_NAMES)}
+
+def skills_to_mask(tech_stack: pd.Series) -> pd.Series:
+    masks = [sum(SKILL_BITS[skill] for skill in skills) if skills is not None else 0 for skills in tech_stack]
+    return pd.Series(np.asarray(masks, dtype=np.uint32), index=tech_stack.index, name='skills_mask')
+
+def mask_to_skills(masks: pd.Series) -> pd.Series:
+    # Masks repeat a lot (same stacks), so decode each distinct value once
+    decoded = {mask: [name for i, name in enumerate(SKILL_NAMES) if mask >> i & 1]
+               for mask in masks.unique().tolist()}
+    return pd.Series([decoded[mask] for mask in masks.tolist()], index=masks.index, name='tech_stack')
+
+class SkillIndex:
+    def __init__(self, masks, months=None, index=None):
+        """
+        masks: uint32 skill bitmasks, one per posting.
+        months: optional monthly periods aligned with masks (needed for trend()).
+        """
+        self.masks = np.asarray(masks, dtype=np.uint32)
+        self.index = index if index is not None else pd.RangeIndex(len(self.masks))
+        if months is not None:
+            self.month_codes, self.months = pd.factorize(pd.PeriodIndex(months, freq='M'), sort=True)
+        else:
+            self.month_codes, self.months = None, None
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "SkillIndex":
+        """
+        Builds the index from a structured frame: skills_mask if present, else tech_stack.
+        """
+        masks = df['skills_mask'] if 'skills_mask' in df.columns else skills_to_mask(df['tech_stack'])
+        months = pd.to_datetime(df['date']).dt.to_period('M') if 'date' in df.columns else None
+        return cls(masks.to_numpy(), months, df.index)
+
+    def __len__(self):
+        return len(self.masks)
+
+    def _skills(self, skills) -> List[str]:
+        if skills is None:
+            return SKILL_NAMES
+        if isinstance(skills, str):
+            skills = [skills]
+        unknown = [s for s in skills if s not in SKILL_BITS]
+        if unknown:
+            raise KeyError(f"Unknown skills: {unknown}")
+        return list(skills)
+
+    def has(self, *skills: str, require_all: bool = True) -> np.ndarray:
+        """
+        Boolean row selector: postings mentioning all (or any) of the given skills.
+        """
+        bits = np.uint32(sum(SKILL_BITS[s] for s in self._skills(list(skills))))
+        if require_all:
+            return self.masks & bits == bits
+        return self.masks & bits != 0
+
+    def one_hot(self, skills=None) -> np.ndarray:
+        """
+        Dense rows x skills 0/1 matrix (uint8), columns in the order of `skills`.
+        """
+        skills = self._skills(skills)
+        shifts = np.array([SKILL_NAMES.index(s) for s in skills], dtype=np.uint32)
+        return ((self.masks[:, None] >> shifts) & 1).astype(np.uint8)
+
+    def one_hot_csr(self, skills=None) -> csr_matrix:
+        return csr_matrix(self.one_hot(skills))
+
+    def counts(self, skills=None) -> pd.Series:
+        """
+        Number of postings mentioning each skill.
+        """
+        skills = self._skills(skills)
+        return pd.Series(self.one_hot(skills).sum(axis=0, dtype=np.int64), index=skills, name='count')
+
+    def trend(self, skills=None, share: bool = True) -> pd.DataFrame:
+        """
+        Months x skills table of postings mentioning each skill, as a % of that month's
+        postings (share=True) or as counts. trend().loc[month, skill] is a point lookup.
+        Postings without a date (factorized to -1) are left out, like a groupby by month.
+        """
+        if self.month_codes is None:
+            raise ValueError("SkillIndex was built without months")
+        skills = self._skills(skills)
+        num_months = len(self.months)
+        dated = self.month_codes >= 0
+        month_codes = self.month_codes[dated]
+        one_hot = self.one_hot(skills)[dated]
+        counts = np.column_stack([np.bincount(month_codes, weights=one_hot[:, j], minlength=num_months)
+                                  for j in range(len(skills))]) if skills else np.empty((num_months, 0))
+        table = pd.DataFrame(counts, index=self.months.astype(str), columns=skills)
+        table.index.name = 'month'
+        if share:
+            totals = np.bincount(month_codes, minlength=num_months)
+            return table.div(totals, axis=0) * 100
+        return table.astype(np.int64)
+
+    def cooccurrence(self, skills=None) -> pd.DataFrame:
+        """
+        Skills x skills count of postings mentioning both (diagonal = counts()).
+        """
+        skills = self._skills(skills)
+        one_hot = self.one_hot(skills).astype(np.int32)
+        return pd.DataFrame(one_hot.T @ one_hot, index=skills, columns=skills)
+
+    def salary_by_skill(self, salaries, skills=None) -> pd.DataFrame:
+        """
+        count / median / mean of `salaries` (aligned with the index) over postings
+        mentioning each skill; postings without a salary are ignored.
+        """
+        skills = self._skills(skills)
+        values = pd.Series(salaries, dtype='Float64').to_numpy(dtype=float, na_value=np.nan)
+        known = ~np.isnan(values)
+        rows = []
+        for skill in skills:
+            selected = values[known & self.has(skill)]
+            rows.append((len(selected),
+                         np.median(selected) if len(selected) else np.nan,
+                         selected.mean() if len(selected) else np.nan))
+        return pd.DataFrame(rows, index=skills, columns=['count', 'median', 'mean'])
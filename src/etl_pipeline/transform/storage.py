@@ -0,0 +1,166 @@
+import os
+import shutil
+from typing import List
+import numpy as np
+import pandas as pd
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform.skill_index import skills_to_mask, mask_to_skills
+
+# Storage profiles for the structured dataset.
+#
+# "standard": the FINAL_COLUMNS frame as produced by enforce_schema.
+# "compact":  same information in fewer bytes, both on disk and once loaded:
+#   - the boolean feature columns are packed into one uint16 `flags` column (bit i = FLAG_COLUMNS[i])
+#   - tech_stack is dropped in favour of its uint32 `skills_mask` (see skill_index.py); lossless
+#     because extract_skills returns skills in SKILL_KEYWORDS order
+#   - currency / job_category are categoricals (dictionary-encoded in parquet)
+#   - salaries and years_experience use narrower nullable integers
+# Either profile can move raw_text to a side table (<output>_text, same partitioning) joined by id.
+
+STORAGE_PROFILES = ("standard", "compact")
+
+FLAG_COLUMNS = [
+    'is_remote', 'is_senior', 'is_junior', 'is_manager',
+    'is_tier_1_city', 'is_europe', 'is_global_remote',
+    'is_yc', 'is_funded', 'is_crypto',
+    'has_equity', 'offers_visa',
+    'tech_combo_ai', 'tech_combo_blockchain'
+]
+CATEGORY_COLUMNS = ['currency', 'salary_unit', 'job_category']  # low cardinality only: every file stores the full dictionary
+NARROW_INTEGERS = {'salary_min': 'Int32', 'salary_max': 'Int32', 'salary_avg': 'Int32', 'years_experience': 'Int16'}
+
+def text_path(output_path: str) -> str:
+    return f"{output_path}_text"
+
+def pack_flags(df: pd.DataFrame) -> pd.Series:
+    flags = np.zeros(len(df), dtype=np.uint16)
+    for bit, column in enumerate(FLAG_COLUMNS):
+        if column in df.columns:
+            flags |= df[column].fillna(False).to_numpy(dtype=bool).astype(np.uint16) << bit
+    return pd.Series(flags, index=df.index, name='flags')
+
+def unpack_flags(flags: pd.Series, columns: List[str] = FLAG_COLUMNS) -> pd.DataFrame:
+    values = flags.to_numpy(dtype=np.uint16)
+    return pd.DataFrame({column: (values >> FLAG_COLUMNS.index(column)) & 1 == 1 for column in columns},
+                        index=flags.index)
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts an enforce_schema() frame to the compact profile, keeping the column order
+    (flags replaces the first flag column).
+    """
+    columns = {}
+    for column in df.columns:
+        if column == 'tech_stack':
+            if 'skills_mask' not in df.columns:
+                columns['skills_mask'] = skills_to_mask(df[column])
+        elif column in FLAG_COLUMNS:
+            if 'flags' not in columns:
+                columns['flags'] = pack_flags(df)
+        elif column in CATEGORY_COLUMNS:
+            columns[column] = df[column].astype('category')
+        elif column in NARROW_INTEGERS:
+            columns[column] = df[column].astype(NARROW_INTEGERS[column])
+        else:
+            columns[column] = df[column]
+    return pd.DataFrame(columns, index=df.index)
+
+def expand_frame(df: pd.DataFrame, columns: List[str] = None) -> pd.DataFrame:
+    """
+    Decodes a compact frame back to the standard column layout.
+    Categoricals and narrow integers are kept; they compare equal to the standard values.
+    """
+    # Imported here: pipeline imports this module
+    from src.etl_pipeline.transform.pipeline import FINAL_COLUMNS
+    columns = columns or FINAL_COLUMNS
+    expanded = df.drop(columns=[c for c in ('flags',) if c in df.columns])
+    if 'skills_mask' in df.columns and 'tech_stack' in columns:
+        expanded['tech_stack'] = mask_to_skills(df['skills_mask'])
+    if 'flags' in df.columns:
+        flag_columns = [c for c in FLAG_COLUMNS if c in columns]
+        expanded = expanded.join(unpack_flags(df['flags'], flag_columns))
+    return expanded[[c for c in columns if c in expanded.columns]]
+
+def stored_profile(path: str):
+    """
+    Storage profile of an existing structured dataset, or None if there is none.
+    """
+    if not os.path.isdir(path) or not datasets.dataset_files(path):
+        return None
+    return "compact" if 'flags' in datasets.stored_columns(path) else "standard"
+
+def write_structured(df: pd.DataFrame, output_path: str, profile: str = "standard", split_text: bool = False):
+    """
+    Writes the structured dataset in the given storage profile, optionally with raw_text
+    in a side table.
+    """
+    if profile not in STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{profile}' (expected one of {STORAGE_PROFILES})")
+    if profile == "compact":
+        df = compact_frame(df)
+
+    side_path = text_path(output_path)
+    if split_text and 'raw_text' in df.columns:
+        datasets.write_partitioned_frame(df[['id', 'date', 'raw_text']], side_path, 'date')
+        df = df.drop(columns=['raw_text'])
+    else:
+        # A stale side table would otherwise be joined onto the new output
+        shutil.rmtree(side_path, ignore_errors=True)
+    datasets.write_partitioned_frame(df, output_path, 'date')
+
+def storage_columns(wanted: List[str], stored: List[str]) -> List[str]:
+    """
+    Stored columns behind standard column names: flags and skills_mask in the compact profile.
+    """
+    compact = 'flags' in stored
+    read_columns = []
+    for column in wanted:
+        if compact and column in FLAG_COLUMNS:
+            column = 'flags'
+        elif compact and column == 'tech_stack':
+            column = 'skills_mask'
+        if column in stored and column not in read_columns:
+            read_columns.append(column)
+    return read_columns
+
+def read_structured(path: str, columns: List[str] = None, filters=None, expand: bool = True) -> pd.DataFrame:
+    """
+    Reads a structured dataset written in any profile.
+    columns are standard column names; only the storage columns behind them are decoded,
+    and raw_text is read from the side table only when requested.
+    expand=False returns compact data as stored (flags / skills_mask).
+    """
+    from src.etl_pipeline.transform.pipeline import FINAL_COLUMNS
+    wanted = list(columns or FINAL_COLUMNS)
+    stored = datasets.stored_columns(path)
+    compact = 'flags' in stored
+    split_text = 'raw_text' in wanted and 'raw_text' not in stored and os.path.isdir(text_path(path))
+
+    read_columns = storage_columns(wanted + (['id'] if split_text else []), stored)
+    df = datasets.read_partitioned(path, columns=read_columns, filters=filters)
+    if split_text:
+        text = datasets.read_partitioned(text_path(path), columns=['id', 'raw_text'], filters=filters)
+        df['raw_text'] = df['id'].map(text.set_index('id')['raw_text'])
+
+    if compact and expand:
+        return expand_frame(df, wanted)
+    if compact:
+        return df
+    return df[[c for c in wanted if c in df.columns]]
+
+def iter_structured(path: str, batch_rows: int = datasets.ROW_GROUP_ROWS, columns: List[str] = None, filters=None):
+    """
+    read_structured one DataFrame of at most batch_rows rows at a time, in dataset order,
+    for passes over data larger than memory. raw_text must be stored in the dataset itself.
+    """
+    from src.etl_pipeline.transform.pipeline import FINAL_COLUMNS
+    wanted = list(columns or FINAL_COLUMNS)
+    stored = datasets.stored_columns(path)
+    if 'raw_text' in wanted and 'raw_text' not in stored and os.path.isdir(text_path(path)):
+        raise ValueError(f"{path} keeps raw_text in a side table; batches need it in the dataset (rewrite without --split-text)")
+    compact = 'flags' in stored
+    for df in datasets.iter_partitioned(path, batch_rows, storage_columns(wanted, stored), filters):
+        if compact:
+            yield expand_frame(df, wanted)
+        else:
+            yield df[[c for c in wanted if c in df.columns]]
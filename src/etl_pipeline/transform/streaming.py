@@ -0,0 +1,142 @@
+import os
+import shutil
+import time
+from typing import Iterable, Iterator
+import pandas as pd
+from src.etl_pipeline import datasets
+from src.etl_pipeline.memory import peak_rss_mib
+from src.etl_pipeline.transform import storage
+from src.etl_pipeline.transform.feature_cache import FeatureCache, cache_summary, text_digest
+from src.etl_pipeline.transform.pipeline import (
+    normalize_columns, is_spam, extract_features, enforce_schema, open_feature_cache, FEATURE_CACHE_PATH
+)
+
+# Streaming extract -> transform: postings flow through sanitation and the extractors in
+# batches of STREAM_BATCH_ROWS and are written straight into the structured dataset, one row
+# group per batch. Sources are parsed comment pages (extract/main.py --stream) or the raw
+# dataset (pipeline.py --stream); no stage holds more than a batch, so peak memory does not
+# grow with the input and the first batch is transformed as soon as its pages are parsed.
+#
+# Output equals the batch pipeline's on the same input (exact deduplication only: near
+# duplicates are clustered over every posting at once), except that compact-profile categoricals
+# list their categories in order of appearance. The ids and (text digest, month) keys seen so
+# far are the only state carried between batches, under 200 bytes per posting.
+
+STREAM_BATCH_ROWS = 5000
+
+def frame_batches(records: Iterable[dict], batch_rows: int = STREAM_BATCH_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    Groups comment records (parser.parse_comments output) into DataFrames of batch_rows rows.
+    """
+    batch = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_rows:
+            yield pd.DataFrame(batch)
+            batch = []
+    if batch:
+        yield pd.DataFrame(batch)
+
+def with_positions(frames: Iterable[pd.DataFrame], offset: int = 0) -> Iterator[pd.DataFrame]:
+    # Index rows by their position in the whole stream, as a batch run indexes the loaded frame
+    for df in frames:
+        df.index = pd.RangeIndex(offset, offset + len(df))
+        offset += len(df)
+        yield df
+
+def sanitize_batches(frames: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    pipeline.sanitize (exact mode) over a stream: a row is dropped if its id, or its text
+    within the same month, came earlier in the stream; then spam is filtered out.
+    """
+    seen_ids, seen_texts = set(), set()
+    for df in frames:
+        if not normalize_columns(df):
+            raise ValueError("Input has no text column")
+        if 'date' in df.columns:
+            months = (df['date'].dt.year * 12 + df['date'].dt.month).fillna(0).astype('int64').tolist()
+        else:
+            months = [0] * len(df)
+        keep = []
+        for id_value, month, text in zip(df['id'], months, df['raw_text']):
+            text_key = text_digest(text) + month.to_bytes(4, 'little')
+            keep.append(id_value not in seen_ids and text_key not in seen_texts)
+            if id_value not in seen_ids:
+                seen_ids.add(id_value)
+                seen_texts.add(text_key)
+        df = df[keep]
+        df = df[~is_spam(df['raw_text'])]
+        if len(df):
+            yield df
+
+def transform_batches(frames: Iterable[pd.DataFrame], vectorized_mode: bool = False,
+                      feature_cache: FeatureCache = None) -> Iterator[pd.DataFrame]:
+    for df in frames:
+        yield enforce_schema(extract_features(df.copy(), vectorized_mode, feature_cache))
+
+def _next_position(output_path: str) -> int:
+    # Rows added to an existing dataset are indexed after its rows, so the index stays unique
+    if not os.path.isdir(output_path) or not datasets.dataset_files(output_path):
+        return 0
+    index = datasets.read_partitioned(output_path, columns=[]).index
+    return int(index.max()) + 1 if len(index) else 0
+
+def _check_stored_columns(output_path: str, columns):
+    # Months are replaced in place: the other months must have the same layout
+    if os.path.isdir(output_path) and datasets.dataset_files(output_path):
+        stored = [c for c in datasets.stored_columns(output_path) if not c.startswith('__index_level_')]
+        if stored != list(columns):
+            raise ValueError(f"{output_path} holds other columns ({len(stored)}); rewrite it with a full run first")
+
+def run_streaming_transform(frames: Iterable[pd.DataFrame], output_path: str, vectorized_mode: bool = False,
+                            storage_profile: str = "standard", feature_cache_path: str = FEATURE_CACHE_PATH,
+                            replace_months: bool = False) -> int:
+    """
+    Sanitizes, transforms and writes a stream of raw frames (columns as in the raw dataset).
+    replace_months only replaces the months the stream covers, e.g. a new month's thread,
+    and keeps the rest of the structured dataset. Returns the number of rows written.
+    """
+    if storage_profile not in storage.STORAGE_PROFILES:
+        raise ValueError(f"Unknown storage profile '{storage_profile}' (expected one of {storage.STORAGE_PROFILES})")
+    start = time.perf_counter()
+    counts = {'in': 0, 'out': 0, 'batches': 0}
+    first_batch = []
+
+    def counted(frames):
+        for df in frames:
+            counts['in'] += len(df)
+            yield df
+
+    def written(frames):
+        for df in frames:
+            if storage_profile == "compact":
+                df = storage.compact_frame(df)
+            if not counts['batches'] and replace_months:
+                _check_stored_columns(output_path, df.columns)
+            counts['out'] += len(df)
+            counts['batches'] += 1
+            if not first_batch:
+                first_batch.append(time.perf_counter() - start)
+                print(f"First batch transformed after {first_batch[0]:.2f}s ({len(df)} rows)")
+            yield df
+
+    if not replace_months:
+        # As in storage.write_structured: a stale side table would be joined onto the new output
+        shutil.rmtree(storage.text_path(output_path), ignore_errors=True)
+    feature_cache = open_feature_cache(feature_cache_path)
+    try:
+        offset = _next_position(output_path) if replace_months else 0
+        stream = transform_batches(sanitize_batches(with_positions(counted(frames), offset)), vectorized_mode,
+                                   feature_cache)
+        datasets.write_partitioned_frames(written(stream), output_path, 'date', replace_partitions=replace_months)
+    finally:
+        if feature_cache is not None:
+            feature_cache.close()
+
+    elapsed = time.perf_counter() - start
+    print(f"Streamed {counts['in']} postings in {counts['batches']} batches: {counts['out']} rows "
+          f"{'written to the months they cover in' if replace_months else 'saved to'} {output_path} "
+          f"in {elapsed:.2f}s (peak RSS {peak_rss_mib():.0f} MiB)")
+    if feature_cache is not None:
+        print(f"Feature cache: {cache_summary(feature_cache.counters())}")
+    return counts['out']
@@ -0,0 +1,235 @@
+import itertools
+import re
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+from src.etl_pipeline.transform.extractors import (
+    KEYWORD_FLAGS, ROLE_PRIORITY, YEARS_PATTERN,
+    SalaryMention, SALARY_TOKEN_PATTERN, DOTTED_THOUSANDS_PATTERN, BLANK_CHARS, SALARY_PRECEDING_REGEX, SALARY_CONTEXT_CHARS, GLUED_CHARS, SALARY_FEATURE_COLUMNS,
+    SALARY_CURRENCY_CODES, SALARY_CURRENCY_SYMBOLS, SALARY_PERIODS, SALARY_PERIOD_WORDS, PERIOD_FACTORS,
+    CONFIDENCE_BASE, CONFIDENCE_CURRENCY, CONFIDENCE_THOUSANDS, CONFIDENCE_RANGE, CONFIDENCE_PERIOD,
+    CONFIDENCE_CONTEXT, CONFIDENCE_GUESSED_PERIOD, MIN_SALARY_CONFIDENCE,
+    MAX_HOURLY_RATE, MONTHLY_SALARY_RANGE, ANNUAL_SALARY_RANGE
+)
+
+# Column-at-a-time counterparts of the row-wise extractors in extractors.py.
+# Each function takes a Series of texts and returns whole columns aligned on its index,
+# using pandas string kernels (pyarrow-backed for the default string dtype).
+# The shared patterns run in pyarrow's RE2 here and in Python's re row-wise; they spell out
+# digits and whitespace (see BLANK_CHARS in extractors.py) so both engines match the same text.
+# Known remaining differences: pyarrow lowercases 'İ' to 'i' (Python: 'i̇') and keeps a final
+# 'Σ' as 'σ' (Python: 'ς'), and the \x1c-\x1f separators are not whitespace for either mode.
+# Skills stay row-wise in both modes: their patterns rely on Python's Unicode \b.
+
+def _keyword_pattern(keywords) -> str:
+    return '|'.join(re.escape(keyword) for keyword in keywords)
+
+def _named_groups(pattern: str) -> str:
+    # pyarrow's extract_regex only returns named groups: (x) -> (?P<g0>x)
+    counter = itertools.count()
+    return re.sub(r'(?<!\\)\((?!\?)', lambda _: f"(?P<g{next(counter)}>", pattern)
+
+def _extract(texts: pd.Series, pattern: re.Pattern) -> pd.DataFrame:
+    """
+    First match of pattern in every text, one column per capture group (NaN when no match).
+    Equivalent to Series.str.extract but runs in pyarrow's regex kernel.
+    """
+    matches = pc.extract_regex(pa.array(texts, type=pa.string()), _named_groups(pattern.pattern))
+    groups = pd.DataFrame({
+        i: pc.struct_field(matches, [i]).to_pandas() for i in range(matches.type.num_fields)
+    })
+    groups.index = texts.index
+    return groups
+
+def clean_text_column(texts: pd.Series) -> pd.Series:
+    """
+    Vectorized clean_text.
+    """
+    return texts.fillna("").str.strip()
+
+def _dotted_thousands(amounts: pd.Series) -> pd.Series:
+    # Same test as _has_dotted_thousands in extractors.py ("120.000", "1.200.000")
+    return ~amounts.str.contains(',', regex=False) & amounts.str.contains(DOTTED_THOUSANDS_PATTERN)
+
+def _plain_amounts(amounts: pd.Series) -> pd.Series:
+    # Same as _plain_amount in extractors.py: thousands separators removed
+    return amounts.str.replace(DOTTED_THOUSANDS_PATTERN, '', regex=True).where(
+        _dotted_thousands(amounts), amounts.str.replace(',', '', regex=False))
+
+def _salary_amounts(amounts: pd.Series) -> np.ndarray:
+    # Same conversion as _salary_amount in extractors.py once plain: "120k" -> 120000.0, '' -> NaN
+    values = amounts.str.removesuffix('k').replace('', 'nan').to_numpy(dtype=float)
+    return np.where(amounts.str.endswith('k').to_numpy(dtype=bool), values * 1000, values)
+
+def _is_thousands(amounts: pd.Series) -> np.ndarray:
+    # Amounts are [0-9]+(.[0-9]+)?k? once plain: five or more integer digits <=> five leading digits
+    return (amounts.str.endswith('k') | amounts.str.match(r'[0-9]{5}')).to_numpy(dtype=bool)
+
+def _salary_tokens(texts: pd.Series) -> pd.DataFrame:
+    """
+    Every SALARY_TOKEN_PATTERN match in the texts, one row per token in text order:
+    `row` (position of the text), the token's groups ('' when unmatched) and the
+    SALARY_PRECEDING_REGEX groups of the text before it.
+    """
+    text_lower = pc.utf8_lower(pc.fill_null(pa.array(texts, type=pa.string()), ''))
+    utf8 = np.frombuffer(text_lower.buffers()[2], dtype=np.uint8)
+    if ((utf8 == 0x1e) | (utf8 == 0x1f)).any():  # reserved for the rewrite below
+        text_lower = pc.replace_substring_regex(text_lower, '[\x1e\x1f]', '')
+
+    # A single RE2 pass rewrites each token as \x1f<group>\x1e<group>...\x1f, so splitting on \x1f
+    # gives [text, token, text, token, ..., text] for every posting
+    groups = list(SALARY_TOKEN_PATTERN.groupindex)
+    rewrite = '\x1f' + '\x1e'.join(f"\\{i}" for i in range(1, len(groups) + 1)) + '\x1f'
+    pieces = pc.split_pattern(pc.replace_substring_regex(text_lower, SALARY_TOKEN_PATTERN.pattern, rewrite), '\x1f')
+    offsets = pieces.offsets.to_numpy()
+    rows = np.repeat(np.arange(len(texts)), np.diff(offsets))
+    tokens = np.flatnonzero((np.arange(len(rows)) - offsets[rows]) % 2 == 1)
+    pieces = pieces.flatten()
+
+    values = pc.split_pattern(pieces.take(tokens), '\x1e')
+    columns = {'row': rows[tokens]}
+    for i, group in enumerate(groups):
+        columns[group] = pc.list_element(values, i).to_pandas()
+
+    preceding = pc.utf8_slice_codeunits(pieces.take(tokens - 1), start=-SALARY_CONTEXT_CHARS)
+    before = pc.extract_regex(preceding, SALARY_PRECEDING_REGEX + '$')
+    for i, group in enumerate(before.type):
+        columns[group.name] = pc.struct_field(before, [i]).to_pandas()
+    columns['glued'] = pc.is_in(pc.utf8_slice_codeunits(preceding, start=-1),
+                                pa.array(sorted(GLUED_CHARS))).to_numpy(zero_copy_only=False)
+    return pd.DataFrame(columns)
+
+def _salary_mentions(texts: pd.Series) -> pd.DataFrame:
+    # extract_salary_mentions for all texts at once; `row` is the position of the text
+    tokens = _salary_tokens(texts)
+    low_text, high_text = _plain_amounts(tokens['low']), _plain_amounts(tokens['high'])
+    has_high = (high_text != '').to_numpy(dtype=bool)
+    dotted = (_dotted_thousands(tokens['low']) | _dotted_thousands(tokens['high'])).to_numpy(dtype=bool)  # never hourly
+    plan = (tokens['plan'] != '').to_numpy(dtype=bool)  # retirement plans: skipped, currency included
+
+    # Currency: a code on either side wins over a symbol; unmarked amounts take the last one written
+    code = tokens['currency_after'].where(tokens['currency_after'] != '', tokens['currency'].str.rstrip(BLANK_CHARS + '$€£'))
+    currency = code.map(SALARY_CURRENCY_CODES).fillna(tokens['currency'].map(SALARY_CURRENCY_SYMBOLS)).where(~plan)
+    marked = currency.notna().to_numpy(dtype=bool)
+    currency = currency.groupby(tokens['row']).ffill().fillna("USD")
+
+    low = _salary_amounts(low_text)
+    high = np.where(has_high, _salary_amounts(high_text), low)
+    low = np.where(has_high & (low < 1000) & (1000 < high), low * 1000, low)  # "100-140k"
+
+    # Pay period: as written, else guessed from the amount
+    written = tokens['period'].map(SALARY_PERIODS).fillna(tokens['period_word'].map(SALARY_PERIOD_WORDS))
+    has_period = written.notna().to_numpy(dtype=bool)
+    average = (low + high) / 2
+    guessed = np.select(
+        [(low < MAX_HOURLY_RATE) & ~dotted, (average >= MONTHLY_SALARY_RANGE[0]) & (average <= MONTHLY_SALARY_RANGE[1])],
+        ['hourly', 'monthly'], 'annual')
+    unit = np.where(has_period, written.to_numpy(dtype=object), guessed)
+
+    confidence = np.full(len(tokens), CONFIDENCE_BASE)
+    confidence += np.where(marked, CONFIDENCE_CURRENCY, 0)
+    confidence += np.where(_is_thousands(low_text) | (has_high & _is_thousands(high_text)), CONFIDENCE_THOUSANDS, 0)
+    confidence += np.where(has_high, CONFIDENCE_RANGE, 0)
+    confidence += np.select([has_period, unit != 'annual'], [CONFIDENCE_PERIOD, CONFIDENCE_GUESSED_PERIOD], 0)
+    confidence += np.where(tokens['context'] != '', CONFIDENCE_CONTEXT, 0)
+    confidence = np.round(np.minimum(confidence, 1.0), 2)
+
+    factor = pd.Series(unit).map(PERIOD_FACTORS).to_numpy(dtype=float)
+    salary_min, salary_max = np.round(low * factor), np.round(high * factor)
+    average = (salary_min + salary_max) / 2
+
+    accepted = (
+        ~tokens['glued'].to_numpy(dtype=bool)
+        & (tokens['magnitude'] == '').to_numpy(dtype=bool) & (tokens['follower'] == '').to_numpy(dtype=bool)
+        & ~plan
+        & (low > 0) & (high >= low)
+        & (confidence >= MIN_SALARY_CONFIDENCE)
+        & (average >= ANNUAL_SALARY_RANGE[0]) & (average <= ANNUAL_SALARY_RANGE[1])
+    )
+    return pd.DataFrame({
+        'row': tokens['row'].to_numpy()[accepted],
+        'salary_min': salary_min[accepted].astype(np.int64),
+        'salary_max': salary_max[accepted].astype(np.int64),
+        'currency': currency.to_numpy(dtype=object)[accepted],
+        'unit': unit[accepted],
+        'confidence': confidence[accepted],
+    })
+
+def salary_mentions_column(texts: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized extract_salary_mentions.
+    Returns one row per mention (SalaryMention fields as columns), indexed by the label of
+    its text and in text order.
+    """
+    mentions = _salary_mentions(texts)
+    return mentions.drop(columns=['row']).set_axis(texts.index[mentions['row'].to_numpy()])
+
+def parse_salary_column(texts: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized extract_salary_features.
+    Returns a DataFrame with the SALARY_FEATURE_COLUMNS.
+    """
+    mentions = _salary_mentions(texts)
+    # Most confident mention of each text, the first one on ties
+    best = mentions.sort_values(['row', 'confidence'], ascending=[True, False], kind='stable').drop_duplicates('row')
+
+    columns = {}
+    for column, field in [('salary_min', 'salary_min'), ('salary_max', 'salary_max'), ('currency', 'currency'),
+                          ('salary_unit', 'unit'), ('salary_confidence', 'confidence')]:
+        values = pd.Series(best[field].to_numpy(), index=best['row'].to_numpy())
+        columns[column] = values.reindex(range(len(texts))).to_numpy()
+
+    fields = list(SalaryMention._fields)
+    mention_lists = [[] for _ in range(len(texts))]
+    for row, *values in zip(mentions['row'].tolist(), *(mentions[field].tolist() for field in fields)):
+        mention_lists[row].append(dict(zip(fields, values)))
+    columns['salary_mentions'] = mention_lists
+    return pd.DataFrame(columns, index=texts.index)[SALARY_FEATURE_COLUMNS]
+
+def extract_keyword_columns(texts: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized extract_keyword_features.
+    Returns one column per keyword flag plus job_category and years_experience.
+    """
+    text_lower = texts.str.lower()
+    columns = {}
+
+    for flag, keywords in KEYWORD_FLAGS:
+        columns[flag] = text_lower.str.contains(_keyword_pattern(keywords), regex=True, na=False).astype(bool)
+
+    role_masks = [
+        text_lower.str.contains(_keyword_pattern(keywords), regex=True, na=False).astype(bool)
+        for _, keywords in ROLE_PRIORITY
+    ]
+    roles = [role for role, _ in ROLE_PRIORITY]
+    columns['job_category'] = pd.Series(np.select(role_masks, roles, "General"), index=texts.index)
+
+    years = _extract(text_lower, YEARS_PATTERN)[0]
+    columns['years_experience'] = pd.to_numeric(years, errors='coerce').astype('float64')
+
+    return pd.DataFrame(columns, index=texts.index)
+
+def extract_pipe_fields_column(texts: pd.Series) -> pd.DataFrame:
+    """
+    Vectorized extract_company and role title heuristics.
+    Splits "Company | Role | ..." headers into company_name and role_title.
+    """
+    parts = texts.str.partition('|')
+    has_pipe = parts[1] == '|'
+
+    company = parts[0].str.strip()
+    company_ok = has_pipe & (company.str.len() < 50)
+
+    role_title = parts[2].str.partition('|')[0].str.strip()
+
+    return pd.DataFrame({
+        'company_name': company.where(company_ok, None),
+        'role_title': role_title.where(has_pipe, None),
+    }, index=texts.index)
+
+def is_remote_column(texts: pd.Series) -> pd.Series:
+    """
+    Vectorized remote flag.
+    """
+    return texts.str.lower().str.contains("remote", regex=False, na=False).astype(bool)
@@ -0,0 +1,183 @@
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+from datetime import datetime, timezone
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, load_npz, save_npz
+from src.etl_pipeline import data_access
+from src.etl_pipeline.transform import skill_index, storage
+from src.etl_pipeline.transform.pipeline import DATA_DIR, OUTPUT_DIR
+from src.machine_learning import features
+from src.machine_learning.features import SalaryFeatures, RoleFeatures, top_techs
+
+# Feature store: the salary and role featurizers fitted once per structured dataset version,
+# with the feature matrices of every row, so training and scoring load features instead of
+# refitting TF-IDF and rebuilding the one-hot columns each session. Run it after the
+# transform pipeline (python -m src.machine_learning.feature_store); the notebook builds it
+# on first use.
+#
+# Each version is a directory under FEATURE_STORE_DIR named after dataset_version():
+#   manifest.json     dataset path, start year, shapes, build time
+#   featurizers.pkl   {'salary': SalaryFeatures, 'role': RoleFeatures}
+#   salary.npz        salary model inputs of every row (CSR, uncompressed)
+#   role.npz          role model inputs of every row
+#   rows.parquet      id, date, log_salary (salary model rows only), job_category
+# Rows are in dataset order; the salary model trains on the rows with a log_salary (USD
+# salaries) and the role model on the rows with a job_category.
+
+FEATURE_STORE_DIR = os.path.join(DATA_DIR, "feature_store")
+MANIFEST_NAME = "manifest.json"
+STORE_VERSIONS = 3  # most recent versions kept
+
+class FeatureSet(NamedTuple):
+    version: str
+    rows: pd.DataFrame
+    salary_features: SalaryFeatures
+    role_features: RoleFeatures
+    salary_matrix: csr_matrix
+    role_matrix: csr_matrix
+
+    def salary_training(self):
+        """
+        (X, y) of the salary model: USD salary rows and their log1p salaries.
+        """
+        mask = self.rows['log_salary'].notna().to_numpy()
+        return self.salary_matrix[mask], self.rows.loc[mask, 'log_salary']
+
+    def role_training(self):
+        """
+        (X, y) of the role model: rows with a job_category.
+        """
+        mask = self.rows['job_category'].notna().to_numpy()
+        return self.role_matrix[mask], self.rows.loc[mask, 'job_category']
+
+def features_version() -> str:
+    """
+    Hash of the feature engineering sources; a change invalidates every stored version.
+    """
+    digest = hashlib.sha256()
+    for module_file in (features.__file__, skill_index.__file__):
+        with open(module_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def dataset_version(structured_path: str, start_year: int = None) -> str:
+    """
+    Key of the structured dataset's current files (path, size, modification time; datasets
+    are rewritten, never edited in place), the start year and the feature sources.
+    Computed from file metadata only.
+    """
+    key = f"{start_year}|{features_version()}|{data_access.source_version(structured_path)}"
+    return hashlib.sha256(key.encode('utf-8')).hexdigest()[:16]
+
+def salary_training_rows(df: pd.DataFrame) -> pd.Series:
+    # Salaries are annualized and limited by the pipeline; USD only to reduce noise
+    return df['salary_avg'].notnull() & (df['currency'] == 'USD')
+
+def _load(version_dir: str, version: str) -> FeatureSet:
+    with open(os.path.join(version_dir, 'featurizers.pkl'), 'rb') as f:
+        featurizers = pickle.load(f)
+    return FeatureSet(
+        version=version,
+        rows=pd.read_parquet(os.path.join(version_dir, 'rows.parquet')),
+        salary_features=featurizers['salary'],
+        role_features=featurizers['role'],
+        salary_matrix=load_npz(os.path.join(version_dir, 'salary.npz')),
+        role_matrix=load_npz(os.path.join(version_dir, 'role.npz')),
+    )
+
+def load_features(structured_path: str = OUTPUT_DIR, store_dir: str = FEATURE_STORE_DIR,
+                  start_year: int = None) -> FeatureSet:
+    """
+    The stored features of the dataset's current version, or None if they were not built.
+    """
+    version = dataset_version(structured_path, start_year)
+    version_dir = os.path.join(store_dir, version)
+    if not os.path.exists(os.path.join(version_dir, MANIFEST_NAME)):
+        return None
+    return _load(version_dir, version)
+
+def _prune(store_dir: str, keep: int = STORE_VERSIONS):
+    versions = [os.path.join(store_dir, name) for name in os.listdir(store_dir)
+                if os.path.exists(os.path.join(store_dir, name, MANIFEST_NAME))]
+    for version_dir in sorted(versions, key=os.path.getmtime, reverse=True)[keep:]:
+        shutil.rmtree(version_dir, ignore_errors=True)
+
+def build_feature_store(structured_path: str = OUTPUT_DIR, store_dir: str = FEATURE_STORE_DIR,
+                        start_year: int = None, rebuild: bool = False) -> FeatureSet:
+    """
+    Fits the featurizers on the structured dataset (from start_year on) and stores them with
+    the feature matrices of every row. An up-to-date version is loaded instead unless rebuild.
+    """
+    version = dataset_version(structured_path, start_year)
+    version_dir = os.path.join(store_dir, version)
+    if not rebuild and os.path.exists(os.path.join(version_dir, MANIFEST_NAME)):
+        print(f"Feature store is up to date ({version}).")
+        return _load(version_dir, version)
+
+    start = time.perf_counter()
+    filters = [('year', '>=', start_year)] if start_year else None
+    df = storage.read_structured(structured_path, filters=filters)
+    print(f"Fitting features on {len(df)} rows of {structured_path}...")
+    techs = top_techs(df)
+    salary_rows = salary_training_rows(df)
+    salary_features = SalaryFeatures(techs).fit(df[salary_rows])
+    role_features = RoleFeatures(techs).fit(df[df['job_category'].notnull()])
+    feature_set = FeatureSet(
+        version=version,
+        rows=pd.DataFrame({
+            'id': df['id'].to_numpy(),
+            'date': df['date'].to_numpy(),
+            'log_salary': np.log1p(df['salary_avg'].astype('float64')).where(salary_rows).to_numpy(),
+            'job_category': df['job_category'].to_numpy(),
+        }),
+        salary_features=salary_features,
+        role_features=role_features,
+        salary_matrix=salary_features.transform(df),
+        role_matrix=role_features.transform(df),
+    )
+
+    # Written aside and moved in: an interrupted build never looks complete
+    os.makedirs(store_dir, exist_ok=True)
+    tmp_dir = f"{version_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    with open(os.path.join(tmp_dir, 'featurizers.pkl'), 'wb') as f:
+        pickle.dump({'salary': salary_features, 'role': role_features}, f)
+    save_npz(os.path.join(tmp_dir, 'salary.npz'), feature_set.salary_matrix, compressed=False)
+    save_npz(os.path.join(tmp_dir, 'role.npz'), feature_set.role_matrix, compressed=False)
+    feature_set.rows.to_parquet(os.path.join(tmp_dir, 'rows.parquet'))
+    elapsed = time.perf_counter() - start
+    with open(os.path.join(tmp_dir, MANIFEST_NAME), 'w') as f:
+        json.dump({
+            'version': version,
+            'dataset': os.path.abspath(structured_path),
+            'start_year': start_year,
+            'built_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'seconds': round(elapsed, 2),
+            'rows': len(df),
+            'salary_rows': int(salary_rows.sum()),
+            'salary_shape': list(feature_set.salary_matrix.shape),
+            'role_shape': list(feature_set.role_matrix.shape),
+        }, f, indent=2)
+    shutil.rmtree(version_dir, ignore_errors=True)
+    os.replace(tmp_dir, version_dir)
+    _prune(store_dir)
+    print(f"Stored features {version} in {elapsed:.2f}s: salary {feature_set.salary_matrix.shape}, "
+          f"role {feature_set.role_matrix.shape} -> {version_dir}")
+    return feature_set
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Fit the model featurizers once and store the feature matrices.")
+    arg_parser.add_argument("--input", default=OUTPUT_DIR, help="Structured dataset to featurize.")
+    arg_parser.add_argument("--store", default=FEATURE_STORE_DIR, help="Feature store directory.")
+    arg_parser.add_argument("--start-year", type=int, help="Only use postings from this year on.")
+    arg_parser.add_argument("--rebuild", action="store_true", help="Rebuild even if the stored version is current.")
+    args = arg_parser.parse_args()
+    build_feature_store(args.input, args.store, args.start_year, args.rebuild)
@@ -0,0 +1,157 @@
+import re
+from itertools import chain
+from typing import List
+import numpy as np
+import pandas as pd
+from scipy.sparse import csr_matrix, diags, hstack
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.preprocessing import normalize
+from src.etl_pipeline.transform.skill_index import SkillIndex
+
+# Feature engineering of the salary and role models, shared by model_training.ipynb (fit)
+# and predict.py (transform).
+#
+# A featurizer is fitted once on the training frame: top techs, numeric column list,
+# job_category dummies and TF-IDF vocabulary are fixed then and pickled with the model, so
+# new postings get exactly the training columns. transform() works on a whole structured
+# frame at once (skill bitmask one-hot, string kernels, one vocabulary lookup for all the
+# tokens of the frame) and returns a CSR matrix:
+#   numeric columns (as float) + TF-IDF of raw_text   for the salary model
+#   TF-IDF of raw_text + tech columns                 for the role model
+
+TOP_N_TECH = 50
+SALARY_TEXT_FEATURES = 1000
+ROLE_TEXT_FEATURES = 2000
+SALARY_TOKEN_PATTERN = r'(?u)\b[a-zA-Z][a-zA-Z]+\b'  # words of two or more letters, no digits
+BOOL_COLUMNS = [
+    'is_remote', 'is_senior', 'is_funded', 'is_crypto',
+    'is_junior', 'is_manager', 'is_tier_1_city', 'is_europe',
+    'is_global_remote', 'is_yc', 'has_equity', 'offers_visa',
+    'tech_combo_ai', 'tech_combo_blockchain'
+]
+# Keywords that imply higher pay bands (is_<keyword> columns of the salary model)
+HIGH_VALUE_KEYWORDS = ['staff', 'principal', 'architect', 'lead', 'head', 'director', 'vp', 'founding']
+# Structured columns that are not salary model inputs
+SALARY_EXCLUDE_COLUMNS = ['id', 'date', 'raw_text', 'company_name', 'role_title',
+                          'salary_min', 'salary_max', 'salary_avg', 'log_salary', 'currency',
+                          'salary_unit', 'salary_confidence', 'salary_mentions',
+                          'tech_stack', 'skills_mask', 'job_category', 'dup_cluster']
+
+def tech_column(tech: str) -> str:
+    return f"tech_{tech.lower().replace(' ', '_').replace('.', '')}"
+
+def top_techs(df: pd.DataFrame, n: int = TOP_N_TECH) -> List[str]:
+    """
+    The n skills mentioned by the most postings (ties in SKILL_KEYWORDS order).
+    """
+    counts = SkillIndex.from_frame(df).counts()
+    return counts[counts > 0].sort_values(ascending=False, kind='stable').head(n).index.tolist()
+
+def _texts(df: pd.DataFrame) -> pd.Series:
+    return df['raw_text'].fillna('')
+
+def _is_word_unigrams(vectorizer: TfidfVectorizer) -> bool:
+    return (vectorizer.analyzer == 'word' and vectorizer.ngram_range == (1, 1) and vectorizer.lowercase
+            and vectorizer.tokenizer is None and vectorizer.preprocessor is None and vectorizer.strip_accents is None
+            and not vectorizer.binary and vectorizer.use_idf and not vectorizer.sublinear_tf)
+
+def tfidf_transform(vectorizer: TfidfVectorizer, texts: pd.Series) -> csr_matrix:
+    """
+    vectorizer.transform(texts) for a fitted word unigram vectorizer. sklearn runs each token
+    through its analyzer chain and catches an exception per out-of-vocabulary token; here
+    each text is tokenized with the same pattern and mapped straight to vocabulary columns
+    (stop words are never in the vocabulary, so they drop out with the other unknown tokens).
+    Same matrix up to float rounding.
+    """
+    if not _is_word_unigrams(vectorizer):
+        return vectorizer.transform(texts)
+    findall = re.compile(vectorizer.token_pattern).findall
+    column_of = vectorizer.vocabulary_.get
+    columns = [[c for c in map(column_of, findall(text)) if c is not None] for text in texts.str.lower()]
+    lengths = np.fromiter(map(len, columns), dtype=np.int64, count=len(columns))
+    indptr = np.concatenate([[0], np.cumsum(lengths)])
+    indices = np.fromiter(chain.from_iterable(columns), dtype=np.int64, count=int(indptr[-1]))
+    counts = csr_matrix((np.ones(len(indices), dtype=vectorizer.dtype), indices, indptr),
+                        shape=(len(columns), len(vectorizer.vocabulary_)))
+    counts.sum_duplicates()
+    weighted = counts @ diags(vectorizer.idf_.astype(vectorizer.dtype))
+    return normalize(weighted, norm=vectorizer.norm, copy=False) if vectorizer.norm else weighted
+
+def numeric_matrix(df: pd.DataFrame, columns: List[str], techs: List[str]) -> np.ndarray:
+    """
+    Rows x columns float matrix of numeric features, by name:
+      tech_<skill>    1 if the posting mentions a top tech
+      is_<keyword>    1 if raw_text contains a HIGH_VALUE_KEYWORDS word
+      cat_<category>  1 if job_category is that category
+      other names     the structured column; booleans as 0/1, years_experience -1 if unknown
+    Missing values are 0.
+    """
+    tech_positions = {tech_column(tech): i for i, tech in enumerate(techs)}
+    one_hot = SkillIndex.from_frame(df).one_hot(techs) if any(c in tech_positions for c in columns) else None
+    lowered = None
+    matrix = np.empty((len(df), len(columns)))
+    for j, name in enumerate(columns):
+        if name in tech_positions:
+            matrix[:, j] = one_hot[:, tech_positions[name]]
+        elif name in df.columns:
+            values = df[name]
+            if name in BOOL_COLUMNS:
+                values = values.fillna(False).astype(int)
+            elif name == 'years_experience':
+                values = values.fillna(-1)
+            matrix[:, j] = values.fillna(0).astype(float).to_numpy()
+        elif name.startswith('cat_'):
+            matrix[:, j] = (df['job_category'] == name[len('cat_'):]).fillna(False).to_numpy(dtype=float)
+        elif name.startswith('is_') and name[len('is_'):] in HIGH_VALUE_KEYWORDS:
+            if lowered is None:
+                lowered = _texts(df).str.lower()
+            matrix[:, j] = lowered.str.contains(rf"\b{name[len('is_'):]}\b").to_numpy(dtype=float)
+        else:
+            raise KeyError(f"Unknown feature column '{name}'")
+    return matrix
+
+class SalaryFeatures:
+    """
+    Salary model inputs: the structured numeric columns, top-tech one-hot, high-value
+    keyword flags and job_category dummies, then a TF-IDF of raw_text.
+    """
+    def __init__(self, techs: List[str]):
+        self.techs = list(techs)
+        self.columns = None
+        self.vectorizer = TfidfVectorizer(max_features=SALARY_TEXT_FEATURES, stop_words='english',
+                                          token_pattern=SALARY_TOKEN_PATTERN)
+
+    def fit(self, df: pd.DataFrame) -> "SalaryFeatures":
+        base = [c for c in df.columns if c not in SALARY_EXCLUDE_COLUMNS]
+        categories = sorted(df['job_category'].dropna().unique()) if 'job_category' in df.columns else []
+        self.columns = (base + [tech_column(tech) for tech in self.techs]
+                        + [f'is_{kw}' for kw in HIGH_VALUE_KEYWORDS] + [f'cat_{c}' for c in categories])
+        self.vectorizer.fit(_texts(df))
+        return self
+
+    def transform(self, df: pd.DataFrame) -> csr_matrix:
+        numeric = csr_matrix(numeric_matrix(df, self.columns, self.techs))
+        return hstack([numeric, tfidf_transform(self.vectorizer, _texts(df))], format='csr')
+
+    def feature_names(self) -> List[str]:
+        return self.columns + [f"text_{w}" for w in self.vectorizer.get_feature_names_out()]
+
+class RoleFeatures:
+    """
+    Role model inputs: a TF-IDF of raw_text, then the tech_* columns (tech combos and the
+    top-tech one-hot).
+    """
+    def __init__(self, techs: List[str]):
+        self.techs = list(techs)
+        self.columns = None
+        self.vectorizer = TfidfVectorizer(max_features=ROLE_TEXT_FEATURES, stop_words='english')
+
+    def fit(self, df: pd.DataFrame) -> "RoleFeatures":
+        candidates = list(df.columns) + [tech_column(tech) for tech in self.techs]
+        self.columns = [c for c in candidates if c.startswith('tech_') and c != 'tech_stack']
+        self.vectorizer.fit(_texts(df))
+        return self
+
+    def transform(self, df: pd.DataFrame) -> csr_matrix:
+        numeric = csr_matrix(numeric_matrix(df, self.columns, self.techs))
+        return hstack([tfidf_transform(self.vectorizer, _texts(df)), numeric], format='csr')
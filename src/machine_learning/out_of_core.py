@@ -0,0 +1,223 @@
+import argparse
+import os
+import pickle
+import tempfile
+import time
+from typing import List
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from scipy.sparse import csr_matrix, hstack
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import mean_absolute_error, r2_score, f1_score
+from src.etl_pipeline.memory import peak_rss_mib
+from src.etl_pipeline.transform import storage
+from src.etl_pipeline.transform.config import ROLE_KEYWORDS
+from src.etl_pipeline.transform.pipeline import FINAL_COLUMNS, OUTPUT_DIR
+from src.etl_pipeline.transform.skill_index import SKILL_NAMES
+from src.machine_learning.feature_store import salary_training_rows
+from src.machine_learning.features import (
+    numeric_matrix, tech_column, HIGH_VALUE_KEYWORDS, SALARY_EXCLUDE_COLUMNS, SALARY_TOKEN_PATTERN
+)
+from src.machine_learning.predict import ARTIFACTS_DIR
+
+# Out-of-core training of the salary and role models: the structured dataset is read in
+# batches of OOC_BATCH_ROWS rows (storage.iter_structured) and nothing holds more than a
+# batch of features, so memory does not grow with the number of postings.
+#
+# Features are stateless, so no pass is needed to fit them: raw_text tokens are hashed
+# (HashingVectorizer, no IDF) and every skill and job category gets a column, where the
+# in-memory featurizers keep the 50 most common skills and a fitted vocabulary.
+#   salary  XGBoost on an external-memory DMatrix (quantized pages cached on disk), with
+#           the notebook's hyperparameters
+#   role    SGDClassifier (logistic loss) fitted with partial_fit, ROLE_EPOCHS passes
+# A fixed share of rows, chosen by a hash of the id, is held out of training for evaluation.
+# Models are saved in predict.py's format, so `predict --artifacts` scores with them.
+
+OOC_ARTIFACTS_DIR = os.path.join(ARTIFACTS_DIR, "out_of_core")
+OOC_BATCH_ROWS = 5000
+SALARY_HASH_FEATURES = 2 ** 12  # few salary rows: wider hashing only slows XGBoost down
+ROLE_HASH_FEATURES = 2 ** 18
+ROLE_EPOCHS = 5
+ROLE_ALPHA = 1e-6
+HOLDOUT_BUCKETS = 5  # 1 in 5 postings is held out
+SALARY_PARAMS = {'max_depth': 8, 'eta': 0.03, 'subsample': 0.7, 'colsample_bytree': 0.7,
+                 'objective': 'reg:squarederror', 'tree_method': 'hist', 'seed': 42}
+SALARY_ROUNDS = 1000
+JOB_CATEGORIES = list(ROLE_KEYWORDS) + ["General"]
+SALARY_BASE_COLUMNS = [c for c in FINAL_COLUMNS if c not in SALARY_EXCLUDE_COLUMNS]
+TRAINING_COLUMNS = ['id', 'date', 'raw_text', 'salary_avg', 'currency', 'skills_mask', 'job_category'] + SALARY_BASE_COLUMNS
+
+def holdout_rows(ids: pd.Series) -> np.ndarray:
+    """
+    Rows held out of training: the same postings in every run and for every model.
+    """
+    return pd.util.hash_pandas_object(ids.astype(str), index=False).to_numpy() % HOLDOUT_BUCKETS == 0
+
+def _texts(df: pd.DataFrame) -> pd.Series:
+    return df['raw_text'].fillna('')
+
+class HashedSalaryFeatures:
+    """
+    Stateless salary model inputs: the structured numeric columns, every skill, the
+    high-value keyword flags and every job category, then hashed raw_text words.
+    """
+    def __init__(self, n_features: int = SALARY_HASH_FEATURES):
+        self.columns = (SALARY_BASE_COLUMNS + [tech_column(skill) for skill in SKILL_NAMES]
+                        + [f'is_{kw}' for kw in HIGH_VALUE_KEYWORDS] + [f'cat_{c}' for c in JOB_CATEGORIES])
+        self.vectorizer = HashingVectorizer(n_features=n_features, stop_words='english',
+                                            token_pattern=SALARY_TOKEN_PATTERN, alternate_sign=False)
+
+    def transform(self, df: pd.DataFrame) -> csr_matrix:
+        numeric = csr_matrix(numeric_matrix(df, self.columns, SKILL_NAMES))
+        return hstack([numeric, self.vectorizer.transform(_texts(df))], format='csr')
+
+class HashedRoleFeatures:
+    """
+    Stateless role model inputs: hashed raw_text words, then the tech combos and every skill.
+    """
+    def __init__(self, n_features: int = ROLE_HASH_FEATURES):
+        self.columns = ['tech_combo_ai', 'tech_combo_blockchain'] + [tech_column(skill) for skill in SKILL_NAMES]
+        self.vectorizer = HashingVectorizer(n_features=n_features, stop_words='english', alternate_sign=False)
+
+    def transform(self, df: pd.DataFrame) -> csr_matrix:
+        numeric = csr_matrix(numeric_matrix(df, self.columns, SKILL_NAMES))
+        return hstack([self.vectorizer.transform(_texts(df)), numeric], format='csr')
+
+def iter_batches(structured_path: str, batch_rows: int = OOC_BATCH_ROWS, start_year: int = None,
+                 columns: List[str] = None):
+    filters = [('year', '>=', start_year)] if start_year else None
+    return storage.iter_structured(structured_path, batch_rows, columns or TRAINING_COLUMNS, filters)
+
+class SalaryBatches(xgb.DataIter):
+    """
+    The salary model's training rows, a batch at a time, for an external-memory DMatrix.
+    XGBoost passes over the data several times; each pass re-reads the dataset.
+    """
+    def __init__(self, batches, features: HashedSalaryFeatures, cache_prefix: str):
+        self._batches = batches  # () -> iterator of structured frames
+        self._features = features
+        self._iterator = None
+        self.rows = 0
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> bool:
+        if self._iterator is None:
+            self._iterator = self._batches()
+            self.rows = 0
+        for df in self._iterator:
+            rows = df[salary_training_rows(df).to_numpy() & ~holdout_rows(df['id'])]
+            if len(rows):
+                self.rows += len(rows)
+                input_data(data=self._features.transform(rows),
+                           label=np.log1p(rows['salary_avg'].astype('float64')).to_numpy())
+                return True
+        return False
+
+    def reset(self):
+        self._iterator = None
+
+def train_salary_model(batches, features: HashedSalaryFeatures, rounds: int = SALARY_ROUNDS,
+                       scratch_dir: str = None) -> xgb.XGBRegressor:
+    with tempfile.TemporaryDirectory(dir=scratch_dir) as cache_dir:
+        data_iter = SalaryBatches(batches, features, os.path.join(cache_dir, "salary"))
+        matrix = xgb.ExtMemQuantileDMatrix(data_iter)
+        print(f"Salary model: {data_iter.rows} training rows, {matrix.num_col()} columns")
+        booster = xgb.train(SALARY_PARAMS, matrix, num_boost_round=rounds)
+        # The DMatrix owns the cache pages: release it before the directory goes
+        del matrix, data_iter
+    # As a scikit-learn model, like the notebook's, so predict.py can load it
+    model = xgb.XGBRegressor()
+    model.load_model(booster.save_raw('json'))
+    return model
+
+def train_role_model(batches, features: HashedRoleFeatures, epochs: int = ROLE_EPOCHS) -> SGDClassifier:
+    model = SGDClassifier(loss='log_loss', alpha=ROLE_ALPHA, random_state=42)
+    rng = np.random.default_rng(42)
+    for epoch in range(epochs):
+        rows_seen = 0
+        for df in batches():
+            rows = df[df['job_category'].notna().to_numpy() & ~holdout_rows(df['id'])]
+            if not len(rows):
+                continue
+            # partial_fit takes one SGD pass over the batch in the given order
+            order = rng.permutation(len(rows))
+            model.partial_fit(features.transform(rows)[order], rows['job_category'].to_numpy(dtype=object)[order],
+                              classes=JOB_CATEGORIES)
+            rows_seen += len(rows)
+        print(f"Role model: epoch {epoch + 1}/{epochs} over {rows_seen} rows")
+    return model
+
+def evaluate(batches, salary_model, salary_features, role_model, role_features) -> dict:
+    """
+    Salary MAE / R2 (dollars) and role weighted F1 on the held-out rows, a batch at a time.
+    """
+    salary_true, salary_pred, role_true, role_pred = [], [], [], []
+    for df in batches():
+        held_out = df[holdout_rows(df['id'])]
+        salary_rows = held_out[salary_training_rows(held_out).to_numpy()]
+        if len(salary_rows):
+            salary_true.append(salary_rows['salary_avg'].astype('float64').to_numpy())
+            salary_pred.append(np.expm1(salary_model.predict(salary_features.transform(salary_rows))))
+        role_rows = held_out[held_out['job_category'].notna().to_numpy()]
+        if len(role_rows):
+            role_true.append(role_rows['job_category'].to_numpy(dtype=object))
+            role_pred.append(role_model.predict(role_features.transform(role_rows)))
+    salary_true, salary_pred = np.concatenate(salary_true), np.concatenate(salary_pred)
+    role_true, role_pred = np.concatenate(role_true), np.concatenate(role_pred)
+    return {
+        'salary_rows': len(salary_true),
+        'salary_mae': float(mean_absolute_error(salary_true, salary_pred)),
+        'salary_r2': float(r2_score(salary_true, salary_pred)),
+        'role_rows': len(role_true),
+        'role_f1': float(f1_score(role_true, role_pred, average='weighted')),
+    }
+
+def save_artifacts(artifacts_dir: str, salary_model, salary_features, role_model, role_features):
+    os.makedirs(artifacts_dir, exist_ok=True)
+    for name, model, features in (('salary_model.pkl', salary_model, salary_features),
+                                  ('role_model.pkl', role_model, role_features)):
+        with open(os.path.join(artifacts_dir, name), 'wb') as f:
+            pickle.dump({'model': model, 'features': features}, f)
+
+def run_out_of_core_training(structured_path: str = OUTPUT_DIR, artifacts_dir: str = OOC_ARTIFACTS_DIR,
+                             start_year: int = None, batch_rows: int = OOC_BATCH_ROWS, epochs: int = ROLE_EPOCHS,
+                             scratch_dir: str = None) -> dict:
+    """
+    Trains both models out of core, evaluates them on the held-out rows and saves them to
+    artifacts_dir. Returns the metrics with fit times and the peak RSS.
+    """
+    batches = lambda: iter_batches(structured_path, batch_rows, start_year)
+    salary_features, role_features = HashedSalaryFeatures(), HashedRoleFeatures()
+
+    start = time.perf_counter()
+    salary_model = train_salary_model(batches, salary_features, scratch_dir=scratch_dir)
+    salary_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    role_model = train_role_model(batches, role_features, epochs)
+    role_seconds = time.perf_counter() - start
+
+    metrics = evaluate(batches, salary_model, salary_features, role_model, role_features)
+    metrics.update(salary_fit_seconds=round(salary_seconds, 2), role_fit_seconds=round(role_seconds, 2),
+                   peak_rss_mib=round(peak_rss_mib(), 1))
+    save_artifacts(artifacts_dir, salary_model, salary_features, role_model, role_features)
+    print(f"Salary: MAE ${metrics['salary_mae']:,.0f}, R2 {metrics['salary_r2']:.4f} ({metrics['salary_rows']} held out, "
+          f"fit {salary_seconds:.1f}s)")
+    print(f"Role: weighted F1 {metrics['role_f1']:.4f} ({metrics['role_rows']} held out, fit {role_seconds:.1f}s)")
+    print(f"Peak RSS {metrics['peak_rss_mib']:.0f} MiB; models saved to {artifacts_dir}")
+    return metrics
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Train the salary and role models out of core, a batch at a time.")
+    arg_parser.add_argument("--input", default=OUTPUT_DIR, help="Structured dataset to train on.")
+    arg_parser.add_argument("--artifacts", default=OOC_ARTIFACTS_DIR, help="Directory to save the models to.")
+    arg_parser.add_argument("--start-year", type=int, help="Only use postings from this year on.")
+    arg_parser.add_argument("--batch-rows", type=int, default=OOC_BATCH_ROWS, help="Rows read and featurized at a time.")
+    arg_parser.add_argument("--epochs", type=int, default=ROLE_EPOCHS, help="Passes of the role model over the data.")
+    arg_parser.add_argument("--scratch", help="Directory for XGBoost's external-memory cache (default: system temp).")
+    args = arg_parser.parse_args()
+    # Imported by name: the pickled featurizers must refer to this module, not to __main__
+    from src.machine_learning import out_of_core
+    out_of_core.run_out_of_core_training(args.input, args.artifacts, args.start_year, args.batch_rows, args.epochs,
+                                         args.scratch)
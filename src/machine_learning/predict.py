@@ -0,0 +1,164 @@
+import argparse
+import os
+import pickle
+import time
+import numpy as np
+import pandas as pd
+from src.etl_pipeline import datasets
+from src.etl_pipeline.transform import storage
+from src.etl_pipeline.transform.pipeline import (
+    sanitize, extract_features, enforce_schema, DATA_DIR, OUTPUT_DIR
+)
+from src.machine_learning.feature_store import FeatureSet, load_features, FEATURE_STORE_DIR
+
+# Batch scoring of postings with the models saved by model_training.ipynb.
+#
+# Both pickles hold {'model': ..., 'features': ...}: the featurizer fitted in the notebook
+# (features.py) turns a structured frame into the model's sparse input matrix, so the
+# artifacts are loaded once and postings are scored PREDICT_BATCH_ROWS at a time. Raw postings
+# (raw dataset columns, e.g. a new month's thread) are sanitized as by the transform pipeline
+# and run through its column-at-a-time extractors first; structured rows are scored as they are.
+# Models trained from the feature store record its version: while the structured dataset is
+# unchanged, the CLI scores the stored feature matrices and skips featurization.
+
+ARTIFACTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PREDICTIONS_DIR = os.path.join(DATA_DIR, "hn_jobs_predictions")
+PREDICT_BATCH_ROWS = 20000
+PREDICTION_COLUMNS = ['id', 'date', 'predicted_salary', 'predicted_role', 'role_probability']
+
+def load_artifact(path: str) -> dict:
+    with open(path, 'rb') as f:
+        artifact = pickle.load(f)
+    if not isinstance(artifact, dict) or 'features' not in artifact:
+        raise ValueError(f"{path} was saved without its featurizer; re-run model_training.ipynb to save it again")
+    return artifact
+
+def is_structured(df: pd.DataFrame) -> bool:
+    return 'skills_mask' in df.columns
+
+class Predictor:
+    """
+    The salary and role models with their featurizers, loaded once from artifacts_dir.
+    """
+    def __init__(self, artifacts_dir: str = ARTIFACTS_DIR):
+        salary = load_artifact(os.path.join(artifacts_dir, 'salary_model.pkl'))
+        role = load_artifact(os.path.join(artifacts_dir, 'role_model.pkl'))
+        self.salary_model, self.salary_features = salary['model'], salary['features']
+        self.role_model, self.role_features = role['model'], role['features']
+        # Feature store version both models were trained on, if any
+        self.feature_version = salary.get('feature_version')
+        if role.get('feature_version') != self.feature_version:
+            self.feature_version = None
+
+    def predict_batch(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Predictions for structured rows or sanitized raw rows.
+        """
+        if not is_structured(df):
+            df = enforce_schema(extract_features(df.copy(), vectorized_mode=True))
+        return self._score(df, self.salary_features.transform(df), self.role_features.transform(df))
+
+    def predict_stored(self, feature_set: FeatureSet) -> pd.DataFrame:
+        """
+        Predictions for the rows of a feature store version, from its stored matrices. The
+        models must have been trained on that version.
+        """
+        if feature_set.version != self.feature_version:
+            raise ValueError(f"Models were trained on feature store version {self.feature_version}, "
+                             f"not {feature_set.version}")
+        return self._score(feature_set.rows, feature_set.salary_matrix, feature_set.role_matrix)
+
+    def _score(self, rows: pd.DataFrame, salary_matrix, role_matrix) -> pd.DataFrame:
+        # Trained on log1p of USD annual salaries
+        salary = np.expm1(self.salary_model.predict(salary_matrix))
+        probabilities = self.role_model.predict_proba(role_matrix)
+        best = probabilities.argmax(axis=1)
+        return pd.DataFrame({
+            'id': rows['id'].to_numpy(),
+            'date': rows['date'].to_numpy(),
+            'predicted_salary': salary.round().astype('int64'),
+            'predicted_role': self.role_model.classes_[best],
+            'role_probability': probabilities[np.arange(len(rows)), best],
+        }, columns=PREDICTION_COLUMNS)
+
+    def predict(self, df: pd.DataFrame, batch_rows: int = PREDICT_BATCH_ROWS) -> pd.DataFrame:
+        """
+        Predictions for structured postings (one per row, in order) or raw postings (one per
+        posting kept by sanitation: duplicates and spam are dropped).
+        """
+        if not is_structured(df):
+            df = sanitize(df.copy())
+            if df is None:
+                raise ValueError("Input has no text column")
+        batches = [self.predict_batch(df.iloc[start:start + batch_rows]) for start in range(0, len(df), batch_rows)]
+        if not batches:
+            return pd.DataFrame(columns=PREDICTION_COLUMNS)
+        return pd.concat(batches, ignore_index=True)
+
+def postings_filters(month: str = None, start_year: int = None):
+    if month is not None:
+        year, month_number = (int(part) for part in month.split('-'))
+        return [('year', '=', year), ('month', '=', month_number)]
+    if start_year is not None:
+        return [('year', '>=', start_year)]
+    return None
+
+def is_structured_dataset(path: str) -> bool:
+    stored = datasets.stored_columns(path)
+    return 'skills_mask' in stored or 'flags' in stored
+
+def read_postings(path: str, month: str = None, start_year: int = None) -> pd.DataFrame:
+    """
+    A structured dataset (any storage profile) or a raw dataset, optionally one YYYY-MM month
+    or the postings from start_year on.
+    """
+    if is_structured_dataset(path):
+        return storage.read_structured(path, filters=postings_filters(month, start_year))
+    return datasets.read_partitioned(path, filters=postings_filters(month, start_year))
+
+def run_predictions(input_path: str, output_path: str, artifacts_dir: str = ARTIFACTS_DIR, month: str = None,
+                    start_year: int = None, store_dir: str = FEATURE_STORE_DIR) -> int:
+    """
+    Scores every posting of input_path (from start_year on) and saves the predictions
+    partitioned by month. With a month, only that month of the output is replaced.
+    Returns the number of rows scored.
+    """
+    start = time.perf_counter()
+    predictor = Predictor(artifacts_dir)
+    feature_set = None
+    if month is None and predictor.feature_version and is_structured_dataset(input_path):
+        feature_set = load_features(input_path, store_dir, start_year)
+        if feature_set is not None and feature_set.version != predictor.feature_version:
+            feature_set = None
+    if feature_set is not None:
+        loaded = time.perf_counter()
+        print(f"Loaded models and stored features {feature_set.version} ({len(feature_set.rows)} postings) "
+              f"in {loaded - start:.2f}s")
+        predictions = predictor.predict_stored(feature_set)
+    else:
+        df = read_postings(input_path, month, start_year)
+        loaded = time.perf_counter()
+        print(f"Loaded models and {len(df)} postings in {loaded - start:.2f}s")
+        predictions = predictor.predict(df)
+    elapsed = time.perf_counter() - loaded
+    print(f"Scored {len(predictions)} postings in {elapsed:.2f}s "
+          f"({len(predictions) / elapsed if elapsed else 0:,.0f} rows/s)")
+    if len(predictions):
+        datasets.write_partitioned_frames([predictions], output_path, 'date', replace_partitions=month is not None)
+        print(f"Predictions saved to {output_path}")
+    return len(predictions)
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Score postings with the trained salary and role models.")
+    arg_parser.add_argument("--input", default=OUTPUT_DIR, help="Structured or raw dataset to score.")
+    arg_parser.add_argument("--output", default=PREDICTIONS_DIR, help="Dataset to save the predictions to.")
+    arg_parser.add_argument("--artifacts", default=ARTIFACTS_DIR,
+                            help="Directory holding salary_model.pkl and role_model.pkl.")
+    arg_parser.add_argument("--month", metavar="YYYY-MM", help="Score only this month.")
+    arg_parser.add_argument("--start-year", type=int,
+                            help="Only score postings from this year on (the stored features are used when they match).")
+    arg_parser.add_argument("--store", default=FEATURE_STORE_DIR, help="Feature store directory.")
+    args = arg_parser.parse_args()
+    if args.month and args.start_year:
+        arg_parser.error("--month and --start-year are exclusive")
+    run_predictions(args.input, args.output, args.artifacts, args.month, args.start_year, args.store)
@@ -0,0 +1,306 @@
+import argparse
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+from scipy.sparse import csr_matrix
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import Ridge, SGDClassifier
+from sklearn.metrics import mean_absolute_error, r2_score, f1_score
+from sklearn.model_selection import KFold, ParameterGrid, StratifiedKFold
+from sklearn.naive_bayes import ComplementNB
+from src.etl_pipeline.transform.pipeline import DATA_DIR, OUTPUT_DIR
+from src.machine_learning.feature_store import FEATURE_STORE_DIR, FeatureSet, build_feature_store
+
+# Hyperparameter and model sweep over the feature store's matrices: every model/parameter
+# combination of a grid is cross-validated on the salary (MAE, R2 in dollars) and role
+# (weighted F1) training rows, one fit per process across all cores.
+#
+# The training matrices, targets and fold assignments are written once per feature store
+# version as .npy files under SWEEP_DIR/<version>-<folds>f/; workers memory-map them, so
+# jobs only carry a path and every process shares the same page cache instead of a copy.
+#   salary_{data,indices,indptr}.npy, salary_y.npy, salary_folds.npy  (same for role)
+#   meta.json      shapes and the role classes (role targets are stored as class codes)
+#   results.jsonl  one line per finished (task, model, params, fold), appended as jobs end
+#   summary.csv    results averaged over folds, best first
+# A rerun skips every job already in results.jsonl, so an interrupted sweep resumes.
+#
+# Early stopping: XGBoost stops boosting after EARLY_STOPPING_ROUNDS rounds without
+# improvement on EARLY_STOPPING_SHARE of the fold's training rows, and SGD on its own
+# validation split. The first fold of every combination runs before the others; a
+# combination far behind the best first fold (PRUNE_MAE_RATIO, PRUNE_F1_GAP) is not run
+# on the remaining folds.
+
+SWEEP_DIR = os.path.join(DATA_DIR, "sweeps")
+SWEEP_FOLDS = 5
+EARLY_STOPPING_ROUNDS = 50
+EARLY_STOPPING_SHARE = 0.1
+PRUNE_MAE_RATIO = 1.1  # salary: first-fold MAE over 10% worse than the best
+PRUNE_F1_GAP = 0.05  # role: first-fold F1 more than 0.05 below the best
+TASKS = ('salary', 'role')
+SWEEP_GRID = {
+    'salary': {
+        'xgboost': {'max_depth': [4, 8], 'learning_rate': [0.03, 0.1]},
+        'ridge': {'alpha': [1.0, 10.0]},
+    },
+    'role': {
+        'random_forest': {'n_estimators': [100], 'min_samples_leaf': [1, 2]},
+        'sgd': {'alpha': [1e-5, 1e-6]},
+        'naive_bayes': {'alpha': [0.1, 1.0]},
+    },
+}
+# Model defaults: the notebook's where it has them; one thread each, the pool uses the cores
+MODELS = {
+    'xgboost': lambda params: xgb.XGBRegressor(**{
+        'n_estimators': 1000, 'max_depth': 8, 'learning_rate': 0.03, 'subsample': 0.7, 'colsample_bytree': 0.7,
+        'objective': 'reg:squarederror', 'early_stopping_rounds': EARLY_STOPPING_ROUNDS, 'n_jobs': 1,
+        'random_state': 42, **params}),
+    'ridge': lambda params: Ridge(**params),
+    'random_forest': lambda params: RandomForestClassifier(**{'n_estimators': 100, 'random_state': 42, 'n_jobs': 1,
+                                                              **params}),
+    'sgd': lambda params: SGDClassifier(**{'loss': 'log_loss', 'early_stopping': True, 'random_state': 42,
+                                           **params}),
+    'naive_bayes': lambda params: ComplementNB(**params),
+}
+
+_TASK_DATA = {}  # per worker process: (data_dir, task) -> memory-mapped (X, y, folds)
+
+def sweep_data_dir(version: str, folds: int = SWEEP_FOLDS, sweep_dir: str = SWEEP_DIR) -> str:
+    return os.path.join(sweep_dir, f"{version}-{folds}f")
+
+def prepare_sweep_data(feature_set: FeatureSet, folds: int = SWEEP_FOLDS, sweep_dir: str = SWEEP_DIR) -> str:
+    """
+    Writes the salary and role training matrices, targets and fold assignments of a feature
+    store version for memory-mapping, unless already written. Returns their directory.
+    """
+    data_dir = sweep_data_dir(feature_set.version, folds, sweep_dir)
+    if os.path.exists(os.path.join(data_dir, 'meta.json')):
+        return data_dir
+
+    tmp_dir = f"{data_dir}.tmp"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    meta = {'version': feature_set.version, 'folds': folds}
+    for task, (X, y) in (('salary', feature_set.salary_training()), ('role', feature_set.role_training())):
+        if task == 'role':
+            classes, y = np.unique(y.to_numpy(), return_inverse=True)
+            splitter = StratifiedKFold(folds, shuffle=True, random_state=42)
+            meta['role_classes'] = classes.tolist()
+        else:
+            y = y.to_numpy('float64')
+            splitter = KFold(folds, shuffle=True, random_state=42)
+        fold_of_row = np.empty(len(y), dtype='int8')
+        for fold, (_, test_rows) in enumerate(splitter.split(np.zeros(len(y)), y)):
+            fold_of_row[test_rows] = fold
+        for name, array in (('data', X.data), ('indices', X.indices), ('indptr', X.indptr), ('y', y),
+                            ('folds', fold_of_row)):
+            np.save(os.path.join(tmp_dir, f"{task}_{name}.npy"), array)
+        meta[f'{task}_shape'] = list(X.shape)
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    # Written aside and moved in, like the feature store; results of an older write stay
+    if os.path.exists(data_dir):
+        for name in os.listdir(data_dir):
+            if name.endswith(('.jsonl', '.csv')):
+                os.replace(os.path.join(data_dir, name), os.path.join(tmp_dir, name))
+        shutil.rmtree(data_dir)
+    os.replace(tmp_dir, data_dir)
+    return data_dir
+
+def _task_data(data_dir: str, task: str):
+    key = (data_dir, task)
+    if key not in _TASK_DATA:
+        with open(os.path.join(data_dir, 'meta.json')) as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(data_dir, f"{task}_{name}.npy"), mmap_mode='r')
+                  for name in ('data', 'indices', 'indptr', 'y', 'folds')}
+        X = csr_matrix((arrays['data'], arrays['indices'], arrays['indptr']), shape=meta[f'{task}_shape'], copy=False)
+        _TASK_DATA[key] = (X, arrays['y'], arrays['folds'])
+    return _TASK_DATA[key]
+
+def sweep_jobs(grid: dict, folds: int) -> list:
+    """
+    (task, model, params, fold) of every combination in a {task: {model: {param: [values]}}} grid.
+    """
+    return [(task, model, params, fold)
+            for task, models in grid.items()
+            for model, param_grid in models.items()
+            for params in ParameterGrid(param_grid)
+            for fold in range(folds)]
+
+def job_key(task: str, model: str, params: dict, fold: int) -> str:
+    return json.dumps([task, model, params, fold], sort_keys=True)
+
+def run_job(data_dir: str, task: str, model: str, params: dict, fold: int) -> dict:
+    """
+    Fits one combination on the other folds and scores it on this one.
+    """
+    X, y, fold_of_row = _task_data(data_dir, task)
+    train_rows = np.flatnonzero(fold_of_row != fold)
+    test_rows = np.flatnonzero(fold_of_row == fold)
+    estimator = MODELS[model](params)
+    fit_kwargs = {}
+    if model == 'xgboost':
+        # Early stopping rows come out of the training folds: the scored fold stays unseen
+        rng = np.random.default_rng(42)
+        train_rows = rng.permutation(train_rows)
+        stop_count = int(len(train_rows) * EARLY_STOPPING_SHARE)
+        stop_rows, train_rows = np.sort(train_rows[:stop_count]), np.sort(train_rows[stop_count:])
+        fit_kwargs = {'eval_set': [(X[stop_rows], y[stop_rows])], 'verbose': False}
+
+    start = time.perf_counter()
+    estimator.fit(X[train_rows], np.asarray(y[train_rows]), **fit_kwargs)
+    fit_seconds = time.perf_counter() - start
+    predicted = estimator.predict(X[test_rows])
+
+    result = {'task': task, 'model': model, 'params': params, 'fold': fold, 'train_rows': len(train_rows),
+              'fit_seconds': round(fit_seconds, 3)}
+    if task == 'salary':
+        actual, predicted = np.expm1(y[test_rows]), np.expm1(predicted)
+        result.update(mae=float(mean_absolute_error(actual, predicted)), r2=float(r2_score(actual, predicted)))
+    else:
+        result['f1'] = float(f1_score(y[test_rows], predicted, average='weighted'))
+    if model == 'xgboost':
+        result['rounds'] = estimator.best_iteration + 1
+    elif model == 'sgd':
+        result['rounds'] = int(estimator.n_iter_)
+    return result
+
+def load_results(data_dir: str) -> list:
+    results_path = os.path.join(data_dir, 'results.jsonl')
+    if not os.path.exists(results_path):
+        return []
+    results = []
+    with open(results_path) as f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass  # last line of an interrupted write
+    return results
+
+def pruned_combinations(results: list) -> set:
+    """
+    Keys (task, model, params) of the combinations whose first fold is far behind the best.
+    """
+    first_folds = [r for r in results if r['fold'] == 0]
+    best_mae = min((r['mae'] for r in first_folds if r['task'] == 'salary'), default=None)
+    best_f1 = max((r['f1'] for r in first_folds if r['task'] == 'role'), default=None)
+    return {job_key(r['task'], r['model'], r['params'], None) for r in first_folds
+            if (r['task'] == 'salary' and r['mae'] > best_mae * PRUNE_MAE_RATIO)
+            or (r['task'] == 'role' and r['f1'] < best_f1 - PRUNE_F1_GAP)}
+
+def summarize(results: list) -> pd.DataFrame:
+    """
+    Results averaged over folds per combination, best first within each task.
+    """
+    if not results:
+        return pd.DataFrame()
+    df = pd.DataFrame(results).assign(params=lambda d: d['params'].map(lambda p: json.dumps(p, sort_keys=True)))
+    metrics = [c for c in ('mae', 'r2', 'f1', 'fit_seconds', 'rounds') if c in df.columns]
+    summary = df.groupby(['task', 'model', 'params'], sort=False)[metrics].mean()
+    summary.insert(0, 'folds', df.groupby(['task', 'model', 'params'], sort=False)['fold'].count())
+    summary = summary.reset_index()
+    score = summary['mae'].fillna(0) if 'mae' in summary else 0
+    if 'f1' in summary:
+        score = score - summary['f1'].fillna(0)
+    return summary.assign(score=score).sort_values(['task', 'score']).drop(columns='score').reset_index(drop=True)
+
+def _drop_partial_line(results_path: str):
+    # An interrupted write leaves a last line without its newline (skipped by load_results):
+    # cut it off so the next record starts on a line of its own
+    if not os.path.exists(results_path):
+        return
+    with open(results_path, 'rb+') as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+
+def _run_jobs(data_dir: str, jobs: list, workers: int, results: list):
+    # A failed fit cancels the fits not started yet; the running ones are still recorded
+    # before its error is raised
+    if not jobs:
+        return
+    print(f"Running {len(jobs)} fits on {workers} workers...", flush=True)
+    results_path = os.path.join(data_dir, 'results.jsonl')
+    _drop_partial_line(results_path)
+    failure = None
+    with open(results_path, 'a') as out, ProcessPoolExecutor(workers) as executor:
+        futures = [executor.submit(run_job, data_dir, *job) for job in jobs]
+        for future in as_completed(futures):
+            if future.cancelled():
+                continue
+            if future.exception() is not None:
+                if failure is None:
+                    failure = future.exception()
+                    for other in futures:
+                        other.cancel()
+                continue
+            result = dict(future.result(), finished_at=datetime.now(timezone.utc).isoformat(timespec='seconds'))
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            results.append(result)
+            score = f"MAE {result['mae']:,.0f}" if 'mae' in result else f"F1 {result['f1']:.4f}"
+            print(f"  {result['task']} {result['model']} {json.dumps(result['params'])} fold {result['fold']}: "
+                  f"{score} ({result['fit_seconds']:.1f}s)", flush=True)
+    if failure is not None:
+        raise failure
+
+def run_sweep(structured_path: str = OUTPUT_DIR, store_dir: str = FEATURE_STORE_DIR, sweep_dir: str = SWEEP_DIR,
+              start_year: int = None, grid: dict = None, folds: int = SWEEP_FOLDS, workers: int = None,
+              prune: bool = True) -> pd.DataFrame:
+    """
+    Cross-validates every combination of the grid not already in the sweep's results and
+    returns the summary of all of them.
+    """
+    feature_set = build_feature_store(structured_path, store_dir, start_year)
+    data_dir = prepare_sweep_data(feature_set, folds, sweep_dir)
+    workers = workers or os.cpu_count()
+    results = load_results(data_dir)
+    done = {job_key(r['task'], r['model'], r['params'], r['fold']) for r in results}
+    pending = [job for job in sweep_jobs(grid or SWEEP_GRID, folds) if job_key(*job) not in done]
+    if len(pending) < len(sweep_jobs(grid or SWEEP_GRID, folds)):
+        print(f"Resuming {data_dir}: {len(done)} fits done, {len(pending)} left.")
+
+    # First folds before the rest, so far-behind combinations can be dropped
+    _run_jobs(data_dir, [job for job in pending if job[3] == 0], workers, results)
+    pruned = pruned_combinations(results) if prune else set()
+    rest = [job for job in pending if job[3] != 0 and job_key(*job[:3], None) not in pruned]
+    if len(rest) < len([job for job in pending if job[3] != 0]):
+        print(f"Pruned {len(pruned)} combinations after the first fold.")
+    _run_jobs(data_dir, rest, workers, results)
+
+    summary = summarize(results)
+    summary.to_csv(os.path.join(data_dir, 'summary.csv'), index=False)
+    print(summary.to_string(index=False))
+    print(f"Results -> {data_dir}")
+    return summary
+
+if __name__ == "__main__":
+    # Imported by name: workers unpickle run_job from the module, not from __main__
+    from src.machine_learning import sweep
+    arg_parser = argparse.ArgumentParser(description="Cross-validate model and hyperparameter combinations in parallel.")
+    arg_parser.add_argument("--input", default=OUTPUT_DIR, help="Structured dataset to train on.")
+    arg_parser.add_argument("--store", default=FEATURE_STORE_DIR, help="Feature store directory.")
+    arg_parser.add_argument("--sweep-dir", default=SWEEP_DIR, help="Directory of the sweep data and results.")
+    arg_parser.add_argument("--start-year", type=int, help="Only use postings from this year on.")
+    arg_parser.add_argument("--grid", help="JSON file with a {task: {model: {param: [values]}}} grid.")
+    arg_parser.add_argument("--tasks", nargs="+", choices=TASKS, help="Only sweep these tasks.")
+    arg_parser.add_argument("--models", nargs="+", choices=list(MODELS), help="Only sweep these models.")
+    arg_parser.add_argument("--folds", type=int, default=SWEEP_FOLDS, help="Cross-validation folds.")
+    arg_parser.add_argument("--workers", type=int, help="Worker processes (default: all cores).")
+    arg_parser.add_argument("--no-prune", action="store_true", help="Run every fold of every combination.")
+    args = arg_parser.parse_args()
+    sweep_grid = SWEEP_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            sweep_grid = json.load(f)
+    sweep_grid = {task: {model: params for model, params in models.items() if not args.models or model in args.models}
+                  for task, models in sweep_grid.items() if not args.tasks or task in args.tasks}
+    sweep.run_sweep(args.input, args.store, args.sweep_dir, args.start_year, sweep_grid, args.folds, args.workers,
+                    not args.no_prune)
@@ -1,23 +1,50 @@
-import pandas as pd
-import glob
+import argparse
 import os
+import numpy as np
+import pyarrow.parquet as pq
+from src.etl_pipeline import datasets
+from src.etl_pipeline.data_access import open_dataset
+from src.etl_pipeline.transform import storage
 
 data_dir = "data"
-files = glob.glob(os.path.join(data_dir, "*.parquet"))
 
-if not files:
-    print("No parquet files found.")
-else:
-    latest_file = files[0]
-    print(f"Reading {latest_file}...")
-    df = pd.read_parquet(latest_file)
-    
+arg_parser = argparse.ArgumentParser(description="Print the schema and the latest month of the raw and structured datasets.")
+arg_parser.add_argument("--build-arrow", action="store_true",
+                        help="Read through the memory-mapped Arrow copies (data_access.py), writing them first "
+                             "if they are missing or stale: a full copy of each dataset on disk.")
+args = arg_parser.parse_args()
+
+# By default the parquet files are only read, and only the latest month of each dataset
+for name, read in (("hn_jobs_raw", datasets.read_partitioned), ("hn_jobs_structured", storage.read_structured)):
+    dataset_dir = os.path.join(data_dir, name)
+    files = datasets.dataset_files(dataset_dir) if os.path.isdir(dataset_dir) else []
+    if not files:
+        print(f"No parquet files found in {dataset_dir}.")
+        continue
+
+    if args.build_arrow:
+        mapped = open_dataset(dataset_dir)
+        print(f"\n=== {dataset_dir}: {len(mapped)} rows ({mapped.path}) ===")
+        schema = mapped.schema
+    else:
+        print(f"\n=== {dataset_dir}: {len(files)} files ===")
+        schema = pq.read_schema(files[-1])
+
     print("\n--- Schema ---")
-    print(df.info())
-    
-    print("\n--- First 3 Rows ---")
-    print(df.head(3))
-    
+    print(schema.remove_metadata())
+
+    # Partitions are listed oldest first; rows without a date land in __HIVE_DEFAULT_PARTITION__,
+    # which has no month to read
+    dated = [f for f in files if "__HIVE_DEFAULT_PARTITION__" not in f]
+    if not dated:
+        continue
+    latest_partition = os.path.relpath(os.path.dirname(dated[-1]), dataset_dir)
+    year, month = (int(part.split("=")[1]) for part in latest_partition.split(os.sep))
+    filters = [('year', '==', year), ('month', '==', month)]
+    latest = mapped.to_pandas(filters=filters) if args.build_arrow else read(dataset_dir, filters=filters)
+    print(f"\n--- First 3 Rows of {year}-{month:02d} ({len(latest)} rows) ---")
+    print(latest.head(3))
+
     print("\n--- Random Sample Text ---")
-    if not df.empty:
-        print(df.iloc[0]['raw_text'][:200])
+    if not latest.empty and 'raw_text' in latest.columns:
+        print(latest['raw_text'].iloc[np.random.randint(len(latest))][:200])